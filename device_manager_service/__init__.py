@@ -1,19 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 import connexion
-import logging, coloredlogs, traceback
+import logging, coloredlogs
 from pythonjsonlogger import jsonlogger
 from prometheus_flask_exporter import ConnexionPrometheusMetrics
 from opencensus.ext.flask.flask_middleware import FlaskMiddleware
 from opencensus.trace import config_integration, samplers
 from opencensus.ext.ocagent.trace_exporter import TraceExporter
 from datetime import datetime, timezone
-from time import sleep
 
 from hems_auth.auth import Auth
 
+from device_manager_service.utils.cache.cached_auth import CachedAuth
+
 from device_manager_service import encoder
 from device_manager_service.config import Config
 
+from device_manager_service.ssa.ssa_bootstrap import SSABootstrap
+
 from device_manager_service.ssa.ssa_classes.whirlpool_ssa import WhirlpoolSSA
 from device_manager_service.ssa.ssa_config.wp_config import WPConfig
 
@@ -158,13 +161,17 @@ sampler = samplers.AlwaysOnSampler()
 middleware = FlaskMiddleware(app, exporter=exporter, sampler=sampler)
 
 
-auth = Auth(
-    jwt_sign_key=Config.JWT_SIGN_KEY, 
-    jwt_sign_algorithm=Config.JWT_SIGN_ALGORITHM,
-    DATABASE_IP=Config.DATABASE_IP, 
-    DATABASE_PORT=Config.DATABASE_PORT,
-    DATABASE_USER=Config.AUTH_DATABASE_USER, 
-    DATABASE_PASSWORD=Config.AUTH_DATABASE_PASSWORD
+auth = CachedAuth(
+    Auth(
+        jwt_sign_key=Config.JWT_SIGN_KEY, 
+        jwt_sign_algorithm=Config.JWT_SIGN_ALGORITHM,
+        DATABASE_IP=Config.DATABASE_IP, 
+        DATABASE_PORT=Config.DATABASE_PORT,
+        DATABASE_USER=Config.AUTH_DATABASE_USER, 
+        DATABASE_PASSWORD=Config.AUTH_DATABASE_PASSWORD
+    ),
+    max_size=Config.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=Config.AUTH_CACHE_TTL_SECONDS
 )
 
 
@@ -183,56 +190,33 @@ auth = Auth(
 # )
 
 
+# Adapters are registered in the background, all at the same time, so the
+# service starts serving the endpoints that do not need them right away
+ssa_adapters = SSABootstrap(logger=generalLogger)
+
+
 # WHIRLPOOL SSA
-setup_complete = False
-while not setup_complete:
-    try:
-        whirlpool_proactive_ssa = WhirlpoolSSA(
-            ga_url=WPConfig.GENERIC_ADAPTER_GLOBAL_URL,
-            ss_email=WPConfig.USER_EMAIL,
-            ss_password=WPConfig.USER_PASSWORD,
-            kb_name=WPConfig.KB_NAME,
-            kb_description=WPConfig.KB_DESCRIPTION,
-            asset_id=WPConfig.KB_ASSET_ID,
-            logger=generalLogger
-        )
-        setup_complete = True
-    except Exception as e:
-        traceback.print_exc()
-        generalLogger.error(repr(e))
-
-        # Wait x seconds before trying again
-        generalLogger.warning(
-            f"Waiting {WPConfig.SECONDS_UNTIL_RECONNECT_TRY} seconds " \
-            "before trying the SSA setup again..."
-        )
-        sleep(WPConfig.SECONDS_UNTIL_RECONNECT_TRY)
+ssa_adapters.add("whirlpool_proactive", lambda: WhirlpoolSSA(
+    ga_url=WPConfig.GENERIC_ADAPTER_GLOBAL_URL,
+    ss_email=WPConfig.USER_EMAIL,
+    ss_password=WPConfig.USER_PASSWORD,
+    kb_name=WPConfig.KB_NAME,
+    kb_description=WPConfig.KB_DESCRIPTION,
+    asset_id=WPConfig.KB_ASSET_ID,
+    logger=generalLogger
+))
 
 
 # WHIRLPOOL SSA
-setup_complete = False
-while not setup_complete:
-    try:
-        whirlpool_reactive_ssa = WhirlpoolSSA(
-            ga_url=WPConfig.GENERIC_ADAPTER_PT_URL,
-            ss_email=WPConfig.USER_EMAIL,
-            ss_password=WPConfig.USER_PASSWORD,
-            kb_name=WPConfig.KB_NAME,
-            kb_description=WPConfig.KB_DESCRIPTION,
-            asset_id=WPConfig.KB_ASSET_ID,
-            logger=generalLogger
-        )
-        setup_complete = True
-    except Exception as e:
-        traceback.print_exc()
-        generalLogger.error(repr(e))
-
-        # Wait x seconds before trying again
-        generalLogger.warning(
-            f"Waiting {WPConfig.SECONDS_UNTIL_RECONNECT_TRY} seconds " \
-            "before trying the SSA setup again..."
-        )
-        sleep(WPConfig.SECONDS_UNTIL_RECONNECT_TRY)
+ssa_adapters.add("whirlpool_reactive", lambda: WhirlpoolSSA(
+    ga_url=WPConfig.GENERIC_ADAPTER_PT_URL,
+    ss_email=WPConfig.USER_EMAIL,
+    ss_password=WPConfig.USER_PASSWORD,
+    kb_name=WPConfig.KB_NAME,
+    kb_description=WPConfig.KB_DESCRIPTION,
+    asset_id=WPConfig.KB_ASSET_ID,
+    logger=generalLogger
+))
 
 
 # # BSH SSA
@@ -248,29 +232,15 @@ while not setup_complete:
 
 
 # BSH SSA
-setup_complete = False
-while not setup_complete:
-    try:
-        bsh_proactive_ssa = BSHSSA(
-            ga_url=BSHConfig.GENERIC_ADAPTER_URL,
-            ss_email=BSHConfig.USER_EMAIL,
-            ss_password=BSHConfig.USER_PASSWORD,
-            kb_name=BSHConfig.KB_NAME,
-            kb_description=BSHConfig.KB_DESCRIPTION,
-            asset_id=BSHConfig.KB_ASSET_ID,
-            logger=generalLogger
-        )
-        setup_complete = True
-    except Exception as e:
-        traceback.print_exc()
-        generalLogger.error(repr(e))
-
-        # Wait x seconds before trying again
-        generalLogger.warning(
-            f"Waiting {BSHConfig.SECONDS_UNTIL_RECONNECT_TRY} seconds " \
-            "before trying the SSA setup again..."
-        )
-        sleep(BSHConfig.SECONDS_UNTIL_RECONNECT_TRY)
+ssa_adapters.add("bsh_proactive", lambda: BSHSSA(
+    ga_url=BSHConfig.GENERIC_ADAPTER_URL,
+    ss_email=BSHConfig.USER_EMAIL,
+    ss_password=BSHConfig.USER_PASSWORD,
+    kb_name=BSHConfig.KB_NAME,
+    kb_description=BSHConfig.KB_DESCRIPTION,
+    asset_id=BSHConfig.KB_ASSET_ID,
+    logger=generalLogger
+))
 
 
 # # Userkb SSA
@@ -286,26 +256,15 @@ while not setup_complete:
 
 
 # Userkb SSA
-setup_complete = False
-while not setup_complete:
-    try:
-        userkb_ssa = UserkbSSA(
-            ga_url=UserkbConfig.GENERIC_ADAPTER_URL,
-            ss_email=UserkbConfig.USER_EMAIL,
-            ss_password=UserkbConfig.USER_PASSWORD,
-            kb_name=UserkbConfig.KB_NAME,
-            kb_description=UserkbConfig.KB_DESCRIPTION,
-            asset_id=UserkbConfig.KB_ASSET_ID,
-            logger=generalLogger
-        )
-        setup_complete = True
-    except Exception as e:
-        traceback.print_exc()
-        generalLogger.error(repr(e))
-
-        # Wait x seconds before trying again
-        generalLogger.warning(
-            f"Waiting {UserkbConfig.SSA_TIMEOUT_SECONDS} seconds " \
-            "before trying the SSA setup again..."
-        )
-        sleep(UserkbConfig.SSA_TIMEOUT_SECONDS)
+ssa_adapters.add("userkb", lambda: UserkbSSA(
+    ga_url=UserkbConfig.GENERIC_ADAPTER_URL,
+    ss_email=UserkbConfig.USER_EMAIL,
+    ss_password=UserkbConfig.USER_PASSWORD,
+    kb_name=UserkbConfig.KB_NAME,
+    kb_description=UserkbConfig.KB_DESCRIPTION,
+    asset_id=UserkbConfig.KB_ASSET_ID,
+    logger=generalLogger
+))
+
+
+ssa_adapters.start()
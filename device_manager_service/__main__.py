@@ -1,36 +1,59 @@
 #!/usr/bin/env python3
 
 from waitress import serve
-from device_manager_service import connexionApp, app
+from device_manager_service import connexionApp, app, ssa_adapters
 from device_manager_service.accountEventConsumers import AccountEventConsumers
+from device_manager_service.recommendationOutbox import RecommendationOutbox
 
 from device_manager_service.ssa.ssa_threads import SSAThreads
+from device_manager_service.utils.health.readiness_checker import readiness, check_threads
+from device_manager_service.utils.validation.sampled_response_validator import SampledResponseValidator
 
 
 def main():
-    # Register our API in connexion
+    # Register our API in connexion. Responses are validated according to RESPONSE_VALIDATION
     connexionApp.add_api('openapi.yaml',
                          arguments={'title': 'Device Manager Service'},
                          pythonic_params=True,
-                         validate_responses=True)
+                         validate_responses=True,
+                         validator_map={'response': SampledResponseValidator})
 
     # Create the AccountEventConsumers object
     aec = AccountEventConsumers()
     # Start event threads
     aec.start()
 
+    # Send queued Energy Manager recommendation deletions
+    outbox = RecommendationOutbox()
+    outbox.start()
+
     # Instantiate SSA threads
     ssa_threads = SSAThreads()
     ssa_threads.start()
 
+    # Cached status served by /readyz and /health
+    readiness.add("kafka_consumer", lambda: check_threads(aec.threads))
+    readiness.add("ssa_threads", lambda: check_threads(ssa_threads.threads))
+    # Endpoints that need an adapter answer 503 themselves until it is registered
+    readiness.add(
+        "ssa_adapters",
+        lambda: (ssa_adapters.ready(*ssa_adapters.readiness()), ssa_adapters.readiness()),
+        required=False
+    )
+    readiness.start()
+
     # Start web server to serve our REST API (the program waits until an exit signal is received)
     serve(app, host='0.0.0.0', port=8080)
     
+    readiness.stop()
+
     ssa_threads.stop()
 
     # After the web server exists, stop the event threads
     aec.stop()
 
+    outbox.stop()
+
 
 if __name__ == '__main__':
     main()
@@ -3,11 +3,10 @@ import json
 import requests
 import time
 import uuid
-import asyncio
 import traceback
 
 from device_manager_service import Config
-from kafka import KafkaConsumer
+from kafka import KafkaConsumer, TopicPartition
 from kafka.errors import KafkaError
 from device_manager_service import generalLogger
 from device_manager_service.models.events import (
@@ -19,17 +18,55 @@ from device_manager_service.models.events import (
 )
 
 from marshmallow import ValidationError
-from device_manager_service.models.db_models import db, DBProcessedEvent, DBDongles, DBShiftableMachine
+from device_manager_service.models.db_models import db, DBDongles, DBShiftableMachine
 # from sqlalchemy import OperationalError, DatabaseError
 from sqlalchemy.exc import OperationalError, DatabaseError
+from prometheus_client import Counter, Gauge, Histogram
 
-from device_manager_service.utils.database.db_interactions import add_row_to_table, delete, add_and_commit
+from device_manager_service.utils.database.db_interactions import add_row_to_table, delete, commit_db_changes
+from device_manager_service.utils.database.device_metadata import invalidate_device_metadata
+from device_manager_service.utils.database.dongle_ownership import acquire_dongle, release_dongle, \
+    rebuild_dongle_ownership
+from device_manager_service.utils.database.processed_events import claim_events, claim_event, release_events, \
+    remember_events, prune_processed_events
+from device_manager_service.clients.hems_services.account_manager import iter_dongles
+from device_manager_service.clients.temporal.temporal_client import TemporalClient
 
-from temporalio.client import Client
 
 import influxdb_client
 
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+
+
+BATCH_SIZE = Histogram(
+    "kafka_account_events_batch_size",
+    "Events per batch polled from the account topic",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+BATCH_LATENCY = Histogram(
+    "kafka_account_events_batch_latency_seconds",
+    "Time spent processing one batch of account events"
+)
+EVENTS_PROCESSED = Counter(
+    "kafka_account_events_total",
+    "Account events consumed, per outcome",
+    ["outcome"]
+)
+DONGLE_OWNERSHIP_MISMATCHES = Gauge(
+    "dongle_ownership_mismatches",
+    "Dongle API keys whose local owner count differs from the account manager, at the last reconciliation"
+)
+
+
+# Events whose handlers call other services (EOT, Temporal, Influx)
+SIDE_EFFECT_EVENT_TYPES = frozenset([
+    UserAddedDongleApiKeyEventType,
+    UserUpdatedDongleApiKeyEventType,
+    UserHardDeletedEventType
+])
+
+# Long-lived Temporal connection, shared by all events
+temporal = TemporalClient(Config.TEMPORAL_URL)
 
 
 class AccountEventConsumers:
@@ -45,8 +82,22 @@ class AccountEventConsumers:
 
         self.threads['consumer'] = thread
 
+        thread = threading.Thread(name='processed_events_pruner',
+                                  target=pruner,
+                                  args=(self.exitEvent,))
+
+        self.threads['processed_events_pruner'] = thread
+
+        thread = threading.Thread(name='dongle_reconciler',
+                                  target=reconciler,
+                                  args=(self.exitEvent,))
+
+        self.threads['dongle_reconciler'] = thread
+
     # Start threads
     def start(self):
+        temporal.start()
+
         for thread in self.threads.values():
             thread.start()
 
@@ -59,6 +110,8 @@ class AccountEventConsumers:
             # logging.info('Waiting for ' + thread + ' to exit')
             thread.join()
 
+        temporal.stop()
+
 
 # Function that the thread is going to execute
 def consumer(exitEvent):
@@ -71,13 +124,13 @@ def consumer(exitEvent):
                 Config.KAFKA_ACCOUNT_TOPIC,
                 group_id=Config.KAFKA_GROUP_ID,
                 bootstrap_servers=Config.KAFKA_BROKER_ENDPOINT,
-                consumer_timeout_ms=Config.KAFKA_CONSUMER_TIMEOUT_MS,
                 enable_auto_commit=False,
                 auto_offset_reset='earliest',
                 reconnect_backoff_ms=1000,
                 reconnect_backoff_max_ms=5000,
                 session_timeout_ms=20000,
-                max_poll_records=50
+                max_poll_records=Config.KAFKA_BATCH_MAX_RECORDS,
+                max_poll_interval_ms=Config.KAFKA_MAX_POLL_INTERVAL_MS
             )
             # break
 
@@ -90,83 +143,339 @@ def consumer(exitEvent):
             time.sleep(Config.KAFKA_RECONNECT_SLEEP_SECONDS)
             continue
 
-        # if exitEvent.is_set():
-        #     generalLogger.info('Consumer received event. Exiting...')
-        #     return
-
-        start = time.time()
-        total_time = 0
-        # Consume events until the program receives an exit signal
-        while not exitEvent.wait(timeout=Config.KAFKA_WAIT_FOR_EVENT_SECONDS):
-
-            current_time = time.time()
-            if current_time - start >= 300:  # Log every x seconds
-                total_time += 300
-                generalLogger.info(
-                    f"Kafka Event Consumer thread is healthy for {total_time} seconds....")
-                start = current_time
-
-            try:
-                session = db.create_scoped_session()
-                msg = next(consumer)
-                processEvent(session, msg)
-                consumer.commit()
-
-            except StopIteration:
-                pass
-
-            except (OperationalError, DatabaseError) as e:
-                generalLogger.error(repr(e))
-                traceback.print_exc()
-                session.rollback()
-                session.close()
-                consumer.commit()
-                continue
+        try:
+            consumeBatches(consumer, exitEvent)
 
-            except Exception as e:
-                generalLogger.error(
-                    "Exception occured while listening for events")
-                generalLogger.error(e)
-                traceback.print_exc()
-                session.close()
-                break
+        except Exception as e:
+            generalLogger.error(
+                "Exception occured while listening for events")
+            generalLogger.error(e)
+            traceback.print_exc()
 
-            session.close()
             # Missing sending error event to other topic
 
-    # Close connection to the broker
-    consumer.close(autocommit=False)
+        finally:
+            # Close connection to the broker, also before reconnecting
+            consumer.close(autocommit=False)
+
+        if not exitEvent.is_set():
+            generalLogger.info(
+                f'Reconnecting in {Config.KAFKA_RECONNECT_SLEEP_SECONDS} seconds...'
+            )
+            exitEvent.wait(timeout=Config.KAFKA_RECONNECT_SLEEP_SECONDS)
+
     generalLogger.info('Consumer received event. Exiting...')
 
 
-def processEvent(session, message):
-    # Print the whole event
-    # print(message)
+def consumeBatches(consumer, exitEvent):
+    start = time.time()
+    total_time = 0
+    # Consume events until the program receives an exit signal
+    while not exitEvent.is_set():
+
+        current_time = time.time()
+        if current_time - start >= 300:  # Log every x seconds
+            total_time += 300
+            generalLogger.info(
+                f"Kafka Event Consumer thread is healthy for {total_time} seconds....")
+            start = current_time
+
+        # Blocks until events arrive or the poll timeout expires
+        records = consumer.poll(
+            timeout_ms=Config.KAFKA_POLL_TIMEOUT_MS,
+            max_records=Config.KAFKA_BATCH_MAX_RECORDS
+        )
+        messages = [message for partition_messages in records.values() for message in partition_messages]
+        if len(messages) == 0:
+            continue
+
+        with BATCH_LATENCY.time():
+            handled = processBatch(messages, time.monotonic() + Config.KAFKA_BATCH_MAX_SECONDS)
+
+        # Events not started in time are polled again, within max_poll_interval_ms
+        if handled < len(messages):
+            generalLogger.warning(
+                f"Processed {handled} of {len(messages)} events in {Config.KAFKA_BATCH_MAX_SECONDS} seconds, "
+                f"polling the rest again"
+            )
+            rewind(consumer, messages[handled:])
+
+        # Offsets of the processed events
+        consumer.commit()
+        BATCH_SIZE.observe(handled)
+
+
+def rewind(consumer, messages):
+    """Seek every partition back to its first message in messages."""
+    offsets = {}
+    for message in messages:
+        partition = TopicPartition(message.topic, message.partition)
+        offsets[partition] = min(offsets.get(partition, message.offset), message.offset)
 
+    for partition, offset in offsets.items():
+        consumer.seek(partition, offset)
+
+
+def pruner(exitEvent):
+    generalLogger.info("Starting processed events pruner...")
+
+    while not exitEvent.wait(timeout=Config.PROCESSED_EVENT_PRUNE_INTERVAL_SECONDS):
+        older_than = datetime.utcnow() - timedelta(days=Config.PROCESSED_EVENT_RETENTION_DAYS)
+
+        session = db.create_scoped_session()
+        try:
+            deleted = prune_processed_events(
+                session, older_than, Config.PROCESSED_EVENT_PRUNE_BATCH_SIZE
+            )
+            generalLogger.info(f"Pruned {deleted} processed events older than {older_than}")
+
+        except Exception as e:
+            traceback.print_exc()
+            generalLogger.error(f"Failed to prune processed events: {repr(e)}")
+            session.rollback()
+
+        finally:
+            session.close()
+
+    generalLogger.info("Processed events pruner stopped. Exiting...")
+
+
+def reconciler(exitEvent):
+    generalLogger.info("Starting dongle ownership reconciler...")
+
+    while not exitEvent.wait(timeout=Config.DONGLE_RECONCILE_INTERVAL_SECONDS):
+        session = db.create_scoped_session()
+        try:
+            reconcileDongleOwnership(session)
+
+        except Exception as e:
+            traceback.print_exc()
+            generalLogger.error(f"Failed to reconcile dongle ownership: {repr(e)}")
+            session.rollback()
+
+        finally:
+            session.close()
+
+    generalLogger.info("Dongle ownership reconciler stopped. Exiting...")
+
+
+def reconcileDongleOwnership(session):
+    """Recount the local dongle owners and compare them with the account manager.
+
+    Local counts are rebuilt from DBDongles, which the event stream keeps up
+    to date. Differences with the account manager (e.g. events not consumed
+    yet) are logged and exported as a metric, not applied.
+    """
+    # Read before locking the ownership table, so event processing is not blocked by HTTP calls
+    remote = {}
+    for dongle in iter_dongles(Config.DONGLE_RECONCILE_PAGE_SIZE):
+        if dongle.get("api_key"):
+            remote[dongle["api_key"]] = remote.get(dongle["api_key"], 0) + 1
+
+    local = rebuild_dongle_ownership(session)
+    session.commit()
+
+    mismatched = sorted(
+        api_key for api_key in set(local) | set(remote)
+        if local.get(api_key, 0) != remote.get(api_key, 0)
+    )
+    DONGLE_OWNERSHIP_MISMATCHES.set(len(mismatched))
+
+    if len(mismatched) > 0:
+        generalLogger.warning(
+            f"Owners of dongles {mismatched} differ from the account manager"
+        )
+
+    generalLogger.info(f"Reconciled ownership of {len(local)} dongles")
+
+
+def parseEvent(message):
     # Convert bytes to json and retrieve the "payload" field
     event = json.loads(message.value)
-    eventId = event["payload"]["eventId"]
-    eventType = payload = event["payload"]["eventType"]
-    payload = event["payload"]["payload"]
-
-    # Check if event has already been processed
-    processedEvent = session.query(DBProcessedEvent).filter_by(
-        event_type=eventType, event_id=eventId).first()
-    if (processedEvent != None):
+
+    # Canonical UUID string, the key of the processed events store
+    eventId = str(uuid.UUID(event["payload"]["eventId"]))
+
+    return eventId, event["payload"]["eventType"], event["payload"]["payload"]
+
+
+def processBatch(messages, deadline=None):
+    """Process a batch of polled events in as few transactions as possible.
+
+    Events calling other services (EOT, Temporal, Influx) are committed at
+    most KAFKA_SIDE_EFFECT_BATCH_MAX_EVENTS at a time, so one transaction,
+    and the dongle ownership row locks it holds, is not kept open through
+    hundreds of external calls. No event is started after deadline (a
+    time.monotonic() value), except the first one.
+
+    Returns how many messages, from the first one, were processed.
+    """
+    handled = 0
+    chunk = []
+    side_effects = 0
+    for index, message in enumerate(messages):
+        try:
+            event = parseEvent(message)
+        except (ValueError, KeyError, TypeError) as e:
+            generalLogger.error(f"Failed to parse event: {repr(e)}")
+            EVENTS_PROCESSED.labels(outcome="invalid").inc()
+            event = None
+
+        if event is not None:
+            chunk.append((index, event))
+            if event[1] in SIDE_EFFECT_EVENT_TYPES:
+                side_effects += 1
+        elif len(chunk) == 0:
+            handled = index + 1
+
+        if len(chunk) > 0 and (
+            side_effects >= Config.KAFKA_SIDE_EFFECT_BATCH_MAX_EVENTS or index == len(messages) - 1
+        ):
+            if handled > 0 and _expired(deadline):
+                return handled
+
+            processed = processEvents([event for _, event in chunk], deadline)
+            if processed < len(chunk):
+                return chunk[processed][0]
+
+            handled = index + 1
+            chunk = []
+            side_effects = 0
+
+    return len(messages)
+
+
+def _expired(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def processEvents(events, deadline=None):
+    """Process parsed events in a single transaction.
+
+    All events are claimed with one statement, and the ones already
+    processed are skipped. If any event fails, the transaction is rolled
+    back and the events are processed again one by one, each in its own
+    transaction, so a single bad event does not block the others. No event
+    is started after deadline, except the first one.
+
+    Args:
+        events (list): (eventId, eventType, payload) tuples
+        deadline (float): time.monotonic() value, or None
+
+    Returns how many events, from the first one, were processed.
+    """
+    processed = 0
+    session = db.create_scoped_session()
+    try:
+        claimed = claim_events(session, [(eventType, eventId) for eventId, eventType, _ in events])
+
+        batch_ok = True
+        stale_devices = []
+        for eventId, eventType, payload in events:
+            if processed > 0 and _expired(deadline):
+                break
+
+            processed += 1
+            if (eventType, eventId) not in claimed:
+                generalLogger.error("Event " + eventType + "/" +
+                                    eventId + " already processed")
+                EVENTS_PROCESSED.labels(outcome="duplicate").inc()
+                continue
+
+            # Duplicates inside the batch
+            claimed.remove((eventType, eventId))
+
+            ok, event_stale_devices = handleEvent(session, eventId, eventType, payload)
+            if not ok:
+                batch_ok = False
+                break
+            stale_devices.extend(event_stale_devices)
+
+        if batch_ok:
+            # Events left for the next poll are not processed yet
+            release_events(session, claimed)
+
+            error_msg = f"Failed to commit batch of {processed} events"
+            batch_ok = commit_db_changes(session, error_msg) == 200
+
+    except (OperationalError, DatabaseError) as e:
+        generalLogger.error(repr(e))
+        traceback.print_exc()
+        batch_ok = False
+
+    finally:
+        session.rollback()
+        session.close()
+
+    if batch_ok:
+        invalidate_device_metadata(*stale_devices)
+        remember_events(*[(eventType, eventId) for eventId, eventType, _ in events[:processed]])
+        EVENTS_PROCESSED.labels(outcome="batch").inc(processed)
+        return processed
+
+    generalLogger.warning(f"Batch of {len(events)} events failed. Processing them one by one...")
+    for processed, (eventId, eventType, payload) in enumerate(events):
+        if processed > 0 and _expired(deadline):
+            return processed
+
+        session = db.create_scoped_session()
+        try:
+            processEvent(session, eventId, eventType, payload)
+
+        except (OperationalError, DatabaseError) as e:
+            generalLogger.error(repr(e))
+            traceback.print_exc()
+
+        finally:
+            session.rollback()
+            session.close()
+
+    return len(events)
+
+
+def processEvent(session, eventId, eventType, payload):
+    # Mark the event as processed, unless it already is
+    if not claim_event(session, eventType, eventId):
         generalLogger.error("Event " + eventType + "/" +
                             eventId + " already processed")
+        EVENTS_PROCESSED.labels(outcome="duplicate").inc()
         return
 
+    ok, stale_devices = handleEvent(session, eventId, eventType, payload)
+    if ok:
+        error_msg = f"Failed to commit event {eventType}/{eventId}"
+        if commit_db_changes(session, error_msg) == 200:
+            invalidate_device_metadata(*stale_devices)
+            remember_events((eventType, eventId))
+            EVENTS_PROCESSED.labels(outcome="single").inc()
+            return
+
+    EVENTS_PROCESSED.labels(outcome="failed").inc()
+
+
+def handleEvent(session, eventId, eventType, payload):
+    """Apply one claimed event to the session, without committing.
+
+    Returns (ok, stale_devices). If ok is False the event failed, and its
+    changes must not be committed. stale_devices are the serial numbers of
+    devices changed by the event, whose cached metadata must be invalidated
+    once the changes are committed.
+    """
     generalLogger.info(f"Processing event {eventId} / {eventType}")
     try:
         if eventType == UserAddedDongleApiKeyEventType or eventType == UserUpdatedDongleApiKeyEventType:
-            processUserUpdatedDongleApiKeyEvent(
-                session, eventId, eventType, payload)
+            return processUserUpdatedDongleApiKeyEvent(
+                session, eventId, eventType, payload), []
         if eventType == UserHardDeletedEventType:
-            processUserHardDeletedEvent(session, eventId, eventType, payload)
+            return processUserHardDeletedEvent(session, eventId, eventType, payload)
+    except (OperationalError, DatabaseError):
+        raise
     except Exception as e:
         generalLogger.error(e)
         print(traceback.format_exc())
+        return False, []
+
+    return True, []
 
 
 def processUserUpdatedDongleApiKeyEvent(session, eventId, eventType, payload):
@@ -176,7 +485,7 @@ def processUserUpdatedDongleApiKeyEvent(session, eventId, eventType, payload):
         payload = dongleSchema.loads(payload)
     except ValidationError as err:
         generalLogger.error(f"Failed to parse event payload: {err.messages}")
-        return
+        return True
 
     headers = {
         "X-Correlation-ID": str(uuid.uuid4())
@@ -209,54 +518,50 @@ def processUserUpdatedDongleApiKeyEvent(session, eventId, eventType, payload):
         error_msg = f"Failed to add dongle {payload['api_key']} to DB"
         response_code = add_row_to_table(session, dongle, error_msg)
         if response_code != 200:
-            return
+            return False
+
+    # Same key again: releasing and acquiring it would cancel the workflow
+    # and then fail to start another one with the same id
+    if (dongle.api_key == payload["api_key"]):
+        generalLogger.info(
+            f"Dongle {payload['api_key']} already registered for the user, skipping event {eventId} / {eventType}")
+
+        return True
 
     # If he has an API key already, then stop the old one from monitoring
     if (dongle.api_key != None):
-        asyncio.run(removeDongleFromTemporal(session, dongle.api_key))
+        removeDongleFromTemporal(session, dongle.api_key)
         dongle.api_key = None
 
     URL = "https://api.eot.pt/api/meter/feed.json?key=" + \
         payload["api_key"] + \
         "&results=1&channels[]=iap_diff&channels[]=ivl1&channels[]=ivl2&channels[]=ivl3"
 
-    r = requests.get(URL)
+    # Bounded, the event transaction is open meanwhile
+    r = requests.get(
+        URL, timeout=(Config.HTTP_CONNECT_TIMEOUT_SECONDS, Config.REQUEST_TIMEOUT_SECONDS)
+    )
     if (r.status_code != 200):
         generalLogger.error(
             f"URL check {URL} returned error status code {r.status_code}")
-        processedEvent = DBProcessedEvent(
-            event_type=eventType, event_id=eventId)
-
-        error_msg = f"Failed to add processed event {eventType}/{eventId} to DB"
-        response_code = add_and_commit(session, processedEvent, error_msg)
 
-        return
+        return True
 
     if (r.text == '-1'):
         generalLogger.error(f"URL check {URL} returned error: {r.text}")
-        processedEvent = DBProcessedEvent(
-            event_type=eventType, event_id=eventId)
 
-        error_msg = f"Failed to add processed event {eventType}/{eventId} to DB"
-        response_code = add_and_commit(session, processedEvent, error_msg)
-
-        return
+        return True
 
-    asyncio.run(addDongleToTemporal(session, payload["api_key"]))
+    addDongleToTemporal(session, payload["api_key"])
 
     dongle.api_key = payload["api_key"]
 
-    # Save the event has processed
-    processedEvent = DBProcessedEvent(event_type=eventType, event_id=eventId)
-
-    error_msg = f"Failed to add processed event {eventType}/{eventId} to DB"
-    response_code = add_and_commit(session, processedEvent, error_msg)
-
     generalLogger.info(f"Successfully processed event {eventId} / {eventType}")
 
-    return
+    return True
 
 
+# Returns (ok, serial numbers of the deleted devices)
 def processUserHardDeletedEvent(session, eventId, eventType, payload):
     generalLogger.info(f"Event Consumed: {eventType}\n")
 
@@ -266,7 +571,7 @@ def processUserHardDeletedEvent(session, eventId, eventType, payload):
         payload = userSchema.loads(payload)
     except ValidationError as err:
         generalLogger.error(f"Failed to parse event payload: {err.messages}")
-        return
+        return True, []
 
     # client = await Client.connect(Config.TEMPORAL_URL)
 
@@ -288,12 +593,12 @@ def processUserHardDeletedEvent(session, eventId, eventType, payload):
     if (dongle != None):
         # If he has an API key, then stop it from monitoring
         if (dongle.api_key != None):
-            asyncio.run(removeDongleFromTemporal(session, dongle.api_key))
+            removeDongleFromTemporal(session, dongle.api_key)
 
         error_msg = f"Failed to delete dongle {dongle.api_key} from DB"
         response_code = delete(session, dongle, error_msg)
         if response_code != 200:
-            return
+            return False, []
 
     # Delete data from influx, meter_id and api_key
     client = influxdb_client.InfluxDBClient(
@@ -313,35 +618,26 @@ def processUserHardDeletedEvent(session, eventId, eventType, payload):
     # Delete data from tables
     # settings = session.query(DBUserSettings).filter_by(user_id=payload['user_id']).first()
     # session.query(DBNotDisturb).filter_by(settings_id=settings.id).delete()
+    deleted_devices = [
+        row.serial_number for row in session.query(DBShiftableMachine.serial_number).filter_by(
+            user_id=payload['user_id']).all()
+    ]
     session.query(DBShiftableMachine).filter_by(user_id=payload['user_id']).delete()
     session.query(DBDongles).filter_by(user_id=payload['user_id']).delete()
 
-    # Save the event has processed
-    processedEvent = DBProcessedEvent(event_type=eventType, event_id=eventId)
-
-    error_msg = f"Failed to add processed event {eventType}/{eventId} to DB"
-    response_code = add_and_commit(session, processedEvent, error_msg)
-    if response_code != 200:
-        return
-
     generalLogger.info(f"Successfully processed event {eventId} / {eventType}")
 
-    return
+    return True, deleted_devices
 
 
-async def addDongleToTemporal(session, deviceId):
-    dongles = session.query(DBDongles).filter_by(api_key=deviceId).all()
-    if (len(dongles) > 0):
+def addDongleToTemporal(session, deviceId):
+    if acquire_dongle(session, deviceId) > 1:
         generalLogger.info(
             f"Not adding dongle with API key {deviceId} because another user also has it")
         return True
 
-    client = await Client.connect(Config.TEMPORAL_URL)
-
-    workflowID = Config.TEMPORAL_WORKFLOW_ID_PREFIX + deviceId
-
     try:
-        handle = await client.start_workflow("EOTMonitorDevice", args=[deviceId], id=workflowID, task_queue=Config.TEMPORAL_DONGLE_TASK_QUEUE)
+        handle = temporal.run("start_workflow", startMonitorWorkflow, deviceId)
         generalLogger.info(
             f'Started to monitor dongle for API key {deviceId}: {handle.id}, {handle.run_id}')
     except Exception as e:
@@ -352,37 +648,29 @@ async def addDongleToTemporal(session, deviceId):
     return True
 
 
-async def removeDongleFromTemporal(session, deviceId):
-    dongles = session.query(DBDongles).filter_by(api_key=deviceId).all()
-    if (len(dongles) > 1):
-        generalLogger.info(
-            f"Not removing dongle with API key {deviceId} because another user also has it")
-        return True
+async def startMonitorWorkflow(client, deviceId):
+    workflowID = Config.TEMPORAL_WORKFLOW_ID_PREFIX + deviceId
 
-    headers = {
-        "X-Correlation-ID": "b2fdda1b-9550-4afd-9b3d-d180a6398986",
-    }
-    generalLogger.info(f"Getting list of dongles from account manager...")
-    dongles_response = requests.get(
-        Config.ACCOUNT_MANAGER_ENDPOINT + "/list-dongles",
-        headers=headers
-    )
+    return await client.start_workflow("EOTMonitorDevice", args=[deviceId], id=workflowID, task_queue=Config.TEMPORAL_DONGLE_TASK_QUEUE)
 
-    dongles = dongles_response.json()
-    userIds = []
 
-    for dongle in dongles:
-        if dongle["api_key"] == deviceId:
-            userIds.append(dongle["user_id"])
+def removeDongleFromTemporal(session, deviceId):
+    # The user still holds deviceId in DBDongles
+    if release_dongle(session, deviceId) > 0:
+        generalLogger.info(
+            f"Not removing dongle with API key {deviceId} because another user also has it")
+        return True
 
-    # If after the user removed his dongle id someone still has that api_key, return
-    if len(userIds) > 0:
+    try:
+        return temporal.run("cancel_workflow", cancelMonitorWorkflows, deviceId)
+    except Exception as e:
         generalLogger.error(
-            f'Dongle with ID {deviceId} registered with more than one user')
-        return True
+            f'Failed to stop EOT Workflow for API key {deviceId}')
+        generalLogger.error(e)
+        return False
 
-    client = await Client.connect(Config.TEMPORAL_URL)
 
+async def cancelMonitorWorkflows(client, deviceId):
     workflowID = Config.TEMPORAL_WORKFLOW_ID_PREFIX + deviceId
     workflows = client.list_workflows(
         query=f'WorkflowId = "{workflowID}" and ExecutionStatus = "Running"')
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from prometheus_client import Histogram
+
+from device_manager_service import Config
+
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_latency_seconds",
+    "Latency of HTTP calls to other services, per upstream",
+    ["upstream", "method", "status"]
+)
+
+# Idempotent methods are retried on connection errors and on these status codes
+RETRY_STATUS_CODES = [502, 503, 504]
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+# Only these are also retried after a read timeout: a PUT or DELETE that timed out
+# may have been applied, and each attempt can wait the whole read timeout
+READ_RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+
+class JitteredRetry(Retry):
+    """Exponential backoff, with each wait drawn at random up to its full value.
+
+    Spreads the retries of concurrent requests that failed together, instead of
+    sending them back to the upstream in lockstep. Read errors are only
+    retried for READ_RETRY_METHODS.
+    """
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+
+        return random.uniform(0, backoff)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if error is not None and self._is_read_error(error) \
+                and (method or "").upper() not in READ_RETRY_METHODS:
+            raise error.with_traceback(_stacktrace)
+
+        return super().increment(
+            method=method, url=url, response=response, error=error, _pool=_pool, _stacktrace=_stacktrace
+        )
+
+
+def retry_policy():
+    """Retry configuration of the upstream sessions."""
+    return JitteredRetry(
+        total=Config.HTTP_RETRIES,
+        backoff_factor=Config.HTTP_RETRY_BACKOFF_SECONDS,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        raise_on_status=False,
+    )
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_for(url):
+    """One keep-alive session per upstream host, shared by all threads."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                max_retries=retry_policy(),
+            )
+
+            session = requests.Session()
+            session.mount(f"{parts.scheme}://", adapter)
+            _sessions[key] = session
+
+    return session
+
+
+def http_request(method, url, upstream, **kwargs):
+    """Send a request through the pooled session of the url host.
+
+    Idempotent methods are retried with jittered backoff, and only GET,
+    HEAD and OPTIONS after a read timeout. Other methods (e.g. POST) are
+    sent once. Connect and read timeouts are set separately
+    unless timeout is given.
+
+    Args:
+        method (str): HTTP method
+        url (str): Full request url
+        upstream (str): Upstream service name, used as metric label
+        kwargs: Passed to requests (params, json, headers, ...)
+
+    Returns the requests.Response. Raises requests exceptions like requests does.
+    """
+    kwargs.setdefault(
+        "timeout", (Config.HTTP_CONNECT_TIMEOUT_SECONDS, Config.REQUEST_TIMEOUT_SECONDS)
+    )
+
+    status = "error"
+    start = time.perf_counter()
+    try:
+        response = _session_for(url).request(method.upper(), url, **kwargs)
+        status = str(response.status_code)
+
+        return response
+
+    finally:
+        UPSTREAM_LATENCY.labels(
+            upstream=upstream, method=method.upper(), status=status
+        ).observe(time.perf_counter() - start)
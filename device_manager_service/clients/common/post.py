@@ -1,47 +1,41 @@
 import requests
 
 from device_manager_service import logger, Config
+from device_manager_service.clients.common.http_client import http_request
 
 
-def http_request_with_error_handling(method, host, headers, query_params, request_body, x_correlation_id):
-    
+def http_request_with_error_handling(method, host, headers, query_params, request_body, x_correlation_id, upstream="energy_manager"):
+
     try:
-        if method == "post":
-            response = requests.post(
-                host, 
-                headers = headers, 
-                params = query_params,
-                json = request_body,
-                timeout=Config.REQUEST_TIMEOUT_SECONDS
-            )
-        elif method == "delete":
-            response = requests.delete(
-                host, 
-                headers = headers, 
+        if method in ["post", "delete"]:
+            response = http_request(
+                method,
+                host,
+                upstream,
+                headers = headers,
                 params = query_params,
-                json = request_body,
-                timeout=Config.REQUEST_TIMEOUT_SECONDS
+                json = request_body
             )
         else:
             raise Exception("Method not supported")
 
-    except requests.exceptions.ConnectTimeout:
+    except requests.exceptions.Timeout:
         logger.error(
             f"Request to {host} timed out after {Config.REQUEST_TIMEOUT_SECONDS}.",
             extra=x_correlation_id
         )
-        
+
         # Create an empty response with status code 408
         response = requests.Response()
         response.status_code = 408
-        response._content = b'{"error": "Request to ' + host + ' timed out."}'
+        response._content = f'{{"error": "Request to {host} timed out."}}'.encode()
 
     except Exception as e:
         logger.error(f"Request to {host} failed:\n{repr(e)}", extra=x_correlation_id)
-        
+
         response = requests.Response()
         response.status_code = 500
-        response.content = b'{"error": "Request to ' + host + ' timed out."}'
-    
-    
-    return response
\ No newline at end of file
+        response._content = f'{{"error": "Request to {host} failed."}}'.encode()
+
+
+    return response
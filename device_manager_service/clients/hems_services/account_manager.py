@@ -0,0 +1,55 @@
+import uuid
+
+from device_manager_service import logger, Config
+from device_manager_service.clients.common.http_client import http_request
+
+
+def list_dongles_page(offset, limit, cor_id = None):
+    """One page of the (user_id, api_key) pairs registered in the account manager.
+
+    Raises requests exceptions on connection errors and error status codes.
+    """
+    if cor_id is None:
+        cor_id = {"X-Correlation-ID": str(uuid.uuid4())}
+
+    logger.debug(
+        f'AccountManagerService: List dongles from offset {offset} (limit {limit})',
+        extra=cor_id
+    )
+
+    response = http_request(
+        "get",
+        Config.ACCOUNT_MANAGER_ENDPOINT + "/list-dongles",
+        "account_manager",
+        headers={
+            'accept': 'application/json',
+            'X-Correlation-ID': cor_id["X-Correlation-ID"]
+        },
+        params={"offset": offset, "limit": limit}
+    )
+    response.raise_for_status()
+
+    return response.json()
+
+
+def iter_dongles(page_size, cor_id = None):
+    """Yield every dongle of the account manager, page by page.
+
+    Stops at the first page shorter than page_size. If the account manager
+    ignores the paging parameters, every page holds the whole list, so it
+    also stops at the first page equal to the previous one (not yielded).
+    """
+    offset = 0
+    previous_page = None
+    while True:
+        page = list_dongles_page(offset, page_size, cor_id)
+        if page == previous_page:
+            return
+
+        yield from page
+
+        if len(page) != page_size:
+            return
+
+        previous_page = page
+        offset += page_size
@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+from temporalio.client import Client
+from temporalio.service import RPCError, RPCStatusCode
+from prometheus_client import Histogram
+
+from device_manager_service import Config, generalLogger
+
+
+TEMPORAL_LATENCY = Histogram(
+    "temporal_workflow_operation_latency_seconds",
+    "Latency of workflow operations sent to Temporal",
+    ["operation", "outcome"]
+)
+
+# The channel is dropped and connected again on these errors
+RECONNECT_STATUS_CODES = (RPCStatusCode.UNAVAILABLE, RPCStatusCode.UNKNOWN)
+
+
+class TemporalClient:
+    def __init__(self, url):
+        """Temporal client shared by the synchronous Kafka handlers.
+
+        The client and its gRPC channel live in one asyncio loop, run by a
+        background thread for the life of the service. Handlers submit
+        coroutines to it with run() instead of building a new loop and a new
+        connection for each event. The connection is opened on first use and
+        opened again after a connection error.
+
+        Args:
+            url (str): Temporal frontend address (host:port)
+        """
+        self.url = url
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+    # Start the loop thread. Called by run() if needed
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                name="TemporalClient", target=self._run_loop, daemon=True
+            )
+            self._thread.start()
+
+    # Stop the loop and wait for its thread to exit
+    def stop(self):
+        with self._lock:
+            if self._thread is None:
+                return
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+            self._loop = None
+            self._thread = None
+            self._client = None
+
+    def run(self, operation, coroutine_function, *args):
+        """Run coroutine_function(client, *args) in the client loop and return its result.
+
+        Blocks the calling thread until it finishes or
+        TEMPORAL_RPC_TIMEOUT_SECONDS pass. The call is retried once on a new
+        connection if the connection failed.
+
+        Args:
+            operation (str): Operation name, used as metric label
+        """
+        self.start()
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._call(operation, coroutine_function, *args), self._loop
+        )
+        try:
+            return future.result(timeout=Config.TEMPORAL_RPC_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _connect(self):
+        if self._client is None:
+            generalLogger.info(f"Connecting to Temporal at {self.url}...")
+            self._client = await Client.connect(self.url)
+
+        return self._client
+
+    async def _call(self, operation, coroutine_function, *args):
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            for attempt in range(2):
+                try:
+                    client = await self._connect()
+                    result = await coroutine_function(client, *args)
+                    # Operations report handled failures by returning False
+                    outcome = "error" if result is False else "ok"
+
+                    return result
+
+                except RPCError as e:
+                    if e.status not in RECONNECT_STATUS_CODES or attempt == 1:
+                        raise
+
+                    generalLogger.warning(f"Temporal connection failed ({repr(e)}). Reconnecting...")
+                    self._client = None
+
+                except RuntimeError:
+                    # Client.connect raises RuntimeError if the server is unreachable
+                    self._client = None
+                    raise
+
+        finally:
+            TEMPORAL_LATENCY.labels(
+                operation=operation, outcome=outcome
+            ).observe(time.perf_counter() - start)
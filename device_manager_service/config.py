@@ -64,6 +64,8 @@ class Config:
     TEMPORAL_URL = os.environ.get('TEMPORAL_URL', '127.0.0.1:7233')
     TEMPORAL_DONGLE_TASK_QUEUE = os.environ.get('TEMPORAL_DONGLE_TASK_QUEUE', "DONGLES_WORKFLOW_TASK_QUEUE")
     TEMPORAL_WORKFLOW_ID_PREFIX= os.environ.get('TEMPORAL_WORKFLOW_ID_PREFIX', "dongle-workflow-")
+    # Time an event handler waits for a workflow start or cancel
+    TEMPORAL_RPC_TIMEOUT_SECONDS = float(os.environ.get('TEMPORAL_RPC_TIMEOUT_SECONDS', '30'))
 
 
     ### METRICS ###
@@ -72,6 +74,13 @@ class Config:
     LOG_FORMAT = logging.getLevelName(os.environ.get('LOG_FORMAT', 'text'))
     OC_AGENT_ENDPOINT = os.environ.get('OC_AGENT_ENDPOINT', '127.0.0.1:6831')
     REQUEST_TIMEOUT_SECONDS = int(os.environ.get('REQUEST_TIMEOUT_SECONDS', '10'))
+    # Calls to other services (Energy Manager, Account Manager). REQUEST_TIMEOUT_SECONDS is the read timeout
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', '3'))
+    # Kept-alive connections per upstream host
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '20'))
+    # Retries of idempotent calls (GET, DELETE, ...) on connection errors, 502, 503 and 504. GET also on read errors
+    HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '3'))
+    HTTP_RETRY_BACKOFF_SECONDS = float(os.environ.get('HTTP_RETRY_BACKOFF_SECONDS', '0.2'))
 
 
     ### KAFKA + DEBEZIUM ###
@@ -85,7 +94,28 @@ class Config:
     # How many seconds to wait for an exit event
     KAFKA_WAIT_FOR_EVENT_SECONDS = 0.01
     KAFKA_CONSUMER_TIMEOUT_MS = 100
+    # Events are polled and processed in batches of up to KAFKA_BATCH_MAX_RECORDS, one DB transaction per batch
+    KAFKA_BATCH_MAX_RECORDS = int(os.environ.get('KAFKA_BATCH_MAX_RECORDS', '200'))
+    KAFKA_POLL_TIMEOUT_MS = int(os.environ.get('KAFKA_POLL_TIMEOUT_MS', '500'))
+    # Events calling other services (EOT, Temporal, Influx) are committed at most this many per transaction
+    KAFKA_SIDE_EFFECT_BATCH_MAX_EVENTS = int(os.environ.get('KAFKA_SIDE_EFFECT_BATCH_MAX_EVENTS', '10'))
+    # No event of a polled batch is started after this many seconds, the rest is polled again
+    KAFKA_BATCH_MAX_SECONDS = float(os.environ.get('KAFKA_BATCH_MAX_SECONDS', '30'))
+    # Worst case of one event: EOT check and two Temporal calls, each retried once
+    KAFKA_EVENT_MAX_SECONDS = float(os.environ.get(
+        'KAFKA_EVENT_MAX_SECONDS',
+        str(HTTP_CONNECT_TIMEOUT_SECONDS + REQUEST_TIMEOUT_SECONDS + 4 * TEMPORAL_RPC_TIMEOUT_SECONDS)
+    ))
+    # A batch ends at most two events after KAFKA_BATCH_MAX_SECONDS (one in the batch transaction, one alone after it fails)
+    KAFKA_MAX_POLL_INTERVAL_MS = int(os.environ.get(
+        'KAFKA_MAX_POLL_INTERVAL_MS',
+        str(int((KAFKA_BATCH_MAX_SECONDS + 2 * KAFKA_EVENT_MAX_SECONDS) * 1000))
+    ))
     KAFKA_RECONNECT_SLEEP_SECONDS = 5
+    # Processed event ids are kept this long to drop redelivered events. Must exceed the topic retention
+    PROCESSED_EVENT_RETENTION_DAYS = float(os.environ.get('PROCESSED_EVENT_RETENTION_DAYS', '30'))
+    PROCESSED_EVENT_PRUNE_INTERVAL_SECONDS = float(os.environ.get('PROCESSED_EVENT_PRUNE_INTERVAL_SECONDS', '3600'))
+    PROCESSED_EVENT_PRUNE_BATCH_SIZE = int(os.environ.get('PROCESSED_EVENT_PRUNE_BATCH_SIZE', '5000'))
 
     KAFKA_ACCOUNT_TOPIC_SUFFIX = 'user-account'
     KAFKA_ACCOUNT_TOPIC = KAFKA_TOPIC_PREFIX + KAFKA_ACCOUNT_TOPIC_SUFFIX
@@ -107,15 +137,72 @@ class Config:
     JWT_SIGN_ALGORITHM = 'HS512'
     JWT_EXPIRATION_TIME_SECONDS = 14 * 24 * 60 * 60
     JWT_SIGN_KEY = os.environ.get('JWT_SIGN_KEY', 'jwt_sign_key')
+    # Verified tokens are reused until they expire or for this long, whichever comes first. 0 disables the cache
+    AUTH_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_CACHE_TTL_SECONDS', '30'))
+    AUTH_CACHE_MAX_SIZE = int(os.environ.get('AUTH_CACHE_MAX_SIZE', '10000'))
+
+    # Local dongle owner counts are checked against the account manager this often, reading this many dongles per request
+    DONGLE_RECONCILE_INTERVAL_SECONDS = float(os.environ.get('DONGLE_RECONCILE_INTERVAL_SECONDS', '3600'))
+    DONGLE_RECONCILE_PAGE_SIZE = int(os.environ.get('DONGLE_RECONCILE_PAGE_SIZE', '500'))
 
     # ENERGY MANAGER
     ENERGY_MANAGER_ENDPOINT = os.environ.get('ENERGY_MANAGER_ENDPOINT', 'http://localhost:8083/api/energy_manager_service')
+    # Recommendation deletions are queued in an outbox table and sent in batches by a background thread
+    OUTBOX_POLL_SECONDS = float(os.environ.get('OUTBOX_POLL_SECONDS', '1'))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '50'))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '10'))
+    OUTBOX_RETRY_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_RETRY_BACKOFF_SECONDS', '2'))
+    OUTBOX_RETRY_MAX_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_RETRY_MAX_BACKOFF_SECONDS', '300'))
+    # Claimed deletions are sent again after this long if their outcome was not saved. Must exceed the time to send a batch
+    OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', '600'))
+
+    # POOLS
+    # Time zone of the day-ahead pool boundaries, when the request does not set one
+    POOL_TIME_ZONE = os.environ.get('POOL_TIME_ZONE', 'UTC')
+    # Rows fetched per round trip by the fleet-wide pool export cursor
+    POOL_EXPORT_YIELD_PER = int(os.environ.get('POOL_EXPORT_YIELD_PER', '1000'))
+    # Size of the chunks written to the pool export response
+    POOL_EXPORT_CHUNK_BYTES = int(os.environ.get('POOL_EXPORT_CHUNK_BYTES', '65536'))
+
+    # HEALTH
+    # Readiness checks run in the background this often. /readyz reports unready if the last run is older than READINESS_MAX_AGE_SECONDS
+    READINESS_CHECK_INTERVAL_SECONDS = float(os.environ.get('READINESS_CHECK_INTERVAL_SECONDS', '5'))
+    READINESS_MAX_AGE_SECONDS = float(os.environ.get('READINESS_MAX_AGE_SECONDS', '30'))
+
+    # RESPONSE VALIDATION
+    # Responses checked against openapi.yaml: full (all), sampled (RESPONSE_VALIDATION_SAMPLE_RATE of them) or off
+    RESPONSE_VALIDATION = os.environ.get('RESPONSE_VALIDATION', 'sampled')
+    RESPONSE_VALIDATION_SAMPLE_RATE = float(os.environ.get('RESPONSE_VALIDATION_SAMPLE_RATE', '0.01'))
+    # Per endpoint policy, e.g. "schedule_cycle_by_user_get=off,device_get=full,pool_by_user_get=0.1"
+    RESPONSE_VALIDATION_OVERRIDES = os.environ.get('RESPONSE_VALIDATION_OVERRIDES', '')
+    # Failures are counted and logged. If True, the request also fails with a 500
+    RESPONSE_VALIDATION_FAIL_REQUESTS = True if os.environ.get("RESPONSE_VALIDATION_FAIL_REQUESTS", "False").lower() == "true" else False
+
+    # CACHES
+    # Device metadata (owner, brand, type, SSA) cached by serial number. 0 disables the cache
+    DEVICE_CACHE_TTL_SECONDS = float(os.environ.get('DEVICE_CACHE_TTL_SECONDS', '300'))
+    DEVICE_CACHE_MAX_SIZE = int(os.environ.get('DEVICE_CACHE_MAX_SIZE', '10000'))
+    # Recently processed event ids, checked before the processed_events table. 0 disables the cache
+    PROCESSED_EVENT_CACHE_TTL_SECONDS = float(os.environ.get('PROCESSED_EVENT_CACHE_TTL_SECONDS', '3600'))
+    PROCESSED_EVENT_CACHE_MAX_SIZE = int(os.environ.get('PROCESSED_EVENT_CACHE_MAX_SIZE', '10000'))
 
     # SSA CONFIG
+    # Adapter registration retries wait twice as long each time, up to SSA_BOOTSTRAP_MAX_BACKOFF_SECONDS
+    SSA_BOOTSTRAP_INITIAL_BACKOFF_SECONDS = float(os.environ.get('SSA_BOOTSTRAP_INITIAL_BACKOFF_SECONDS', '1'))
+    SSA_BOOTSTRAP_MAX_BACKOFF_SECONDS = float(os.environ.get('SSA_BOOTSTRAP_MAX_BACKOFF_SECONDS', '60'))
     SPINE_USE_RECIPIENT_SELECTOR = True if os.environ.get("SPINE_USE_RECIPIENT_SELECTOR", "true").lower() == "true" else False
     
     WP_THREAD = True if os.environ.get("WP_THREAD", "true").lower() == "true" else False
     BSH_THREAD = True if os.environ.get("BSH_THREAD", "true").lower() == "true" else False
+    # Workers processing binding sets received by each reactive SSA, and queued binding sets per worker
+    SSA_REACTIVE_WORKERS = int(os.environ.get('SSA_REACTIVE_WORKERS', '4'))
+    SSA_REACTIVE_QUEUE_SIZE = int(os.environ.get('SSA_REACTIVE_QUEUE_SIZE', '100'))
+    # Connection state changes are buffered and written once per window. 0 writes every change right away
+    CONNECTION_STATE_COALESCE_SECONDS = float(os.environ.get('CONNECTION_STATE_COALESCE_SECONDS', '2'))
+    # Delay requests are sent to different devices in parallel, with at most this many at once per SSA adapter
+    DELAY_DISPATCH_WORKERS = int(os.environ.get('DELAY_DISPATCH_WORKERS', '16'))
+    BSH_DELAY_CONCURRENCY = int(os.environ.get('BSH_DELAY_CONCURRENCY', '4'))
+    WP_DELAY_CONCURRENCY = int(os.environ.get('WP_DELAY_CONCURRENCY', '4'))
 
     # Influx DB
     INFLUX_URL = os.environ.get('INFLUX_URL', '127.0.0.1')
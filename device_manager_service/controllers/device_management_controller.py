@@ -1,5 +1,5 @@
 from datetime import datetime
-import connexion, json, time
+import connexion, json
 
 from device_manager_service import auth, logger, db, app, Config
 
@@ -18,11 +18,13 @@ from device_manager_service.models import (
 from device_manager_service.models.db_models import DBShiftableMachine, DBNotDisturb
 
 from device_manager_service.utils.logs import logErrorResponse, logResponse
-from device_manager_service.utils.date.seconds_to_days_minutes_hours import seconds_to_days_minutes_hours
-from device_manager_service.utils.database.db_interactions import delete, commit_db_changes, delete_and_commit
+from device_manager_service.utils.database.db_interactions import delete, commit_db_changes
+from device_manager_service.utils.database.ownership import missing_user_devices
+from device_manager_service.utils.database.device_metadata import invalidate_device_metadata
+from device_manager_service.utils.database.recommendation_outbox import enqueue_recommendation_deletion
+from device_manager_service.utils.health.readiness_checker import readiness
 from device_manager_service.ssa.userkb.device_access_update_post import device_access_update_post
 
-from device_manager_service.clients.hems_services.energy_manager import delete_recommendation
 
 
 class DTEncoder(json.JSONEncoder):
@@ -35,29 +37,33 @@ class DTEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
-start = time.time()
-total_time = 0
-
 @app.route('/health')
 def healthy():
-    global start
-    global total_time
+    # Answered from the last readiness check, without querying the DB
+    database = readiness.check("database")
+    if database is None or not database.ok:
+        return 'database unavailable', 500
 
-    corId = {'X-Correlation-ID': 'health'}
+    return ''
 
-    appliance = DBShiftableMachine.query.first()
 
+@app.route('/livez')
+def livez():
+    # The process is up and serving requests, no I/O
+    return ''
 
-    current_time = time.time()
-    time_diff = current_time - start
-    if time_diff >= 600:
-        total_time += time_diff
-        seconds_to_days_minutes_hours(total_time)
-        start = current_time
 
-    # logger.debug("Heath endpoint OK", extra=corId)
+@app.route('/readyz')
+def readyz():
+    ready, snapshot = readiness.snapshot()
 
-    return ''
+    body = {name: result._asdict() for name, result in snapshot.items()}
+
+    return app.response_class(
+        json.dumps({"ready": ready, "checks": body}),
+        status=200 if ready else 503,
+        mimetype="application/json"
+    )
 
 
 def device_get(user_ids=None):  # noqa: E501
@@ -220,22 +226,19 @@ def settings_by_device_get(serial_numbers):  # noqa: E501
             extra=cor_id
             )
 
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-        logger.debug(f"User {auth_response} has {user_machines}", extra=cor_id)
-
-        for serial_number in serial_numbers:
-            if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, serial_numbers)
+        if len(unowned_devices) > 0:
 
-                logger.warning(
-                    f"User {auth_response} tried to access other users devices!",
-                    extra=cor_id
-                    )
+            logger.warning(
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
+                extra=cor_id
+                )
 
-                msg = "Unauthorized Action!"
-                response = Error(msg)
+            msg = "Unauthorized Action!"
+            response = Error(msg)
 
-                logErrorResponse(msg, end_text, response, cor_id)
-                return Error(msg), 403, cor_id
+            logErrorResponse(msg, end_text, response, cor_id)
+            return Error(msg), 403, cor_id
 
     else:
         logger.info(
@@ -344,12 +347,11 @@ def settings_by_device_post(serial_number):  # noqa: E501
             extra=cor_id
             )
 
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-
-        if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, [serial_number])
+        if len(unowned_devices) > 0:
 
             logger.warning(
-                f"User {auth_response} tried to access other users devices!",
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
                 extra=cor_id
                 )
 
@@ -642,12 +644,11 @@ def device_delete(serial_number, delete_type):
             extra=cor_id
             )
         
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-
-        if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, [serial_number])
+        if len(unowned_devices) > 0:
 
             logger.warning(
-                f"User {auth_response} tried to access other users devices!",
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
                 extra=cor_id
                 )
 
@@ -701,22 +702,19 @@ def device_delete(serial_number, delete_type):
     # if delete_type == "hard": 
     device_in_db.current_cycle_id = None  # NOTE: Fixes circular dependency error when deleting devices with an active cycle
     db.session.commit()
+    sequence_ids = [cycle.sequence_id for cycle in device_in_db.washing_cycles]
+
     error_msg = f"Failed to delete device {serial_number} from database."
-    response_code = delete_and_commit(db.session, device_in_db, error_msg, cor_id)
+    response_code = delete(db.session, device_in_db, error_msg, cor_id)
+    if response_code == 200:
+        # Delete flex recommendations associated with the cycles (sent by the outbox dispatcher)
+        for sequence_id in sequence_ids:
+            enqueue_recommendation_deletion(db.session, serial_number, sequence_id)
+        response_code = commit_db_changes(db.session, error_msg, cor_id)
     if response_code != 200:
         return Error(error_msg), response_code, cor_id
-    else:
-        for cycle in device_in_db.washing_cycles:
-            # Delete flex recommendation associated with cycle 
-            del_response, del_status_code = delete_recommendation(
-                serial_number, cycle.sequence_id
-            )
-            if 400 <= del_status_code < 500:
-                logger.warning(
-                    f"Failed to delete recommendation from Energy Manager Service: " \
-                    f"{del_response['error']}",
-                    extra=cor_id
-                )
+
+    invalidate_device_metadata(serial_number)
 
     logger.info(f"Device {serial_number} was HARD deleted!", extra=cor_id)
     logger.info(f"{end_text}\n", extra=cor_id)
@@ -767,12 +765,11 @@ def device_settings_set_automatic_management_post(serial_number):  # noqa: E501
             extra=cor_id
             )
         
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-
-        if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, [serial_number])
+        if len(unowned_devices) > 0:
 
             logger.warning(
-                f"User {auth_response} tried to access other users devices!",
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
                 extra=cor_id
                 )
 
@@ -810,6 +807,7 @@ def device_settings_set_automatic_management_post(serial_number):  # noqa: E501
             device_in_db.automatic_management = True
             response = AutomaticManagementResponseBody(True)
         db.session.commit()
+        invalidate_device_metadata(serial_number)
         status_code = 200
 
         logger.info(f"Device {serial_number} automatic management flag was updated to {device_in_db.automatic_management}!", extra=cor_id)
@@ -3,7 +3,7 @@ import connexion
 import json
 from datetime import datetime
 
-from device_manager_service import util, auth, logger
+from device_manager_service import util, auth, logger, db
 
 from device_manager_service.models import (
     Error,
@@ -14,6 +14,11 @@ from device_manager_service.models import (
 from device_manager_service.models.db_models import DBShiftableMachine
 
 from device_manager_service.utils.models.deserialize import deserialize_washing_cycle
+from device_manager_service.utils.database.cycle_queries import (
+    query_machines_by_serial_numbers,
+    query_cycles_by_machine
+)
+from device_manager_service.utils.database.ownership import missing_user_devices
 from device_manager_service.utils.logs import logErrorResponse
 
 
@@ -52,6 +57,7 @@ def schedule_cycle_by_device_get(serial_numbers, start_timestamp=None, end_times
             is_cycle_optimized = True
     else:
         logger.debug(f"Looking for ALL cycles, optimized or not\n", extra=cor_id)
+        is_cycle_optimized = None
 
     # ----------------- Define user permissions ----------------- #
 
@@ -75,21 +81,19 @@ def schedule_cycle_by_device_get(serial_numbers, start_timestamp=None, end_times
             extra=cor_id
             )
         
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-
-        for serial_number in serial_numbers:
-            if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, serial_numbers)
+        if len(unowned_devices) > 0:
 
-                logger.warning(
-                    f"User {auth_response} tried to access other users devices!",
-                    extra=cor_id
-                    )
+            logger.warning(
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
+                extra=cor_id
+                )
 
-                msg = "Unauthorized Action!"
-                response = Error(msg)
+            msg = "Unauthorized Action!"
+            response = Error(msg)
 
-                logErrorResponse(msg, end_text, response, cor_id)
-                return Error(msg), 403, cor_id
+            logErrorResponse(msg, end_text, response, cor_id)
+            return Error(msg), 403, cor_id
         
     else:
         logger.info(
@@ -99,23 +103,23 @@ def schedule_cycle_by_device_get(serial_numbers, start_timestamp=None, end_times
 
     
 
+    # Stored times are naive UTC. Timestamps are compared by their wall clock
+    # value, so any offset sent by the client is dropped, not converted.
+    start_dt = None
+    end_dt = None
     if start_timestamp:
-        start_dt = util.deserialize_datetime(start_timestamp)
-        start_dt_utc = start_dt.replace(tzinfo=timezone.utc)
+        start_dt = util.deserialize_datetime(start_timestamp).replace(tzinfo=None)
     if end_timestamp:
-        end_dt = util.deserialize_datetime(end_timestamp)
-        end_dt_utc = end_dt.replace(tzinfo=timezone.utc)
+        end_dt = util.deserialize_datetime(end_timestamp).replace(tzinfo=None)
 
 
     # --------------------- Check if Device exists in user database --------------------- #
 
-    response = []
+    devices_in_db = query_machines_by_serial_numbers(db.session, serial_numbers)
+
     for serial_number in serial_numbers:
-        cycles_pool = []
-        
-        device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
-        if device_in_db is None:
-        
+        if serial_number not in devices_in_db:
+
             logger.error(f"No device with ID '{serial_number}' in Database...", extra=cor_id)
             msg = "One or more device IDs not associated with the user."
             response = Error(msg)
@@ -124,101 +128,27 @@ def schedule_cycle_by_device_get(serial_numbers, start_timestamp=None, end_times
             return response, 400, cor_id
 
 
-        # --------------------- Build request response object --------------------- #
-
-        cycles = deserialize_washing_cycle(device_in_db)
-
-        for cycle in cycles:
-            
-            logger.info(
-                f"Cycle {cycle.sequence_id} of device {device_in_db.serial_number}",
-                extra=cor_id
-                )
-
-            # Enforce "is_cycle_optimized" query parameter
-            if is_cycle_optimized is None:
-                logger.debug("'is_cycle_optimized' query parameter not set", extra=cor_id)
-
-            elif is_cycle_optimized and cycle.is_optimized:
-                logger.debug(
-                    "Cycle IS optimized in accordance with 'is_cycle_optimized' query parameter",
-                    extra=cor_id
-                    )
-
-            elif is_cycle_optimized is False and cycle.is_optimized is False:
-                logger.debug(
-                    "Cycle is NOT optimized in accordance with 'is_cycle_optimized' query parameter",
-                    extra=cor_id
-                    )
-            else:
-                logger.debug(
-                    "Cycle does not match 'is_cycle_optimized' query parameter requirements\n" \
-                    f"'is_cycle_optimized': {is_cycle_optimized}\n" \
-                    f"Cycle is_optimized? {cycle.is_optimized}\n",
-                    extra=cor_id
-                    )
-                continue
-            
-
-            cycle_start_timestamp_utc = cycle.scheduled_start_time.replace(tzinfo=timezone.utc)
-
-            if start_timestamp:
-    
-                if cycle_start_timestamp_utc.timestamp() >= start_dt_utc.timestamp():
-                    
-                    logger.debug(
-                        f"Cycle start time is after {start_dt_utc}", 
-                        extra=cor_id
-                        )
-
-                    if end_timestamp:
-                        
-                        if cycle_start_timestamp_utc.timestamp() <= end_dt_utc.timestamp():
-
-                            logger.debug(
-                                f"Cycle start time is before {end_dt_utc}", extra=cor_id
-                            )
-                            logger.info(
-                                f"Query found: Cycle {cycle.sequence_id} " \
-                                f"of device {device_in_db.serial_number}",
-                                extra=cor_id
-                            )
-
-                            cycles_pool.append(cycle)
-                    
-                    else:
-                        logger.info(
-                            f"Query found: Cycle {cycle.sequence_id} " \
-                            f"of device {device_in_db.serial_number}",
-                            extra=cor_id
-                        )
-                        cycles_pool.append(cycle)
-            
-            elif end_timestamp:
+    # --------------------- Build request response object --------------------- #
 
-                if cycle_start_timestamp_utc.timestamp() <= end_dt_utc.timestamp():
+    cycles_by_machine = query_cycles_by_machine(
+        db.session,
+        [device.id for device in devices_in_db.values()],
+        start_time=start_dt,
+        end_time=end_dt,
+        is_optimized=is_cycle_optimized
+    )
 
-                    logger.debug(
-                        f"Cycle start time is before {end_dt_utc}", 
-                        extra=cor_id
-                        )
-                    logger.info(
-                        f"Query found: Cycle {cycle.sequence_id} " \
-                        f"of device {device_in_db.serial_number}",
-                        extra=cor_id
-                    )
-                        
-                    cycles_pool.append(cycle)
+    response = []
+    for serial_number in serial_numbers:
+        device_in_db = devices_in_db[serial_number]
+        cycles_pool = cycles_by_machine.get(device_in_db.id, [])
 
-            else:
-                logger.info(
-                    f"Query found: Cycle {cycle.sequence_id} " \
-                    f"of device {device_in_db.serial_number}",
-                    extra=cor_id
-                )
-                cycles_pool.append(cycle)
+        logger.info(
+            f"Query found {len(cycles_pool)} cycles of device {serial_number}",
+            extra=cor_id
+        )
 
-        response.append(MachineCycleByDevice(serial_number=device_in_db.serial_number,cycles=cycles_pool))
+        response.append(MachineCycleByDevice(serial_number=serial_number, cycles=cycles_pool))
 
 
     logger.info(f"{end_text}\n", extra=cor_id)
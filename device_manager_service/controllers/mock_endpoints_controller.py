@@ -27,6 +27,8 @@ from device_manager_service.models.events import CycleSchema, CycleScheduledEven
 from device_manager_service.utils.random_generation import generate_random_sequence_id
 from device_manager_service.utils.logs import logErrorResponse
 from device_manager_service.utils.database.db_interactions import add_and_commit, add_row_to_table
+from device_manager_service.utils.database.ownership import missing_user_devices
+from device_manager_service.utils.database.device_metadata import get_device_metadata
 
 
 class DTEncoder(json.JSONEncoder):
@@ -182,12 +184,11 @@ def schedule_cycle_by_device_post(serial_number):  # noqa: E501
             extra=cor_id
             )
 
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-
-        if serial_number not in [machine.serial_number for machine in user_machines]:
+        unowned_devices = missing_user_devices(db.session, auth_response, [serial_number])
+        if len(unowned_devices) > 0:
 
             logger.warning(
-                f"User {auth_response} tried to access other users devices!",
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
                 extra=cor_id
                 )
 
@@ -213,7 +214,7 @@ def schedule_cycle_by_device_post(serial_number):  # noqa: E501
 
     # ------------------ Check if Device exists in user database ------------------ #
 
-    device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
+    device_in_db = get_device_metadata(db.session, serial_number)
 
     if device_in_db is None:
 
@@ -4,7 +4,10 @@ import time
 import json
 from datetime import datetime
 
-from device_manager_service import auth, logger
+import pytz
+from flask import Response, stream_with_context, jsonify, json as flask_json
+
+from device_manager_service import util, auth, logger, db, Config
 
 from device_manager_service.models import (
     Error,
@@ -16,6 +19,14 @@ from device_manager_service.models import (
 from device_manager_service.models.db_models import DBShiftableMachine
 
 from device_manager_service.utils.models.deserialize import deserialize_washing_cycle
+from device_manager_service.utils.database.ownership import missing_user_devices, user_has_devices
+from device_manager_service.utils.database.cycle_queries import (
+    query_machines_by_serial_numbers,
+    query_machines_by_user_ids,
+    query_cycles_by_machine,
+    stream_fleet_pool
+)
+from device_manager_service.utils.date.day_ahead_window import day_ahead_window
 from device_manager_service.utils.logs import logErrorResponse
 
 
@@ -31,9 +42,19 @@ class DTEncoder(json.JSONEncoder):
 
 
 
+def _pool_window(reference_date, time_zone):
+    if reference_date:
+        reference_date = util.deserialize_date(reference_date)
+
+    return day_ahead_window(
+        reference_date=reference_date or None,
+        time_zone=time_zone or Config.POOL_TIME_ZONE
+    )
+
+
 # TODO: USING THIS FUNCTION AS AN EXAMPLE, DIVIDE INTO SMALLER FUNCTIONS THAT CAN BE REUSED IN OTHER REQUESTS
 # TODO: POSTMAN TESTS WITH EVERY CASE IN THIS FUNCTION (user not authorized, user has no devices, etc.)
-def pool_by_device_get(serial_numbers):  # noqa: E501
+def pool_by_device_get(serial_numbers, reference_date=None, time_zone=None):  # noqa: E501
     """Get scheduled pool per device ids.
 
      # noqa: E501
@@ -44,6 +65,10 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
     :type serial_numbers: List[str]
     :param authorization:
     :type authorization: str
+    :param reference_date: The pool is the day after this date (defaults to today)
+    :type reference_date: str
+    :param time_zone: Time zone of the pool day boundaries
+    :type time_zone: str
 
     :rtype: List[PoolByUser]
     """
@@ -102,8 +127,8 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
         #     logger.info(f"User '{auth_response}' has no deleted devices", extra=cor_id)
 
 
-        user_machines = DBShiftableMachine.query.filter_by(user_id=auth_response).all()
-        if len(user_machines) == 0:
+        unowned_devices = missing_user_devices(db.session, auth_response, serial_numbers)
+        if len(unowned_devices) > 0 and not user_has_devices(db.session, auth_response):
             logger.warning(f"User {auth_response} has no devices associated", extra=cor_id)
 
             msg = "User's devices not found"
@@ -112,24 +137,21 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
             request_status_code = 404
             request_error = True
         
-        else:
+        elif len(unowned_devices) > 0:
 
-            for serial_number in serial_numbers:
-                if serial_number not in [machine.serial_number for machine in user_machines]:
-
-                    logger.warning(
-                        f"User {auth_response} tried to access other users devices!",
-                        extra=cor_id
-                        )
+            logger.warning(
+                f"User {auth_response} tried to access other users devices! {unowned_devices}",
+                extra=cor_id
+                )
 
-                    msg = "Unauthorized Action!"
-                    
-                    response = Error(msg)
-                    request_status_code = 403
-                    request_error = True
+            msg = "Unauthorized Action!"
+            
+            response = Error(msg)
+            request_status_code = 403
+            request_error = True
 
-                    logErrorResponse(msg, end_text, response, cor_id)
-                    # return response, 403, cor_id
+            logErrorResponse(msg, end_text, response, cor_id)
+            # return response, 403, cor_id
         
     else:
         logger.info(
@@ -139,11 +161,11 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
 
 
     # ----------------- Check if Device exists in user database ----------------- #
-    
+
+    devices_in_db = query_machines_by_serial_numbers(db.session, serial_numbers)
+
     for serial_number in serial_numbers:
-    
-        device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
-        if device_in_db is None:
+        if serial_number not in devices_in_db:
     
             logger.error(f"No device with ID '{serial_number}' in Database...", extra=cor_id)
             msg = "One or more device IDs not associated with the user."
@@ -154,34 +176,47 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
 
             logErrorResponse(msg, end_text, response, cor_id)
             # return response, 400, cor_id
+
+
+    # ----------------- Compute the day ahead window ----------------- #
+
+    if request_error == False:
+        try:
+            start_time, end_time = _pool_window(reference_date, time_zone)
+        except pytz.UnknownTimeZoneError:
+            msg = f"Unknown time zone '{time_zone}'"
+
+            response = Error(msg)
+            request_status_code = 400
+            request_error = True
+
+            logErrorResponse(msg, end_text, response, cor_id)
         
 
     # ------------------------ Request logic ------------------------ #
     
     if request_error == False:
+        logger.debug(f"Pool window: [{start_time}, {end_time}) UTC", extra=cor_id)
+
+        cycles_by_machine = query_cycles_by_machine(
+            db.session,
+            [device.id for device in devices_in_db.values()],
+            start_time=start_time,
+            end_time=end_time,
+            end_inclusive=False
+        )
+
         response = []
-        day_ahead = datetime.now() + timedelta(days=1)
-        
         for serial_number in serial_numbers:
-            pool = []
-            
-            cycles = deserialize_washing_cycle(device_in_db)
-            cycles = [
-                cycle for cycle in cycles 
-                if cycle.scheduled_start_time.day == day_ahead.day and
-                cycle.scheduled_start_time.month == day_ahead.month and
-                cycle.scheduled_start_time.year == day_ahead.year
-                ]
+            device_in_db = devices_in_db[serial_number]
+            cycles = cycles_by_machine.get(device_in_db.id, [])
 
             if len(cycles) > 0:
-                pool.append(Pool(
+                response.append(PoolByDevice(pool=[Pool(
                     serial_number=device_in_db.serial_number,
                     device_type=device_in_db.device_type,
                     cycles_in_pool=cycles
-                    ))
-
-            if len(pool) > 0:
-                response.append(PoolByDevice(pool=pool))
+                    )]))
         
         request_status_code = 200
 
@@ -191,7 +226,7 @@ def pool_by_device_get(serial_numbers):  # noqa: E501
     return response, request_status_code, cor_id
 
 
-def pool_by_user_get(user_ids):  # noqa: E501
+def pool_by_user_get(user_ids, reference_date=None, time_zone=None):  # noqa: E501
     """Get scheduled pools per user ids.
 
      # noqa: E501
@@ -202,6 +237,10 @@ def pool_by_user_get(user_ids):  # noqa: E501
     :type user_ids: List[str]
     :param authorization:
     :type authorization: str
+    :param reference_date: The pool is the day after this date (defaults to today)
+    :type reference_date: str
+    :param time_zone: Time zone of the pool day boundaries
+    :type time_zone: str
 
     :rtype: List[PoolByUser]
     """
@@ -271,22 +310,32 @@ def pool_by_user_get(user_ids):  # noqa: E501
     
     # ----------------- Fetch cycles from devices of users ----------------- #
 
-    day_ahead = datetime.now() + timedelta(days=1)
-    response = []
+    try:
+        start_time, end_time = _pool_window(reference_date, time_zone)
+    except pytz.UnknownTimeZoneError:
+        msg = f"Unknown time zone '{time_zone}'"
+        response = Error(msg)
+
+        logErrorResponse(msg, end_text, response, cor_id)
+        return response, 400, cor_id
+
+    logger.debug(f"Pool window: [{start_time}, {end_time}) UTC", extra=cor_id)
+
+    machines_by_user = query_machines_by_user_ids(db.session, users_list)
+    cycles_by_machine = query_cycles_by_machine(
+        db.session,
+        [machine.id for machines in machines_by_user.values() for machine in machines],
+        start_time=start_time,
+        end_time=end_time,
+        end_inclusive=False
+    )
 
+    response = []
     for user_id in users_list:
-        wp_machines = DBShiftableMachine.query.filter_by(user_id=user_id).all()
 
         pool = []
-        for machine in wp_machines:
-            
-            cycles = deserialize_washing_cycle(machine)
-            cycles = [
-                cycle for cycle in cycles
-                if cycle.scheduled_start_time.day == day_ahead.day and
-                cycle.scheduled_start_time.month == day_ahead.month and
-                cycle.scheduled_start_time.year == day_ahead.year
-            ]
+        for machine in machines_by_user.get(user_id, []):
+            cycles = cycles_by_machine.get(machine.id, [])
 
             if len(cycles) > 0:
                 pool.append(Pool(
@@ -423,3 +472,106 @@ def perfect_pool_by_user_get(user_ids, start_date, end_date):  # noqa: E501
     logger.info(end_text, extra=cor_id)
 
     return response, 200, cor_id
+
+
+def pool_export_get(start_timestamp, end_timestamp):  # noqa: E501
+    """Stream the pool of every device in the fleet, as newline-delimited JSON.
+
+    Internal services only. Cycles are selected by scheduled start time in
+    [start_timestamp, end_timestamp). Each line is a PoolByUser holding the
+    cycles of one device, ordered by user.
+
+    :param start_timestamp: Start of the export window (inclusive)
+    :type start_timestamp: str
+    :param end_timestamp: End of the export window (exclusive)
+    :type end_timestamp: str
+
+    :rtype: Response
+    """
+    cor_id = {"X-Correlation-ID": connexion.request.headers["X-Correlation-ID"]}
+
+    end_text = "Processed GET /pool-export request"
+    logger.info("Starting GET /pool-export request...", extra=cor_id)
+
+
+    # ----------------- Verify request permissions ----------------- #
+
+    auth_response, auth_code = auth.verify_basic_authorization(connexion.request.headers)
+
+    if auth_code != 200:
+
+        logger.error(auth_response, extra=cor_id)
+        msg = "Invalid credentials. Check logger for more info."
+        response = Error(msg)
+
+        logErrorResponse(msg, end_text, response, cor_id)
+        return jsonify(response), auth_code, cor_id
+
+    elif auth_response is not None:
+
+        logger.warning(
+            f"User {auth_response} tried to export the pool of every user!",
+            extra=cor_id
+            )
+        msg = "Unauthorized action!"
+        response = Error(msg)
+
+        logErrorResponse(msg, end_text, response, cor_id)
+        return jsonify(response), 403, cor_id
+
+
+    # ----------------- Parse the time window ----------------- #
+
+    try:
+        start_time = _to_naive_utc(util.deserialize_datetime(start_timestamp))
+        end_time = _to_naive_utc(util.deserialize_datetime(end_timestamp))
+    except (ValueError, OverflowError) as e:
+        logger.error(repr(e), extra=cor_id)
+        msg = "start_timestamp and end_timestamp must be valid timestamps"
+        response = Error(msg)
+
+        logErrorResponse(msg, end_text, response, cor_id)
+        return jsonify(response), 400, cor_id
+
+    logger.debug(f"Export window: [{start_time}, {end_time}) UTC", extra=cor_id)
+
+
+    # ----------------- Stream the pool ----------------- #
+
+    def generate():
+        devices = 0
+        chunk = []
+        chunk_size = 0
+
+        for device_pool in stream_fleet_pool(
+            db.session, start_time, end_time, yield_per=Config.POOL_EXPORT_YIELD_PER
+        ):
+            line = flask_json.dumps(device_pool) + "\n"
+            chunk.append(line)
+            chunk_size += len(line)
+            devices += 1
+
+            if chunk_size >= Config.POOL_EXPORT_CHUNK_BYTES:
+                yield "".join(chunk)
+                chunk = []
+                chunk_size = 0
+
+        if len(chunk) > 0:
+            yield "".join(chunk)
+
+        logger.info(f"{end_text}: exported {devices} devices", extra=cor_id)
+
+    # Not buffered by Flask. Response validation skips streamed responses (StreamingResponseValidator)
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers=cor_id,
+        direct_passthrough=True
+    )
+
+
+def _to_naive_utc(dt):
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc)
+
+    return dt.replace(tzinfo=None)
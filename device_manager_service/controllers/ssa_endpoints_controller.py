@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta
 from time import sleep
-import connexion, json, uuid, requests, os
+import connexion, json, uuid, os
 
 from flask import redirect, request, session
 
-from device_manager_service import Config, logger, db, auth, app
+from device_manager_service import Config, logger, db, auth, app, ssa_adapters
 
 from device_manager_service.models import (
     Error,
@@ -17,20 +17,21 @@ from device_manager_service.models import (
 
 from device_manager_service.models.db_models import (
     DBShiftableMachine,
-    DBShiftableCycle
 )
 
 from device_manager_service.ssa.whirlpool.wp_appliances_ask import wp_appliances_ask
 from device_manager_service.ssa.whirlpool.wp_register_ask import wp_register_ask
-from device_manager_service.ssa.whirlpool.wp_delay_post import wp_delay_post
-from device_manager_service.ssa.bosch_miele.bsh_delay_post import bsh_delay_post
+from device_manager_service.ssa.delay_dispatch import brand_adapter, adapter_ready, dispatch_delays
 from device_manager_service.ssa.bosch_miele.device_metadata_ask import bsh_appliances_metadata_ask
 from device_manager_service.ssa.userkb.device_access_update_post import device_access_update_post
 
 from device_manager_service.utils.logs import logErrorResponse
 from device_manager_service.utils.database.db_interactions import add_row_to_table, commit_db_changes
+from device_manager_service.utils.database.device_metadata import get_device_metadata, invalidate_device_metadata
+from device_manager_service.utils.database.cycle_queries import query_cycle_owners
 
 from device_manager_service.clients.hems_services.energy_manager import post_flexibility_recommendations_accept
+from device_manager_service.clients.common.http_client import http_request
 
 
 class DTEncoder(json.JSONEncoder):
@@ -106,6 +107,11 @@ def request_delay_by_cycle_post(user_id, recommendation_id=None):
 
     # ------------------------------ Cycles belong to user? ------------------------------ #
 
+    cycle_owners = query_cycle_owners(
+        db.session,
+        [(delay_by_cyle.serial_number, delay_by_cyle.sequence_id) for delay_by_cyle in delays_by_cycle_request_body]
+    )
+
     for delay_by_cyle in delays_by_cycle_request_body:
         sequence_id = delay_by_cyle.sequence_id
         serial_number = delay_by_cyle.serial_number
@@ -113,16 +119,10 @@ def request_delay_by_cycle_post(user_id, recommendation_id=None):
         logger.debug(f"Device ID {serial_number}", extra=cor_id)
         logger.debug(f"Cycle ID {sequence_id}", extra=cor_id)
         
-        cycle_in_db = db.session.query(DBShiftableCycle).join(
-            DBShiftableMachine, DBShiftableCycle.shiftable_machine_id == DBShiftableMachine.id
-        ).filter(
-            DBShiftableMachine.serial_number == serial_number
-        ).filter(
-            DBShiftableCycle.sequence_id == sequence_id
-        ).first()
+        cycle_owner = cycle_owners.get((serial_number, sequence_id))
         
         # Cycle does not exist
-        if cycle_in_db is None:
+        if cycle_owner is None:
             logger.error(f"Cycle {sequence_id} does not exist in database", extra=cor_id)
 
             msg = "One or more cycles do not exist"
@@ -130,25 +130,18 @@ def request_delay_by_cycle_post(user_id, recommendation_id=None):
 
             logErrorResponse(msg, end_text, response, cor_id)
             return response, 404, cor_id
-        
-        logger.info(f"Cycle in DB: {cycle_in_db}\n", extra=cor_id)
-
-
-        device_in_db = DBShiftableMachine.query.filter_by(
-            serial_number=serial_number
-        ).first()
 
         logger.debug(
-            f"Cycle ID {sequence_id} found on device {device_in_db.serial_number}" \
-            f"from user {device_in_db.user_id}",
+            f"Cycle ID {sequence_id} found on device {cycle_owner.serial_number}" \
+            f"from user {cycle_owner.user_id}",
             extra=cor_id
             )
 
         # Cycle exists but it belongs to another user
-        if device_in_db.user_id != user_id:
+        if cycle_owner.user_id != user_id:
             logger.error(
-                f"You're trying to delay cycle {cycle_in_db.sequence_id} " \
-                f"which belongs to user {device_in_db.user_id}" \
+                f"You're trying to delay cycle {sequence_id} " \
+                f"which belongs to user {cycle_owner.user_id}" \
                 f"while delaying cycle from user {user_id}",
                 extra=cor_id
                 )
@@ -162,7 +155,7 @@ def request_delay_by_cycle_post(user_id, recommendation_id=None):
 
     # ------------------------------ Delay ------------------------------ #
 
-    response = []
+    delays = []
     for delay_by_cyle in delays_by_cycle_request_body:
         sequence_id = delay_by_cyle.sequence_id
         serial_number = delay_by_cyle.serial_number
@@ -172,61 +165,30 @@ def request_delay_by_cycle_post(user_id, recommendation_id=None):
         logger.debug(f"Device ID {serial_number}", extra=cor_id)
         logger.debug(f"New start time: {new_start_time}", extra=cor_id)
 
-        device_in_db = DBShiftableMachine.query.filter_by(
-            serial_number=serial_number
-        ).first()
-
+        # Resolved during validation
+        brand = cycle_owners[(serial_number, sequence_id)].brand
 
-        if device_in_db.brand.lower() in ["bosch", "miele"]:
-
-            logger.info("Bosch Delay!\n", extra=cor_id)
-
-            # NOTE: FOR SPINE SSA PURPOSES
-            base_url = "http://example.org/spine-ssa/devices/"
-            power_sequence = f"<{base_url}{serial_number}/powerSequences/{sequence_id}>"
-            associated_device = f"<{base_url}{serial_number}>"
-            
-            # TODO: Catch exceptions from the SSA. Response and response code accordingly
-            try:
-                response_message, delay_status_code = bsh_delay_post(
-                    power_sequence=power_sequence,
-                    device_id=serial_number,
-                    associated_device=associated_device,
-                    sequence_id=sequence_id,
-                    new_start_time=new_start_time
-                )
-            except Exception as e:
-                delay_status_code = 500
-                response_message = "Communication of cycle new start time failed. Try again later."
-                logger.error(
-                    f"SSA delayed start call failed with exception: {repr(e)}",
-                    extra=cor_id
-                )
-        
-        elif device_in_db.brand.lower() in ["whirlpool", "hotpoint"]:
-            logger.info("Whirlpool Delay!\n", extra=cor_id)
-
-            try:
-                response_message, delay_status_code = wp_delay_post(
-                    sequence_id=sequence_id,
-                    device_address=serial_number,
-                    new_start_time=new_start_time
-                )
-            except Exception as e:
-                delay_status_code = 500
-                response_message = "Communication of cycle new start time failed. Try again later."
-                logger.error(
-                    f"SSA delayed start call failed with exception: {repr(e)}",
-                    extra=cor_id
-                )
-        
-        else:
-            msg = f"Delay request not implemented for brand: {device_in_db.brand}"
+        if brand_adapter(brand) is None:
+            msg = f"Delay request not implemented for brand: {brand}"
             logger.error(msg, extra=cor_id)
             response = Error(msg)
             
             return response, 400, cor_id
 
+        if not adapter_ready(brand_adapter(brand)):
+            msg = f"SSA for brand {brand} is not ready yet. Try again later."
+            response = Error(msg)
+
+            logErrorResponse(msg, end_text, response, cor_id)
+            return response, 503, cor_id
+
+        delays.append((serial_number, sequence_id, brand, new_start_time))
+
+    # Devices in parallel, cycles of the same device in request order
+    delay_results = dispatch_delays(delays, cor_id)
+
+    response = []
+    for (serial_number, sequence_id, _, new_start_time), (response_message, delay_status_code) in zip(delays, delay_results):
 
         delay_call_ok = False
         if delay_status_code != 200:
@@ -309,6 +271,13 @@ def get_user_wp_appliances_get():
     operation_text = f"Get WP appliances for user {user_id}"
     logger.info(operation_text, extra=cor_id)
 
+    if not ssa_adapters.ready("whirlpool_proactive"):
+        msg = "WP SSA is not ready yet. Try again later."
+        response = Error(msg)
+
+        logErrorResponse(msg, end_text, response, cor_id)
+        return response, 503, cor_id
+
     logger.debug(f"User Id: {user_id}", extra=cor_id)
 
 
@@ -323,8 +292,10 @@ def get_user_wp_appliances_get():
 
     try:
         logger.info(f"Getting user's {user_id} profile from account manager.", extra=cor_id)
-        user_profile_response = requests.get(
+        user_profile_response = http_request(
+            "get",
             Config.ACCOUNT_MANAGER_ENDPOINT + "/user", 
+            "account_manager",
             params=query_params, 
             headers=headers
             )
@@ -462,7 +433,7 @@ def get_user_wp_appliances_get():
         # ------------------ Save to db ------------------ #
 
         # Check if appliance is a duplicated scan
-        dup_app = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
+        dup_app = get_device_metadata(db.session, serial_number)
 
         if dup_app is not None:
         
@@ -572,6 +543,16 @@ def bsh_devices_get(device_brand, token, device_ids, ssa):
     if device_brand == "bsh":
         device_brand = "bosch"
 
+    required_ssas = ["bsh_proactive", "userkb"] if Config.SPINE_USE_RECIPIENT_SELECTOR else ["bsh_proactive"]
+    if not ssa_adapters.ready(*required_ssas):
+        logger.error("BSH SSAs are not ready yet", extra=cor_id)
+
+        session['messages'] = json.dumps({
+            "response_code": 503,
+        })
+
+        return redirect(f"{Config.BASE_PATH}/api/device/device-failure", code=302), 302, cor_id
+
 
     # NOTE: We should pass the authorization to get the userID
     user_devices = DBShiftableMachine.query.filter_by(user_id=token).all()
@@ -588,6 +569,7 @@ def bsh_devices_get(device_brand, token, device_ids, ssa):
     ).to_dict()
 
     new_devices = []
+    changed_devices = []
     for serial_number in device_ids:
         
         # Device exists in database but does not have correct metadata
@@ -603,6 +585,7 @@ def bsh_devices_get(device_brand, token, device_ids, ssa):
 
                 if device.device_type != device_type:
                     device.device_type = device_type
+                    changed_devices.append(serial_number)
                     logger.debug(
                         f"Changed device type {device.device_type} to {device_type} " \
                         f"of device {serial_number}",
@@ -626,7 +609,7 @@ def bsh_devices_get(device_brand, token, device_ids, ssa):
 
         
         # Device belongs to another user
-        device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
+        device_in_db = get_device_metadata(db.session, serial_number)
         if device_in_db is not None:
             msg = "Device already exists associated to another user"
             logger.error(msg, extra=cor_id)
@@ -702,6 +685,7 @@ def bsh_devices_get(device_brand, token, device_ids, ssa):
         # Commit changes to database
         db_error_msg = f"Database failed to COMMIT to database\n"
         response_code = commit_db_changes(db.session, db_error_msg, cor_id)
+        invalidate_device_metadata(*changed_devices)
 
 
         logger.info(f"{end_text}\n", extra=cor_id)
@@ -778,7 +762,7 @@ def ssa_device_allow_hems_post():
             extra=cor_id
             )
         
-        device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
+        device_in_db = get_device_metadata(db.session, serial_number)
         if device_in_db is None:
             logger.error(
                 f"Device {serial_number} not found in database",
@@ -1,20 +1,103 @@
 from connexion.apps.flask_app import FlaskJSONEncoder
-import six
 
 from device_manager_service.models.base_model_ import Model
 
+try:
+    import orjson
+except ImportError:  # Optional, responses are encoded by the json module without it
+    orjson = None
+
+
+# Declared types copied as they are, without looking at the value
+PRIMITIVE_TYPES = (int, float, str, bool)
+
+# {(model class, include_nulls): serializer}
+_serializers = {}
+
+
+def _compile_serializer(model, include_nulls):
+    """Generate the serializer of the class of model from its openapi_types and attribute_map.
+
+    The generated function reads the attributes straight from the instance
+    dict and writes the json keys into one dict, with no per-value type
+    checks for primitive attributes. Models set openapi_types in __init__,
+    so the first instance of each class is used to build it.
+    """
+    lines = ["def serialize(o, to_primitive):", "    state = o.__dict__", "    result = {}"]
+
+    for attr, openapi_type in model.openapi_types.items():
+        storage = "_" + attr
+        read = f"state.get({storage!r})" if storage in model.__dict__ else f"getattr(o, {attr!r})"
+        value = "value" if openapi_type in PRIMITIVE_TYPES else "to_primitive(value, include_nulls)"
+        key = model.attribute_map[attr]
+
+        lines.append(f"    value = {read}")
+        if include_nulls:
+            lines.append(f"    result[{key!r}] = {value}")
+        else:
+            lines.append("    if value is not None:")
+            lines.append(f"        result[{key!r}] = {value}")
+
+    lines.append("    return result")
+
+    namespace = {"include_nulls": include_nulls}
+    exec("\n".join(lines), namespace)
+
+    return namespace["serialize"]
+
+
+def to_primitive(value, include_nulls=False):
+    """Convert models, nested in lists and dicts, into dicts keyed by their json names.
+
+    Datetimes, dates and other non-JSON types are kept as they are, for
+    the JSON encoder.
+    """
+    value_type = type(value)
+    if value is None or value_type in PRIMITIVE_TYPES:
+        return value
+
+    if isinstance(value, Model):
+        serializer = _serializers.get((value_type, include_nulls))
+        if serializer is None:
+            serializer = _compile_serializer(value, include_nulls)
+            _serializers[(value_type, include_nulls)] = serializer
+
+        return serializer(value, to_primitive)
+
+    if isinstance(value, (list, tuple)):
+        return [to_primitive(item, include_nulls) for item in value]
+
+    if isinstance(value, dict):
+        return {key: to_primitive(item, include_nulls) for key, item in value.items()}
+
+    return value
+
 
 class JSONEncoder(FlaskJSONEncoder):
     include_nulls = False
 
+    def encode(self, o):
+        data = to_primitive(o, self.include_nulls)
+
+        # orjson only indents by 2 spaces
+        if orjson is not None and self.indent in (None, 2):
+            # Datetimes go through default, as with the json module: naive ones
+            # end in "Z" and aware ones keep their offset, "+00:00" included
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.indent == 2:
+                option |= orjson.OPT_INDENT_2
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+
+            try:
+                return orjson.dumps(data, default=self.default, option=option).decode("utf-8")
+            except TypeError:
+                # e.g. integers over 64 bits, left to the json module
+                pass
+
+        return super().encode(data)
+
     def default(self, o):
         if isinstance(o, Model):
-            dikt = {}
-            for attr, _ in six.iteritems(o.openapi_types):
-                value = getattr(o, attr)
-                if value is None and not self.include_nulls:
-                    continue
-                attr = o.attribute_map[attr]
-                dikt[attr] = value
-            return dikt
+            return to_primitive(o, self.include_nulls)
         return FlaskJSONEncoder.default(self, o)
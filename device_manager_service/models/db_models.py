@@ -15,6 +15,20 @@ import uuid
 
 class DBShiftableMachine(db.Model):
     __tablename__ = "db_shiftable_machine"
+    __table_args__ = (
+        # The same serial number may be registered under different brands
+        db.Index(
+            "uq_shiftable_machine_serial_number_brand",
+            "serial_number", "brand",
+            unique=True
+        ),
+        # Covers ownership checks and per-user device listings (index-only scans)
+        db.Index(
+            "ix_shiftable_machine_user_id_serial_number",
+            "user_id", "serial_number",
+            postgresql_include=["id", "device_type"]
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(64), nullable=False)
     name = db.Column(db.String(64), nullable=False)
@@ -60,6 +74,18 @@ class DBShiftableMachine(db.Model):
 
 class DBShiftableCycle(db.Model):
     __tablename__ = "db_shiftable_cycle"
+    __table_args__ = (
+        db.Index(
+            "ix_shiftable_cycle_machine_id_scheduled_start_time",
+            "shiftable_machine_id", "scheduled_start_time"
+        ),
+        db.Index(
+            "ix_shiftable_cycle_machine_id_sequence_id",
+            "shiftable_machine_id", "sequence_id"
+        ),
+        # SSA parsers look cycles up by sequence id alone
+        db.Index("ix_shiftable_cycle_sequence_id", "sequence_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     sequence_id = db.Column(db.String(128), nullable=False, unique=False)
     earliest_start_time = db.Column(db.DateTime, nullable=False)
@@ -102,7 +128,7 @@ class DBShiftableCycleOld(db.Model):
     expected_end_time = db.Column(db.DateTime, nullable=False)
 
     cycle_ref = db.Column(
-        db.Integer, ForeignKey("db_shiftable_cycle.id", ondelete="CASCADE")
+        db.Integer, ForeignKey("db_shiftable_cycle.id", ondelete="CASCADE"), index=True
     )
 
     def __repr__(self):
@@ -116,6 +142,11 @@ class DBShiftableCycleOld(db.Model):
 
 
 class DBShiftablePowerProfile(db.Model):
+    __table_args__ = (
+        # Slots are always fetched by cycle, in insertion order
+        db.Index("ix_shiftable_power_profile_cycle_ref_id", "cycle_ref", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     slot = db.Column(db.Integer, nullable=False)
     max_power = db.Column(db.Float, nullable=False)
@@ -137,6 +168,26 @@ class DBShiftablePowerProfile(db.Model):
             f"duration_units='{self.duration}', cycle_ref={self.cycle_ref})"
 
 
+# Energy Manager recommendations to delete, written in the same transaction
+# as the cycle deletion and sent by the recommendation outbox dispatcher
+class DBRecommendationDeletionOutbox(db.Model):
+    __tablename__ = "db_recommendation_deletion_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    serial_number = db.Column(db.String(64), nullable=False)
+    sequence_id = db.Column(db.String(128), nullable=False)
+    created_timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_error = db.Column(db.String(512), nullable=True)
+
+    def __repr__(self):
+        return f"DBRecommendationDeletionOutbox(" \
+            f"id={self.id}, serial_number='{self.serial_number}', sequence_id='{self.sequence_id}', " \
+            f"created_timestamp={self.created_timestamp}, attempts={self.attempts}, " \
+            f"next_attempt_timestamp={self.next_attempt_timestamp})"
+
+
 class DBNotDisturb(db.Model):
     __tablename__ = "db_not_disturbs"
 
@@ -159,10 +210,21 @@ class DBNotDisturb(db.Model):
 
 class DBProcessedEvent(db.Model):
     __tablename__ = 'processed_events'
+    __table_args__ = (
+        # Conflict target of the idempotency check, an event is claimed once
+        db.Index(
+            "uq_processed_events_event_type_event_id",
+            "event_type", "event_id",
+            unique=True
+        ),
+        # Retention pruning
+        db.Index("ix_processed_events_processed_timestamp", "processed_timestamp"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     event_type = db.Column(db.String(255), nullable=False)  # Topic name
     event_id = db.Column(UUID(as_uuid=True), nullable=False, index=True)
+    processed_timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def __repr__(self):
         return f"DBProcessedEvent('{self.event_type}', '{self.event_id}')"
@@ -177,6 +239,17 @@ class DBDongles(db.Model):
     def __repr__(self):
         return f"DBDongles('{self.event_type}', '{self.event_id}')"
 
+
+class DBDongleOwnership(db.Model):
+    __tablename__ = "db_dongle_ownership"
+    # Users holding each dongle API key, maintained with DBDongles.
+    # A dongle is monitored while it has at least one owner
+    api_key = db.Column(db.String(32), primary_key=True)
+    owner_count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"DBDongleOwnership('{self.api_key}', '{self.owner_count}')"
+
 # Processed Event table #
 # class DBProcessedEvent(db.Model):
 #     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,192 @@
+import random
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from prometheus_client import Counter, Gauge
+
+from device_manager_service import Config, generalLogger, db
+from device_manager_service.models.db_models import DBRecommendationDeletionOutbox
+from device_manager_service.clients.hems_services.energy_manager import delete_recommendation
+
+
+OUTBOX_LAG = Gauge(
+    "recommendation_outbox_lag_seconds",
+    "Age of the oldest recommendation deletion waiting in the outbox"
+)
+OUTBOX_PENDING = Gauge(
+    "recommendation_outbox_pending",
+    "Recommendation deletions waiting in the outbox"
+)
+OUTBOX_SENT = Counter(
+    "recommendation_outbox_sent_total",
+    "Recommendation deletions removed from the outbox, per outcome",
+    ["outcome"]
+)
+
+
+class RecommendationOutbox:
+    def __init__(self):
+        self.exitEvent = threading.Event()
+
+        self.threads = {}
+
+        thread = threading.Thread(name='recommendation_outbox',
+                                  target=dispatcher,
+                                  args=(self.exitEvent,))
+
+        self.threads['recommendation_outbox'] = thread
+
+    # Start threads
+    def start(self):
+        for thread in self.threads.values():
+            thread.start()
+
+    # Stop threads and wait for them to exit
+    def stop(self):
+        self.exitEvent.set()
+
+        for thread in self.threads.values():
+            thread.join()
+
+
+# Function that the thread is going to execute
+def dispatcher(exitEvent):
+    generalLogger.info("Starting recommendation outbox dispatcher...")
+
+    while not exitEvent.wait(timeout=Config.OUTBOX_POLL_SECONDS):
+        session = db.create_scoped_session()
+        try:
+            # Keep draining while full batches are found
+            while drain_outbox(session) == Config.OUTBOX_BATCH_SIZE and not exitEvent.is_set():
+                pass
+
+            update_outbox_metrics(session)
+
+        except Exception as e:
+            traceback.print_exc()
+            generalLogger.error(f"Recommendation outbox dispatcher failed: {repr(e)}")
+            session.rollback()
+
+        finally:
+            session.close()
+
+    generalLogger.info("Recommendation outbox dispatcher stopped. Exiting...")
+
+
+def drain_outbox(session):
+    """Send one batch of due recommendation deletions to the Energy Manager.
+
+    The batch is claimed first, in its own short transaction. Then the
+    Energy Manager calls are made with no transaction open, and each
+    outcome is saved in its own short transaction. The Energy Manager has
+    no batch delete endpoint, so each deletion is one call over the pooled
+    keep-alive connection. Returns the number of rows in the batch.
+    """
+    batch, lease_until = claim_outbox_batch(session)
+
+    for deletion_id, serial_number, sequence_id, attempts in batch:
+        # Rows left when the lease ends are due again, for any dispatcher
+        if datetime.utcnow() >= lease_until:
+            break
+
+        try:
+            del_response, del_status_code = delete_recommendation(serial_number, sequence_id)
+            error = None if del_status_code < 300 else del_response.get("error", str(del_status_code))
+
+        except Exception as e:
+            # 5xx responses are raised by process_response
+            del_status_code = 500
+            error = repr(e)
+
+        # Only if the lease was not taken over by another dispatcher meanwhile
+        claimed_row = session.query(DBRecommendationDeletionOutbox).filter(
+            DBRecommendationDeletionOutbox.id == deletion_id,
+            DBRecommendationDeletionOutbox.next_attempt_timestamp == lease_until
+        )
+
+        # Delivered (a missing recommendation is reported as 202)
+        if error is None:
+            claimed_row.delete(synchronize_session=False)
+            OUTBOX_SENT.labels(outcome="deleted").inc()
+
+        # Timeouts and server errors are retried
+        elif (del_status_code == 408 or del_status_code >= 500) and \
+                attempts + 1 < Config.OUTBOX_MAX_ATTEMPTS:
+            claimed_row.update({
+                DBRecommendationDeletionOutbox.attempts: attempts + 1,
+                DBRecommendationDeletionOutbox.last_error: error[:512],
+                DBRecommendationDeletionOutbox.next_attempt_timestamp:
+                    datetime.utcnow() + timedelta(seconds=_backoff_seconds(attempts + 1)),
+            }, synchronize_session=False)
+
+            generalLogger.warning(
+                f"Failed to delete recommendation of device {serial_number} and cycle " \
+                f"{sequence_id} (attempt {attempts + 1}): {error}"
+            )
+
+        else:
+            claimed_row.delete(synchronize_session=False)
+            OUTBOX_SENT.labels(outcome="failed").inc()
+
+            generalLogger.error(
+                f"Giving up deleting recommendation of device {serial_number} and cycle " \
+                f"{sequence_id} after {attempts + 1} attempts: {error}"
+            )
+
+        session.commit()
+
+    return len(batch)
+
+
+def claim_outbox_batch(session):
+    """Lease a batch of due deletions to this dispatcher and commit.
+
+    Rows are locked with SKIP LOCKED while they are claimed, so several
+    service replicas can drain the same outbox. A claimed row is due again
+    after OUTBOX_LEASE_SECONDS: if this dispatcher dies before saving the
+    outcome, another one sends it again (deletions are idempotent).
+
+    Returns ([(id, serial_number, sequence_id, attempts)], lease_until). The
+    lease end identifies the claim when the outcome is saved.
+    """
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=Config.OUTBOX_LEASE_SECONDS)
+
+    rows = session.query(DBRecommendationDeletionOutbox).filter(
+        DBRecommendationDeletionOutbox.next_attempt_timestamp <= now
+    ).order_by(
+        DBRecommendationDeletionOutbox.id
+    ).limit(
+        Config.OUTBOX_BATCH_SIZE
+    ).with_for_update(skip_locked=True).all()
+
+    batch = []
+    for deletion in rows:
+        batch.append((deletion.id, deletion.serial_number, deletion.sequence_id, deletion.attempts))
+        deletion.next_attempt_timestamp = lease_until
+
+    session.commit()
+
+    return batch, lease_until
+
+
+def update_outbox_metrics(session):
+    pending, oldest = session.query(
+        func.count(DBRecommendationDeletionOutbox.id),
+        func.min(DBRecommendationDeletionOutbox.created_timestamp)
+    ).one()
+    session.commit()
+
+    OUTBOX_PENDING.set(pending)
+    OUTBOX_LAG.set(0 if oldest is None else (datetime.utcnow() - oldest).total_seconds())
+
+
+def _backoff_seconds(attempts):
+    backoff = min(
+        Config.OUTBOX_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+        Config.OUTBOX_RETRY_MAX_BACKOFF_SECONDS
+    )
+
+    return random.uniform(backoff / 2, backoff)
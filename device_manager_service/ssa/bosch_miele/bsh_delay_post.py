@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from device_manager_service import generalLogger, bsh_proactive_ssa
+from device_manager_service import generalLogger, ssa_adapters
 from device_manager_service.utils.ssa.process_bs import process_bsh_binding_set
 from device_manager_service.ssa.ssa_config.bsh_config import BSHConfig
 
@@ -26,6 +26,8 @@ def bsh_delay_post(power_sequence, associated_device, device_id, sequence_id, ne
 
     generalLogger.info("# BOSCH/MIELE DELAYED START START POST #\n")
 
+    bsh_proactive_ssa = ssa_adapters.get("bsh_proactive")
+
     react, react_response_code = bsh_proactive_ssa.ask_or_post(
         bindings=bindings,
         ki_id=bsh_proactive_ssa.bsh_delay_post_ki_id,
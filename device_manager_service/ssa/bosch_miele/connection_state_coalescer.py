@@ -0,0 +1,127 @@
+import threading
+import traceback
+
+from sqlalchemy import text
+
+from device_manager_service import generalLogger, db
+from device_manager_service.models.db_models import DBShiftableMachine
+
+
+class ConnectionStateCoalescer:
+    def __init__(self, window_seconds):
+        """Buffer connection state changes and write them in batches.
+
+        Only the most recent state of each device is kept while the window is
+        open, so a device flapping on a bad network costs one row in the next
+        flush instead of one SELECT and one COMMIT per message. Every window,
+        all buffered states are written with a single UPDATE ... FROM (VALUES ...).
+
+        Args:
+            window_seconds (float): Time between flushes
+        """
+        self.window_seconds = window_seconds
+
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            name="ConnectionStateCoalescer", target=self._run, daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    # Flush what is buffered, then stop
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add(self, device_id, connection_state, timestamp):
+        """Keep the state if it is newer than the one buffered for device_id.
+
+        timestamp is naive UTC, like the connection_state_timestamp column.
+        """
+        with self._lock:
+            buffered = self._latest.get(device_id)
+            if buffered is not None and buffered[1] >= timestamp:
+                generalLogger.debug(
+                    f"Dropping connection state of device {device_id} at {timestamp}, " \
+                    f"a more recent state at {buffered[1]} is already buffered"
+                )
+                return
+
+            self._latest[device_id] = (connection_state, timestamp)
+
+    def flush(self):
+        with self._lock:
+            latest, self._latest = self._latest, {}
+
+        if len(latest) == 0:
+            return
+
+        session = db.create_scoped_session()
+        try:
+            updated = update_connection_states(session, latest)
+            session.commit()
+
+        except Exception as e:
+            traceback.print_exc()
+            generalLogger.error(f"Failed to update connection state of {len(latest)} devices: {repr(e)}")
+            session.rollback()
+
+            # Retry on next flush, unless a newer state arrived meanwhile
+            for device_id, (connection_state, timestamp) in latest.items():
+                self.add(device_id, connection_state, timestamp)
+            return
+
+        finally:
+            session.close()
+
+        generalLogger.info(f"Connection state updated in DB for devices {sorted(updated)}")
+
+        outdated = set(latest) - updated
+        if len(outdated) > 0:
+            generalLogger.warning(
+                f"Not updating connection state of devices {sorted(outdated)}, because they " \
+                f"do not exist or their saved timestamp is more recent than the new one"
+            )
+
+    def _run(self):
+        while not self._stop.wait(self.window_seconds):
+            self.flush()
+
+        self.flush()
+
+
+def update_connection_states(session, latest):
+    """Update the connection state of many devices in one statement.
+
+    Args:
+        latest (dict): {serial_number: (connection_state, naive UTC timestamp)}
+
+    A device is only updated if the new timestamp is more recent than the
+    saved one. Returns the set of updated serial numbers.
+    """
+    values = []
+    params = {}
+    for i, (device_id, (connection_state, timestamp)) in enumerate(latest.items()):
+        values.append(
+            f"(:serial_number_{i}, CAST(:connection_state_{i} AS BOOLEAN), " \
+            f"CAST(:timestamp_{i} AS TIMESTAMP))"
+        )
+        params[f"serial_number_{i}"] = device_id
+        params[f"connection_state_{i}"] = connection_state
+        params[f"timestamp_{i}"] = timestamp
+
+    statement = text(
+        f"UPDATE {DBShiftableMachine.__tablename__} AS machine "
+        f"SET connection_state = latest.connection_state, "
+        f"connection_state_timestamp = latest.timestamp "
+        f"FROM (VALUES {', '.join(values)}) AS latest (serial_number, connection_state, timestamp) "
+        f"WHERE machine.serial_number = latest.serial_number "
+        f"AND (machine.connection_state_timestamp IS NULL "
+        f"OR machine.connection_state_timestamp < latest.timestamp) "
+        f"RETURNING machine.serial_number"
+    )
+
+    return {row.serial_number for row in session.execute(statement, params)}
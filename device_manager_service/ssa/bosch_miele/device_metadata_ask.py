@@ -1,4 +1,4 @@
-from device_manager_service import generalLogger, bsh_proactive_ssa
+from device_manager_service import generalLogger, ssa_adapters
 
 from device_manager_service.utils.ssa.process_bs import process_bsh_binding_set
 from device_manager_service.ssa.ssa_config.bsh_config import BSHConfig
@@ -20,6 +20,8 @@ def bsh_appliances_metadata_ask(device_id, ssa):
 
     generalLogger.info(f"# BOSCH/MIELE APPLIANCES METADATA ASK #\n")
 
+    bsh_proactive_ssa = ssa_adapters.get("bsh_proactive")
+
     ask_response, ask_response_code = bsh_proactive_ssa.ask_or_post(
         bindings=bindings,
         ki_id=bsh_proactive_ssa.bsh_device_metadata_ask_ki_id,
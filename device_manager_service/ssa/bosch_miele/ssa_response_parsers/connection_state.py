@@ -49,3 +49,21 @@ def process_connection_state(session, bindings):
             generalLogger.warning(f"Not updating device {parsed_parameters['device_id']} timestamp, because current saved timestamp {db_connection_timestamp} is more recent than new timestamp {parsed_parameters['timestamp']}")
         
         generalLogger.info(f"Device {parsed_parameters['device_id']} connection state updated to {parsed_parameters['device_connection_state']} in DB")
+
+
+def buffer_connection_state(coalescer, bindings):
+    parsed_parameters = bindings_to_json(bindings)
+    generalLogger.debug(parsed_parameters)
+
+    generalLogger.info(
+        f"Device {parsed_parameters['device_id']} " \
+        f"changed connection state to {parsed_parameters['device_connection_state']} " \
+        f"at {parsed_parameters['timestamp']}"
+    )
+
+    # Saved in the DB as naive UTC
+    coalescer.add(
+        parsed_parameters['device_id'],
+        parsed_parameters['device_connection_state'],
+        parsed_parameters['timestamp'].replace(tzinfo=None)
+    )
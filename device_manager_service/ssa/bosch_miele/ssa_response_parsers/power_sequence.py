@@ -8,14 +8,14 @@ from device_manager_service.utils.ssa.process_bs import process_bsh_binding_set
 from device_manager_service.models.db_models import (
     DBShiftableMachine,
     DBShiftableCycle,
-    DBShiftablePowerProfile
 )
 from device_manager_service.utils.database.db_interactions import (
-    add_row_to_table,
     commit_db_changes,
-    delete_and_commit
+    delete
 )
-from device_manager_service.clients.hems_services.energy_manager import delete_recommendation
+from device_manager_service.utils.database.recommendation_outbox import enqueue_recommendation_deletion
+from device_manager_service.utils.database.cycle_writes import add_cycle_with_power_profile
+from device_manager_service.utils.date.durations_to_minutes import durations_to_minutes
 
 
 def process_power_sequence(session, binding_set):
@@ -191,14 +191,13 @@ def save_power_sequence(session, cycle_bindings, power_profile_bindings, device,
 
     # SAVE POWER PROFILE ASSOCIATED WITH DEVICE #
     
-    power_profile = []
-    for pp in power_profile_bindings:
-        
-        # Transform default duration from 01:03:00 to 63 minutes
-        duration_time = datetime.strptime(pp["defaultDuration_1"], "%H:%M:%S").time()
-        duration_minutes = duration_time.hour * 60 + duration_time.minute
+    # Transform default durations from 01:03:00 to 63 minutes
+    durations = durations_to_minutes(
+        [pp["defaultDuration_1"] for pp in power_profile_bindings]
+    )
 
-        slot_profile = DBShiftablePowerProfile(
+    power_profile_rows = [
+        dict(
             slot=pp["slotNumber_1"],
             max_power=pp["valueMax_1"],
             min_power=pp["valueMin_1"],
@@ -207,15 +206,8 @@ def save_power_sequence(session, cycle_bindings, power_profile_bindings, device,
             duration=duration_minutes,
             duration_units="minutes",
         )
-        
-        error_msg = f"Failed to flush slot:\n{slot_profile}"
-        response_code = add_row_to_table(session, slot_profile, error_msg)
-        if response_code != 200:
-            raise psycopg2.DatabaseError(error_msg)
-
-        power_profile.append(slot_profile)
-
-        generalLogger.debug(f"Flushed slot {pp['slotNumber_1']}...")
+        for pp, duration_minutes in zip(power_profile_bindings, durations)
+    ]
 
     # Describe machine cycle
     machine_cycle = DBShiftableCycle(
@@ -226,14 +218,15 @@ def save_power_sequence(session, cycle_bindings, power_profile_bindings, device,
         expected_end_time=cycle_bindings["endTime"],
         program="",
         is_optimized=False,
-        power_profile=power_profile,
         shiftable_machine_id=device.id,
     )
 
     error_msg = f"Failed to save cycle {cycle_bindings['sequenceID']} in database"
-    response_code = add_row_to_table(session, machine_cycle, error_msg)
+    response_code = add_cycle_with_power_profile(session, machine_cycle, power_profile_rows, error_msg)
     if response_code != 200:
         raise psycopg2.DatabaseError(error_msg)
+
+    generalLogger.debug(f"Flushed cycle with {len(power_profile_rows)} slots...")
     
     # Update current cycle
     device.current_cycle_id = machine_cycle.id
@@ -275,18 +268,14 @@ def delete_device_current_cycle(session, device, delete_from_cycle_table=True):
     if delete_from_cycle_table:
         error_msg = f"Failed to delete cycle with id: {device.current_cycle_id} " \
             f"from device {device_serial_number}\n"
-        response_code = delete_and_commit(session, device_current_cycle, error_msg)
+        response_code = delete(session, device_current_cycle, error_msg)
         
+        if response_code == 200:
+            # Delete flex recommendation associated with cycle (sent by the outbox dispatcher)
+            enqueue_recommendation_deletion(session, device_serial_number, device_current_cycle.sequence_id)
+            response_code = commit_db_changes(session, error_msg)
+
         if response_code != 200:
             raise psycopg2.DatabaseError("Failed to delete cycle")
-        
-        # Delete flex recommendation associated with cycle 
-        del_response, del_status_code = delete_recommendation(
-            device_serial_number, device_current_cycle.sequence_id
-        )
-        if 400 <= del_status_code < 500:
-            generalLogger.warning(
-                f"Failed to delete recommendation from Energy Manager Service: {del_response['error']}"
-            )
     
     return
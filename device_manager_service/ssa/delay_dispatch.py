@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from device_manager_service import Config, logger, ssa_adapters
+from device_manager_service.ssa.ssa_bootstrap import SSAUnavailableError
+from device_manager_service.ssa.whirlpool.wp_delay_post import wp_delay_post
+from device_manager_service.ssa.bosch_miele.bsh_delay_post import bsh_delay_post
+
+
+# SSA adapter serving each brand
+BRAND_ADAPTERS = {
+    "bosch": "bsh",
+    "miele": "bsh",
+    "whirlpool": "whirlpool",
+    "hotpoint": "whirlpool",
+}
+
+# Proactive SSA used by each adapter to send the delays
+ADAPTER_SSAS = {
+    "bsh": "bsh_proactive",
+    "whirlpool": "whirlpool_proactive",
+}
+
+# Delays sent at the same time through each adapter, shared by all requests
+_adapter_limits = {
+    "bsh": threading.BoundedSemaphore(Config.BSH_DELAY_CONCURRENCY),
+    "whirlpool": threading.BoundedSemaphore(Config.WP_DELAY_CONCURRENCY),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=Config.DELAY_DISPATCH_WORKERS,
+    thread_name_prefix="DelayDispatch"
+)
+
+
+def brand_adapter(brand):
+    """SSA adapter of a device brand, or None if delays are not implemented for it."""
+    return BRAND_ADAPTERS.get(brand.lower())
+
+
+def adapter_ready(adapter):
+    """True once the SSA of the adapter is registered in the Knowledge Engine."""
+    return ssa_adapters.ready(ADAPTER_SSAS[adapter])
+
+
+def dispatch_delays(delays, cor_id):
+    """Send the delays to the SSAs, devices in parallel.
+
+    Delays of the same device are sent one after the other, in request
+    order. Each adapter sends at most its configured number of delays at
+    the same time.
+
+    Args:
+        delays (list): (serial_number, sequence_id, brand, new_start_time) tuples
+            of devices whose brand has an adapter
+
+    Returns a list of (response_message, delay_status_code), in the order of delays.
+    """
+    delays_by_device = OrderedDict()
+    for i, delay in enumerate(delays):
+        delays_by_device.setdefault(delay[0], []).append(i)
+
+    futures = [
+        (indexes, _executor.submit(_send_device_delays, [delays[i] for i in indexes], cor_id))
+        for indexes in delays_by_device.values()
+    ]
+
+    results = [None] * len(delays)
+    for indexes, future in futures:
+        for i, result in zip(indexes, future.result()):
+            results[i] = result
+
+    return results
+
+
+def _send_device_delays(device_delays, cor_id):
+    return [_send_delay(*delay, cor_id) for delay in device_delays]
+
+
+def _send_delay(serial_number, sequence_id, brand, new_start_time, cor_id):
+    adapter = brand_adapter(brand)
+
+    with _adapter_limits[adapter]:
+        try:
+            if adapter == "bsh":
+                logger.info("Bosch Delay!\n", extra=cor_id)
+
+                # NOTE: FOR SPINE SSA PURPOSES
+                base_url = "http://example.org/spine-ssa/devices/"
+                power_sequence = f"<{base_url}{serial_number}/powerSequences/{sequence_id}>"
+                associated_device = f"<{base_url}{serial_number}>"
+
+                return bsh_delay_post(
+                    power_sequence=power_sequence,
+                    device_id=serial_number,
+                    associated_device=associated_device,
+                    sequence_id=sequence_id,
+                    new_start_time=new_start_time
+                )
+
+            logger.info("Whirlpool Delay!\n", extra=cor_id)
+
+            return wp_delay_post(
+                sequence_id=sequence_id,
+                device_address=serial_number,
+                new_start_time=new_start_time
+            )
+
+        except SSAUnavailableError as e:
+            logger.error(repr(e), extra=cor_id)
+
+            return "Manufacturer SSA is not ready yet. Try again later.", 503
+
+        except Exception as e:
+            logger.error(
+                f"SSA delayed start call failed with exception: {repr(e)}",
+                extra=cor_id
+            )
+
+            return "Communication of cycle new start time failed. Try again later.", 500
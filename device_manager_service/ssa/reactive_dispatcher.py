@@ -0,0 +1,183 @@
+import time
+import asyncio
+import traceback
+
+from sqlalchemy.exc import SQLAlchemyError
+from psycopg2 import OperationalError, DatabaseError
+
+from device_manager_service import generalLogger, db
+from device_manager_service.utils.date.seconds_to_days_minutes_hours import seconds_to_days_minutes_hours
+
+
+# Wait before polling again when the handle endpoint answers with an error
+HANDLE_ERROR_BACKOFF_SECONDS = 1
+
+
+class ReactiveHandler:
+    def __init__(self, name, ki_id_getter, process, react=None, partition_key=None):
+        """Handler of the binding sets received on one knowledge interaction.
+
+        Args:
+            name (str): Handler name, for logs
+            ki_id_getter (callable): Returns the current KI ID. KI IDs change
+                when the SSA setup runs again, so they are resolved on every request
+            process (callable): process(session, binding_set). Runs with a fresh
+                DB session, only when a binding set arrives for this KI
+            react (callable): react(handle_request_id, ki_id, binding_set).
+                Answers the Knowledge Engine before processing. No DB access
+            partition_key (callable): partition_key(binding_set). Returns the
+                device serial number, so binding sets of one device are processed in order
+        """
+        self.name = name
+        self.ki_id_getter = ki_id_getter
+        self.process = process
+        self.react = react
+        self.partition_key = partition_key
+
+
+class ReactiveDispatcher:
+    def __init__(self, name, handle, on_handle_error, worker_pool=None):
+        """Long poll an SSA handle endpoint and dispatch binding sets per KI.
+
+        The blocking SSA calls run in the default executor, so the event loop
+        only wakes up when the long poll returns. Nothing runs (and no DB
+        session is opened) while the Knowledge Engine has no requests.
+
+        Args:
+            name (str): Dispatcher name, for logs
+            handle (callable): Blocking long poll. Returns the SSA handle tuple
+                (response, ki_id, handle_request_id, binding_set, requesting_kb_id)
+            on_handle_error (callable): Recovery procedure (e.g. run the SSA setup
+                again), called when the long poll or a reaction raises
+            worker_pool (PartitionedWorkerPool): Where binding sets are processed,
+                so slow handlers do not hold the long poll. Processed inline if None
+        """
+        self.name = name
+        self.handle = handle
+        self.on_handle_error = on_handle_error
+        self.worker_pool = worker_pool
+        self.handlers = []
+
+    def register(self, name, ki_id_getter, process, react=None, partition_key=None):
+        self.handlers.append(ReactiveHandler(name, ki_id_getter, process, react, partition_key))
+
+    def run(self, exitEvent):
+        if self.worker_pool is None:
+            asyncio.run(self._run(exitEvent))
+            return
+
+        self.worker_pool.start()
+        try:
+            asyncio.run(self._run(exitEvent))
+        finally:
+            self.worker_pool.stop()
+
+    async def _run(self, exitEvent):
+        generalLogger.info(f"Begin {self.name} reactive dispatcher...")
+
+        loop = asyncio.get_running_loop()
+
+        start = time.time()
+        total_time = 0
+        while not exitEvent.is_set():
+            current_time = time.time()
+            if current_time - start >= 600:
+                total_time += 600
+                seconds_to_days_minutes_hours(total_time)
+                start = current_time
+
+            try:
+                response, ki_id, handle_request_id, binding_set, requesting_kb_id = \
+                    await loop.run_in_executor(None, self.handle)
+
+            except Exception as e:
+                traceback.print_exc()
+                generalLogger.error(repr(e))
+
+                await loop.run_in_executor(None, self.on_handle_error)
+                continue
+
+            if response.status_code >= 300:
+                generalLogger.warning(f"Handle request status code: {response.status_code}")
+                generalLogger.warning(f"Handle request response: {response.content}")
+
+                await loop.run_in_executor(None, exitEvent.wait, HANDLE_ERROR_BACKOFF_SECONDS)
+                continue
+
+            # Long poll expired without any request
+            if ki_id is None:
+                continue
+
+            generalLogger.info(f"Handle Request ID: {handle_request_id}")
+            generalLogger.info(f"Requesting KB ID: {requesting_kb_id}")
+            generalLogger.info(f"KI ID of requesting interaction: {ki_id}")
+
+            handler = self._find_handler(ki_id)
+            if handler is None:
+                generalLogger.warning(f"Unexpected KI ID received: {ki_id}")
+                generalLogger.warning(f"From KB: {requesting_kb_id}\n")
+                continue
+
+            await self.dispatch(loop, exitEvent, handler, handle_request_id, ki_id, binding_set)
+
+        generalLogger.info(f"{self.name} reactive dispatcher stopped. Exiting...")
+
+    async def dispatch(self, loop, exitEvent, handler, handle_request_id, ki_id, binding_set):
+        if handler.react is not None:
+            try:
+                await loop.run_in_executor(
+                    None, handler.react, handle_request_id, ki_id, binding_set
+                )
+
+            except Exception as e:
+                traceback.print_exc()
+                generalLogger.error(f"Failed to react to {handler.name} request: {repr(e)}")
+
+                await loop.run_in_executor(None, self.on_handle_error)
+                return
+
+        if self.worker_pool is None:
+            await loop.run_in_executor(None, run_with_session, handler, binding_set)
+            return
+
+        partition_key = None
+        if handler.partition_key is not None:
+            try:
+                partition_key = handler.partition_key(binding_set)
+            except (KeyError, IndexError, AttributeError) as e:
+                generalLogger.warning(f"No partition key in {handler.name} binding set: {repr(e)}")
+
+        # Blocks while the worker queue is full, holding the next long poll
+        await loop.run_in_executor(
+            None, self.worker_pool.submit, partition_key, handler, binding_set, exitEvent
+        )
+
+    def _find_handler(self, ki_id):
+        for handler in self.handlers:
+            if handler.ki_id_getter() == ki_id:
+                return handler
+
+        return None
+
+
+def run_with_session(handler, binding_set):
+    session = db.create_scoped_session()
+
+    try:
+        handler.process(session, binding_set)
+
+    except (OperationalError, DatabaseError, SQLAlchemyError) as e:
+        generalLogger.error("Database error catched!")
+        generalLogger.error(repr(e))
+        traceback.print_exc()
+
+        session.rollback()
+
+    except Exception as e:
+        traceback.print_exc()
+        generalLogger.error(f"Failed to process {handler.name} binding set: {repr(e)}")
+
+        session.rollback()
+
+    finally:
+        session.close()
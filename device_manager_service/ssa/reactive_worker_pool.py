@@ -0,0 +1,117 @@
+import time
+import zlib
+import queue
+import threading
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from device_manager_service import generalLogger
+
+
+QUEUE_DEPTH = Gauge(
+    "ssa_reactive_queue_depth",
+    "Binding sets waiting to be processed, per SSA worker",
+    ["pool", "worker"]
+)
+HANDLER_LATENCY = Histogram(
+    "ssa_reactive_handler_latency_seconds",
+    "Time spent processing one binding set, per SSA handler",
+    ["pool", "handler"]
+)
+QUEUE_WAIT = Histogram(
+    "ssa_reactive_queue_wait_seconds",
+    "Time a binding set waited in the queue before being processed",
+    ["pool"]
+)
+BACKPRESSURE = Counter(
+    "ssa_reactive_backpressure_total",
+    "Times the long poll was held because a worker queue was full",
+    ["pool"]
+)
+
+# How often a blocked submit checks whether the service is stopping
+SUBMIT_RETRY_SECONDS = 1
+
+_STOP = object()
+
+
+class PartitionedWorkerPool:
+    def __init__(self, name, workers, queue_size, task):
+        """Bounded pool of single-threaded workers, partitioned by key.
+
+        Work with the same partition key (a device serial number) always goes
+        to the same worker, so it is processed in arrival order. Each worker
+        has a bounded queue: submit() blocks while it is full, which stops the
+        caller from polling for more work (backpressure).
+
+        Args:
+            name (str): Pool name, used in thread names and metric labels
+            workers (int): Number of worker threads
+            queue_size (int): Maximum queued items per worker
+            task (callable): task(handler, binding_set), run by the workers
+        """
+        self.name = name
+        self.task = task
+
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.threads = [
+            threading.Thread(name=f"{name}Worker{i}", target=self._work, args=(i,), daemon=True)
+            for i in range(workers)
+        ]
+
+        for i, worker_queue in enumerate(self.queues):
+            QUEUE_DEPTH.labels(pool=name, worker=str(i)).set_function(worker_queue.qsize)
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    # Process what is already queued, then stop the workers
+    def stop(self):
+        for worker_queue in self.queues:
+            worker_queue.put(_STOP)
+
+        for thread in self.threads:
+            thread.join()
+
+    def submit(self, partition_key, handler, binding_set, exitEvent):
+        """Queue a binding set on the worker owning partition_key.
+
+        Blocks while that worker queue is full. Returns False if the service
+        stopped while waiting, in which case the binding set is dropped.
+        """
+        worker = zlib.crc32(str(partition_key).encode()) % len(self.queues)
+        item = (handler, binding_set, time.monotonic())
+
+        try:
+            self.queues[worker].put_nowait(item)
+            return True
+        except queue.Full:
+            BACKPRESSURE.labels(pool=self.name).inc()
+            generalLogger.warning(
+                f"{self.name} worker {worker} queue is full. Holding the long poll..."
+            )
+
+        while not exitEvent.is_set():
+            try:
+                self.queues[worker].put(item, timeout=SUBMIT_RETRY_SECONDS)
+                return True
+            except queue.Full:
+                continue
+
+        generalLogger.warning(f"Service stopping. Dropped {handler.name} binding set")
+        return False
+
+    def _work(self, worker):
+        worker_queue = self.queues[worker]
+
+        while True:
+            item = worker_queue.get()
+            if item is _STOP:
+                break
+
+            handler, binding_set, queued_at = item
+            QUEUE_WAIT.labels(pool=self.name).observe(time.monotonic() - queued_at)
+
+            with HANDLER_LATENCY.labels(pool=self.name, handler=handler.name).time():
+                self.task(handler, binding_set)
@@ -0,0 +1,102 @@
+import random
+import threading
+import traceback
+from time import sleep
+
+from prometheus_client import Gauge
+
+from device_manager_service.config import Config
+
+
+SSA_READY = Gauge(
+    "ssa_adapter_ready",
+    "1 once the SSA adapter is registered in the Knowledge Engine",
+    ["adapter"]
+)
+
+
+class SSAUnavailableError(Exception):
+    def __init__(self, name):
+        super().__init__(f"SSA adapter {name} is not ready yet")
+        self.name = name
+
+
+class SSABootstrap:
+    def __init__(self, logger):
+        """Register the SSA adapters in the background, all at the same time.
+
+        Each adapter is built by its factory (which registers its KB in the
+        Knowledge Engine) in its own thread, retried with exponential backoff
+        until it succeeds. Until then, the service serves requests that do
+        not need the adapter, and get() raises SSAUnavailableError.
+        """
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._factories = {}
+        self._instances = {}
+        self._ready_events = {}
+        self._threads = []
+
+    def add(self, name, factory):
+        self._factories[name] = factory
+        self._ready_events[name] = threading.Event()
+        SSA_READY.labels(adapter=name).set(0)
+
+    # Start one registration thread per adapter
+    def start(self):
+        for name, factory in self._factories.items():
+            thread = threading.Thread(
+                name=f"SSABootstrap-{name}",
+                target=self._register,
+                args=(name, factory),
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def get(self, name):
+        """Registered adapter instance. Raises SSAUnavailableError if not ready."""
+        instance = self._instances.get(name)
+        if instance is None:
+            raise SSAUnavailableError(name)
+
+        return instance
+
+    def ready(self, *names):
+        return all(name in self._instances for name in names)
+
+    def wait(self, timeout=None):
+        """Block until every adapter is ready. Returns False on timeout."""
+        return all(event.wait(timeout) for event in self._ready_events.values())
+
+    def readiness(self):
+        """{adapter name: ready} of every adapter."""
+        return {name: name in self._instances for name in self._factories}
+
+    def _register(self, name, factory):
+        backoff = Config.SSA_BOOTSTRAP_INITIAL_BACKOFF_SECONDS
+        while True:
+            try:
+                instance = factory()
+                break
+
+            except Exception as e:
+                traceback.print_exc()
+                self.logger.error(f"SSA {name} setup failed: {repr(e)}")
+
+            # Wait before trying again, spreading the retries of all adapters
+            wait = random.uniform(backoff / 2, backoff)
+            self.logger.warning(
+                f"Waiting {wait:.1f} seconds before trying the SSA {name} setup again..."
+            )
+            sleep(wait)
+
+            backoff = min(backoff * 2, Config.SSA_BOOTSTRAP_MAX_BACKOFF_SECONDS)
+
+        with self._lock:
+            self._instances[name] = instance
+        self._ready_events[name].set()
+
+        SSA_READY.labels(adapter=name).set(1)
+        self.logger.info(f"SSA {name} is ready")
@@ -47,7 +47,8 @@ class BSHConfig:
 
     BSH_DELAYED_START_RESPONSE_WAIT_TIMEOUT_SECONDS = int(os.environ.get("BSH_DELAYED_START_RESPONSE_WAIT_TIMEOUT_SECONDS", "10"))
     BSH_DELAYED_START_SELF_HEAL_FLAG = True if os.environ.get("BSH_DELAYED_START_SELF_HEAL_FLAG", "true").lower() == "true" else False
-    BSH_DELAYED_START_DELETE_KB_FLAG = True if os.environ.get("BSH_DELAYED_START_DELETE_KB_FLAG", "true").lower() == "true" else False
+    # Delays are sent by up to BSH_DELAY_CONCURRENCY threads on the same SSA, see WP_DELAYED_START_DELETE_KB_FLAG
+    BSH_DELAYED_START_DELETE_KB_FLAG = True if os.environ.get("BSH_DELAYED_START_DELETE_KB_FLAG", "false").lower() == "true" else False
     BSH_DELAYED_START_SELF_HEAL_TRIES = int(os.environ.get("BSH_DELAYED_START_SELF_HEAL_TRIES", "1"))
 
     ASK_DEVICE_METADATA_TIMEOUT = int(os.environ.get("ASK_DEVICE_METADATA_TIMEOUT", "10"))
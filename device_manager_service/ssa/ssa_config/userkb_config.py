@@ -25,3 +25,5 @@ class UserkbConfig:
 
 
     SSA_TIMEOUT_SECONDS = int(os.environ.get("USERKB_SSA_TIMEOUT_SECONDS", "10"))
+    # Concurrent device access posts (one per KB and request)
+    DEVICE_ACCESS_WORKERS = int(os.environ.get("USERKB_DEVICE_ACCESS_WORKERS", "8"))
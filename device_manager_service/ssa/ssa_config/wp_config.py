@@ -56,3 +56,6 @@ class WPConfig:
     SECONDS_UNTIL_RECONNECT_TRY = int(os.environ.get("WP_HANDLE_SECONDS_UNTIL_RECONNECT_TRY", "10"))
     ASK_POST_RESPONSE_TIMEOUT_SECONDS = int(os.environ.get("ASK_POST_RESPONSE_TIMEOUT_SECONDS", "15"))
     ASK_POST_SELF_HEAL_TRIES = int(os.environ.get("ASK_POST_SELF_HEAL_TRIES", "1"))
+    # Delays are sent by up to WP_DELAY_CONCURRENCY threads on the same SSA: self-heal re-registers the KB
+    # without deleting it, so one thread does not delete the KB another one uses
+    WP_DELAYED_START_DELETE_KB_FLAG = True if os.environ.get("WP_DELAYED_START_DELETE_KB_FLAG", "false").lower() == "true" else False
@@ -126,7 +126,7 @@ def bsh_react_thread_main(exitEvent):
 
 
     # RECONNECT IF CONNECTION IS LOST
-    while True:
+    while not exitEvent.is_set():
         try:
             bsh_pp_handle(exitEvent, bsh_ssa)
         except Exception as e:
@@ -138,7 +138,7 @@ def bsh_react_thread_main(exitEvent):
                 f"Waiting {BSHConfig.SECONDS_UNTIL_RECONNECT_TRY} seconds " \
                 "before trying the SSA setup again..."
             )
-            sleep(BSHConfig.SECONDS_UNTIL_RECONNECT_TRY)
+            exitEvent.wait(BSHConfig.SECONDS_UNTIL_RECONNECT_TRY)
 
 # def wp_thread_main(exitEvent):
 #     setup_complete = False
@@ -208,7 +208,7 @@ def wp_react_thread_main(exitEvent):
 
 
     # RECONNECT IF CONNECTION IS LOST
-    while True:
+    while not exitEvent.is_set():
         try:
             wp_power_profile_handle(exitEvent, whirlpool_ssa)
         except Exception as e:
@@ -220,4 +220,4 @@ def wp_react_thread_main(exitEvent):
                 f"Waiting {WPConfig.SECONDS_UNTIL_RECONNECT_TRY} seconds " \
                 "before trying the SSA setup again..."
             )
-            sleep(WPConfig.SECONDS_UNTIL_RECONNECT_TRY)
+            exitEvent.wait(WPConfig.SECONDS_UNTIL_RECONNECT_TRY)
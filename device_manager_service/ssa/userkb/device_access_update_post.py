@@ -1,94 +1,145 @@
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
-from device_manager_service import generalLogger, db, userkb_ssa
+from device_manager_service import generalLogger, db, ssa_adapters
 # from device_manager_service.ssa.ssa_classes.userkb_ssa import UserkbSSA
 from device_manager_service.ssa.ssa_config.userkb_config import UserkbConfig
 from device_manager_service.ssa.ssa_config.bsh_config import BSHConfig
 
 from device_manager_service.utils.database.db_interactions import commit_db_changes
+from device_manager_service.utils.database.device_metadata import invalidate_device_metadata
 
 from device_manager_service.models.db_models import DBShiftableMachine
 
 
+# Posts to the KBs run concurrently, so the update takes as long as the slowest KB
+_kb_executor = ThreadPoolExecutor(
+    max_workers=UserkbConfig.DEVICE_ACCESS_WORKERS,
+    thread_name_prefix="DeviceAccessUpdate"
+)
+
+
 # Specific Service Adapter logic #
 
+def _post_device_access(kb, serial_number: str, device_ssa: str, status: bool):
+    """Post the device access status to one KB.
+
+    Returns (message, status_code, update_db). update_db is True when the KB
+    accepted the update without a response body.
+    """
+    bindings = [{
+        "kb": kb, 
+        "deviceSsa": f"{device_ssa}",
+        "event": f"http://pt-pilot.example.org/events/{uuid.uuid4()}",
+        "deviceId": f"{serial_number}",
+        "device": f"<http://example.org/spine-ssa/devices/{serial_number}>",
+        "status": f"{str(status).lower()}",
+        "timestamp": f"{datetime.now(timezone.utc).isoformat()}"
+    }]
+
+
+    try:
+        userkb_ssa = ssa_adapters.get("userkb")
+        response, status_code = userkb_ssa.ask_or_post(
+            bindings=bindings,
+            ki_id=userkb_ssa.userkb_device_access_ki,
+            response_wait_timeout_seconds=UserkbConfig.SSA_TIMEOUT_SECONDS,
+            self_heal=True,
+            # The KBs are posted to at the same time through the same SSA:
+            # re-registered, not deleted, so one thread does not delete the KB another one uses
+            delete_kb_when_self_heal=False,
+            self_heal_tries=2
+        )
+    except Exception as e:
+        generalLogger.error(f"Error in SSA post request: {repr(e)}")
+        
+        return "Error in SSA ask/post request", 500, False
+    
+    generalLogger.info(f"SSA post response status code: {status_code}")
+    
+    if "exchangeInfo" not in response.keys():
+        generalLogger.error("SSA call failed with empty exchangeInfo. It is likely a GP mismatch. Check your GPs.")
+        message = f"Empty ExchangeInfo. Failed to update device {serial_number} access to {status}"
+
+        return message, 400, False
+
+    if len(response["exchangeInfo"][0]["resultBindingSet"]) == 0:
+        return f"Successfully update device {serial_number} access to {status}", 200, True
+
+    try:
+        message = response["exchangeInfo"][0]["resultBindingSet"][0]["bodyText"].replace('"', '')
+        status_code = int(response["exchangeInfo"][0]["resultBindingSet"][0]["statusCodeValue"].replace('"', ''))
+        generalLogger.info(f"Device access update interaction response: {message}")
+        
+    except KeyError as e:
+        generalLogger.error(f"Error processing device access update interaction: {repr(e)}")
+        message = f"Error processing device {serial_number} access update to {status}"
+        status_code = 400
+
+    return message, status_code, False
+
+
 def device_access_update_post(serial_number: str, device_ssa: str, status: bool):
     generalLogger.info("# DEVICE ACCESS UPDATE POST #\n")
 
+    if not ssa_adapters.ready("userkb"):
+        generalLogger.error("User KB SSA is not registered yet")
+        return "User KB SSA is not ready yet. Try again later.", 503
 
     kbs_to_give_access = [
         f"{BSHConfig.INESCTEC_BSH_SERVICE_PRIMARY_URL}/adapter/{BSHConfig.KB_ASSET_ID}",
         f"{BSHConfig.INESCTEC_BSH_SERVICE_PRIMARY_URL}/adapter/{BSHConfig.KB_REACT_ASSET_ID}"
     ]
-    
-    for kb in kbs_to_give_access:
-        bindings = [{
-            "kb": kb, 
-            "deviceSsa": f"{device_ssa}",
-            "event": f"http://pt-pilot.example.org/events/{uuid.uuid4()}",
-            "deviceId": f"{serial_number}",
-            "device": f"<http://example.org/spine-ssa/devices/{serial_number}>",
-            "status": f"{str(status).lower()}",
-            "timestamp": f"{datetime.now(timezone.utc).isoformat()}"
-        }]
 
+    futures = {
+        kb: _kb_executor.submit(_post_device_access, kb, serial_number, device_ssa, status)
+        for kb in kbs_to_give_access
+    }
+
+    results = {}
+    for kb, future in futures.items():
+        results[kb] = future.result()
+        generalLogger.info(
+            f'Device access update interaction for kb: {kb}... ' \
+            f'{results[kb][1]} {results[kb][0]}\n'
+        )
+
+    failed = {kb: result for kb, result in results.items() if result[1] != 200}
+    if len(failed) > 0:
+        succeeded = [kb for kb in results if kb not in failed]
+        message = "; ".join(
+            f"{kb}: {message} ({status_code})" for kb, (message, status_code, _) in failed.items()
+        )
+        generalLogger.error(
+            f"Device {serial_number} access update to {status} failed for {len(failed)} of " \
+            f"{len(results)} KBs. Failed: {message}. Succeeded: {succeeded}"
+        )
+
+        # Report the first failing KB status code
+        _, status_code, _ = next(iter(failed.values()))
+
+        return message, status_code
+
+    message, status_code, _ = results[kbs_to_give_access[-1]]
 
+    if any(update_db for _, _, update_db in results.values()):
         try:
-            response, status_code = userkb_ssa.ask_or_post(
-                bindings=bindings,
-                ki_id=userkb_ssa.userkb_device_access_ki,
-                response_wait_timeout_seconds=UserkbConfig.SSA_TIMEOUT_SECONDS,
-                self_heal=True,
-                delete_kb_when_self_heal=True,
-                self_heal_tries=2
-            )
-        except Exception as e:
-            generalLogger.error(f"Error in SSA post request: {repr(e)}")
+            device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()            
+            device_in_db.allow_hems = status
+            device_in_db.automatic_management = status
+            db_error_msg = f"Database failed to COMMIT to database\n"
+            _ = commit_db_changes(db.session, db_error_msg)
+            invalidate_device_metadata(serial_number)
             
-            return "Error in SSA ask/post request", 500
-        
-        generalLogger.info(f"SSA post response status code: {status_code}")
+        except Exception as e:
+            generalLogger.error(f"Error updating device access in DB: {repr(e)}")
+            message = f"Error updating device {serial_number} access to {status} in DB"
+            status_code = 400
         
-        if "exchangeInfo" in response.keys():
-            if len(response["exchangeInfo"][0]["resultBindingSet"]) != 0:
-                try:
-                    message = response["exchangeInfo"][0]["resultBindingSet"][0]["bodyText"].replace('"', '')
-                    status_code = int(response["exchangeInfo"][0]["resultBindingSet"][0]["statusCodeValue"].replace('"', ''))
-                    generalLogger.info(f"Device access update interaction response: {message}")
-                    
-                except KeyError as e:
-                    generalLogger.error(f"Error processing device access update interaction: {repr(e)}")
-                    message = f"Error processing device {serial_number} access update to {status}"
-                    status_code = 400
-            
-            else:
-                
-                try:
-                    device_in_db = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()            
-                    device_in_db.allow_hems = status
-                    device_in_db.automatic_management = status
-                    db_error_msg = f"Database failed to COMMIT to database\n"
-                    _ = commit_db_changes(db.session, db_error_msg)
-                    
-                except Exception as e:
-                    generalLogger.error(f"Error updating device access in DB: {repr(e)}")
-                    message = f"Error updating device {serial_number} access to {status} in DB"
-                    status_code = 400
-                
-                else:
-                    message = f"Successfully update device {serial_number} access to {status}"
-                    status_code = 200
-
-            generalLogger.info(f'Device access update interaction for kb: {kb}... DONE\n')
-
-            if status_code != 200:
-                break
         else:
-            generalLogger.error("SSA call failed with empty exchangeInfo. It is likely a GP mismatch. Check your GPs.")
-            message = f"Empty ExchangeInfo. Failed to update device {serial_number} access to {status}"
-            status_code = 400
-            break
+            message = f"Successfully update device {serial_number} access to {status}"
+            status_code = 200
     
     
     return message, status_code
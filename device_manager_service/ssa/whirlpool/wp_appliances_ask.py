@@ -1,4 +1,4 @@
-from device_manager_service import generalLogger, whirlpool_proactive_ssa
+from device_manager_service import generalLogger, ssa_adapters
 
 from device_manager_service.ssa.ssa_config.wp_config import WPConfig
 from device_manager_service.utils.ssa.process_bs import process_whirlpool_binding_set
@@ -21,6 +21,8 @@ def wp_appliances_ask(token):
 
     generalLogger.info(f"# WP APPLIANCES ASK #\n")
 
+    whirlpool_proactive_ssa = ssa_adapters.get("whirlpool_proactive")
+
     ask_response, ask_response_code = whirlpool_proactive_ssa.ask_or_post(
         bindings=bindings,
         ki_id=whirlpool_proactive_ssa.ask_appliaces_ki_id,
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 
-from device_manager_service import generalLogger, whirlpool_proactive_ssa
+from device_manager_service import generalLogger, ssa_adapters
 from device_manager_service.utils.ssa.process_bs import process_whirlpool_binding_set
 from device_manager_service.ssa.ssa_config.wp_config import WPConfig
 
@@ -28,12 +28,14 @@ def wp_delay_post(sequence_id, device_address, new_start_time : datetime):
 
     generalLogger.info("# WP DELAYED START POST #\n")
 
+    whirlpool_proactive_ssa = ssa_adapters.get("whirlpool_proactive")
+
     post_response, post_response_code = whirlpool_proactive_ssa.ask_or_post(
         bindings=bindings,
         ki_id=whirlpool_proactive_ssa.wp_delay_ki_id,
         response_wait_timeout_seconds=WPConfig.ASK_POST_RESPONSE_TIMEOUT_SECONDS,
         self_heal=True,
-        delete_kb_when_self_heal=True,
+        delete_kb_when_self_heal=WPConfig.WP_DELAYED_START_DELETE_KB_FLAG,
         self_heal_tries=WPConfig.ASK_POST_SELF_HEAL_TRIES
     )
     
@@ -1,4 +1,4 @@
-from device_manager_service import generalLogger, whirlpool_proactive_ssa
+from device_manager_service import generalLogger, ssa_adapters
 from device_manager_service.utils.ssa.process_bs import process_whirlpool_binding_set
 
 from device_manager_service.ssa.ssa_config.wp_config import WPConfig
@@ -21,6 +21,8 @@ def wp_register_ask(token, device_address, register="true"):
 
     generalLogger.info("# WP APPLIANCES REGISTER ASK #\n")
 
+    whirlpool_proactive_ssa = ssa_adapters.get("whirlpool_proactive")
+
     ask_response, ask_response_code = whirlpool_proactive_ssa.ask_or_post(
         bindings=bindings,
         ki_id=whirlpool_proactive_ssa.ask_register_ki_id,
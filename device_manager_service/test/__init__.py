@@ -5,10 +5,13 @@ from flask_testing import TestCase
 
 from flask_sqlalchemy import SQLAlchemy
 
+from device_manager_service import ssa_adapters
 from device_manager_service.encoder import JSONEncoder
 from device_manager_service.config import Config
 # import device_manager_service.accountEventConsumers as ec
 from device_manager_service.accountEventConsumers import AccountEventConsumers
+from device_manager_service.utils.database.device_metadata import clear_device_metadata_cache
+from device_manager_service.utils.validation.streaming_response_validator import StreamingResponseValidator
 # import unittest
 
 # Setup Flask SQLAlchemy
@@ -33,10 +36,13 @@ class BaseTestCase(TestCase):
         app = connexionApp.app
         app.config.from_object(Config)
 
+        # Not the sampled validator of __main__.py: every test response, except
+        # the streamed ones, is validated and fails the request if it does not conform
         connexionApp.add_api('openapi.yaml',
                                 arguments={'title': 'Device Manager Service'},
                                 pythonic_params=True,
-                                validate_responses=True)
+                                validate_responses=True,
+                                validator_map={'response': StreamingResponseValidator})
 
         db.init_app(app)
 
@@ -49,6 +55,9 @@ class BaseTestCase(TestCase):
         db.create_all()
         db.create_all(bind=['account_manager'])
 
+        # Tables are recreated behind the process-local caches
+        clear_device_metadata_cache()
+
     def tearDown(self):
         # db.session.remove()
         db.drop_all()
@@ -56,6 +65,9 @@ class BaseTestCase(TestCase):
 
     @classmethod
     def setUpClass(cls):
+        # Tests use the SSA adapters, wait for their registration
+        ssa_adapters.wait()
+
         print("Account event consumers")
         cls.ec = AccountEventConsumers()
         print("Account event consumers start")
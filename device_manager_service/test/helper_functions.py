@@ -9,6 +9,7 @@ from flask import json
 import requests
 from device_manager_service.config import Config
 from device_manager_service import db
+from device_manager_service.utils.database.device_metadata import clear_device_metadata_cache
 
 from device_manager_service.models.db_models import (
     DBConfirmationToken,
@@ -58,6 +59,9 @@ def clean_database():
         print("MOCK DATABASE - FAILED TO DELETE DB")
         db.session.rollback()
 
+    # Devices were removed behind the cache
+    clear_device_metadata_cache()
+
 
 async def clean_temporal_workflows():
     client = await Client.connect(Config.TEMPORAL_URL)
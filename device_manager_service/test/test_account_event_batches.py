@@ -0,0 +1,189 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import json
+import time
+import unittest
+import uuid
+from unittest import mock
+
+from device_manager_service import db
+from device_manager_service import accountEventConsumers
+from device_manager_service.accountEventConsumers import processBatch, rewind
+from device_manager_service.config import Config
+from device_manager_service.models.db_models import DBDongles, DBProcessedEvent
+from device_manager_service.models.events import UserHardDeletedEventType, UserSoftDeletedEventType
+from device_manager_service.test import BaseTestCase
+from device_manager_service.utils.database.processed_events import clear_processed_events_cache
+
+
+def message(event_id, event_type=UserSoftDeletedEventType, offset=0, partition=0):
+    value = json.dumps({
+        "payload": {"eventId": event_id, "eventType": event_type, "payload": "{}"}
+    })
+    return mock.Mock(value=value, topic=Config.KAFKA_ACCOUNT_TOPIC, partition=partition, offset=offset)
+
+
+def user_id(event_id):
+    return event_id.replace("-", "")
+
+
+class TestAccountEventBatches(BaseTestCase):
+    """processBatch tests, with the event handlers mocked"""
+
+    def setUp(self):
+        super().setUp()
+        clear_processed_events_cache()
+
+        self.handled = []
+        self.failing = set()
+        self.stale_devices = {}
+
+    def handle_event(self, session, eventId, eventType, payload):
+        """Adds a dongle row per event, the change committed with the event."""
+        self.handled.append((eventId, session))
+        if eventId in self.failing:
+            return False, []
+
+        session.add(DBDongles(user_id=user_id(eventId)))
+        return True, self.stale_devices.get(eventId, [])
+
+    def process(self, messages, deadline=None):
+        with mock.patch.object(accountEventConsumers, "handleEvent", side_effect=self.handle_event):
+            return processBatch(messages, deadline)
+
+    def committed_dongles(self):
+        session = db.create_scoped_session()
+        try:
+            return {row.user_id for row in session.query(DBDongles.user_id)}
+        finally:
+            session.close()
+
+    def claimed_events(self):
+        return {str(row.event_id) for row in db.session.query(DBProcessedEvent.event_id)}
+
+    def test_batch_in_one_transaction(self):
+        event_ids = [str(uuid.uuid4()) for _ in range(3)]
+
+        self.assertEqual(self.process([message(event_id) for event_id in event_ids]), 3)
+
+        self.assertEqual([event_id for event_id, _ in self.handled], event_ids)
+        self.assertEqual(len({session for _, session in self.handled}), 1)
+        self.assertEqual(self.committed_dongles(), {user_id(event_id) for event_id in event_ids})
+        self.assertEqual(self.claimed_events(), set(event_ids))
+
+    def test_side_effect_events_split_the_batch(self):
+        event_ids = [str(uuid.uuid4()) for _ in range(3)]
+        messages = [message(event_id, UserHardDeletedEventType) for event_id in event_ids]
+
+        with mock.patch.object(Config, "KAFKA_SIDE_EFFECT_BATCH_MAX_EVENTS", 2):
+            self.assertEqual(self.process(messages), 3)
+
+        sessions = [session for _, session in self.handled]
+        self.assertIs(sessions[0], sessions[1])
+        self.assertIsNot(sessions[1], sessions[2])
+        self.assertEqual(self.committed_dongles(), {user_id(event_id) for event_id in event_ids})
+
+    def test_duplicates_in_batch(self):
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+
+        self.assertEqual(self.process([message(first), message(second), message(first)]), 3)
+
+        self.assertEqual([event_id for event_id, _ in self.handled], [first, second])
+        self.assertEqual(self.committed_dongles(), {user_id(first), user_id(second)})
+
+    def test_already_processed_events_are_skipped(self):
+        event_id = str(uuid.uuid4())
+        self.process([message(event_id)])
+
+        clear_processed_events_cache()
+        self.handled = []
+        self.assertEqual(self.process([message(event_id)]), 1)
+
+        self.assertEqual(self.handled, [])
+
+    def test_failed_event_falls_back_one_by_one(self):
+        event_ids = [str(uuid.uuid4()) for _ in range(3)]
+        self.failing = {event_ids[1]}
+
+        self.assertEqual(self.process([message(event_id) for event_id in event_ids]), 3)
+
+        # Batch up to the failed event, then every event alone
+        self.assertEqual(
+            [event_id for event_id, _ in self.handled],
+            [event_ids[0], event_ids[1]] + event_ids
+        )
+        self.assertEqual(len({session for _, session in self.handled[2:]}), 3)
+
+        self.assertEqual(self.committed_dongles(), {user_id(event_ids[0]), user_id(event_ids[2])})
+        # The failed event can be processed again
+        self.assertEqual(self.claimed_events(), {event_ids[0], event_ids[2]})
+
+    def test_invalid_events_are_skipped(self):
+        event_id = str(uuid.uuid4())
+        invalid = mock.Mock(value=b"not json", topic=Config.KAFKA_ACCOUNT_TOPIC, partition=0, offset=1)
+
+        self.assertEqual(self.process([message(event_id), invalid]), 2)
+
+        self.assertEqual(self.committed_dongles(), {user_id(event_id)})
+
+    def test_stale_devices_invalidated_after_commit(self):
+        event_id = str(uuid.uuid4())
+        self.stale_devices = {event_id: ["stale-device-1", "stale-device-2"]}
+
+        committed_on_invalidation = []
+
+        def invalidate(*serial_numbers):
+            committed_on_invalidation.append((serial_numbers, user_id(event_id) in self.committed_dongles()))
+
+        with mock.patch.object(accountEventConsumers, "invalidate_device_metadata", side_effect=invalidate):
+            self.process([message(event_id)])
+
+        self.assertEqual(committed_on_invalidation, [(("stale-device-1", "stale-device-2"), True)])
+
+    def test_stale_devices_kept_when_commit_fails(self):
+        event_id = str(uuid.uuid4())
+        self.stale_devices = {event_id: ["stale-device-1"]}
+
+        with mock.patch.object(accountEventConsumers, "commit_db_changes", return_value=500), \
+                mock.patch.object(accountEventConsumers, "invalidate_device_metadata") as invalidate:
+            self.process([message(event_id)])
+
+        invalidate.assert_not_called()
+        self.assertEqual(self.committed_dongles(), set())
+
+    def test_deadline_leaves_the_rest_for_the_next_poll(self):
+        event_ids = [str(uuid.uuid4()) for _ in range(3)]
+        messages = [message(event_id, offset=offset) for offset, event_id in enumerate(event_ids)]
+
+        # Expired: only the first event is started
+        self.assertEqual(self.process(messages, time.monotonic() - 1), 1)
+
+        self.assertEqual(self.committed_dongles(), {user_id(event_ids[0])})
+        self.assertEqual(self.claimed_events(), {event_ids[0]})
+
+        self.assertEqual(self.process(messages[1:], time.monotonic() + 60), 2)
+
+        self.assertEqual(self.committed_dongles(), {user_id(event_id) for event_id in event_ids})
+
+
+class TestRewind(unittest.TestCase):
+    """Seeking back to the events not processed"""
+
+    def test_rewind_to_first_message_of_each_partition(self):
+        consumer = mock.Mock()
+        messages = [
+            message(str(uuid.uuid4()), partition=0, offset=7),
+            message(str(uuid.uuid4()), partition=0, offset=8),
+            message(str(uuid.uuid4()), partition=1, offset=3),
+        ]
+
+        rewind(consumer, messages)
+
+        seeks = {(call.args[0].partition, call.args[1]) for call in consumer.seek.call_args_list}
+        self.assertEqual(seeks, {(0, 7), (1, 3)})
+
+
+if __name__ == "__main__":
+    unittest.main()
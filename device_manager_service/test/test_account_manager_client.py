@@ -0,0 +1,49 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from device_manager_service.clients.hems_services import account_manager
+from device_manager_service.clients.hems_services.account_manager import iter_dongles
+
+
+def dongles(first, last):
+    return [{"user_id": f"user-{i}", "api_key": f"key-{i}"} for i in range(first, last)]
+
+
+class TestIterDongles(unittest.TestCase):
+    """Paging of the account manager dongle list"""
+
+    def iter_pages(self, side_effect, page_size=2):
+        with mock.patch.object(account_manager, "list_dongles_page", side_effect=side_effect) as list_page:
+            result = list(iter_dongles(page_size))
+        return result, [c.args[:2] for c in list_page.call_args_list]
+
+    def test_reads_pages_until_a_short_page(self):
+        pages = {0: dongles(0, 2), 2: dongles(2, 4), 4: dongles(4, 5)}
+
+        result, calls = self.iter_pages(lambda offset, limit, cor_id: pages[offset])
+
+        self.assertEqual(result, dongles(0, 5))
+        self.assertEqual(calls, [(0, 2), (2, 2), (4, 2)])
+
+    def test_stops_after_an_empty_page(self):
+        pages = {0: dongles(0, 2), 2: []}
+
+        result, calls = self.iter_pages(lambda offset, limit, cor_id: pages[offset])
+
+        self.assertEqual(result, dongles(0, 2))
+        self.assertEqual(calls, [(0, 2), (2, 2)])
+
+    def test_stops_when_paging_is_ignored(self):
+        # Whole list on every page, exactly page_size long
+        result, calls = self.iter_pages(lambda offset, limit, cor_id: dongles(0, 2))
+
+        self.assertEqual(result, dongles(0, 2))
+        self.assertEqual(calls, [(0, 2), (2, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
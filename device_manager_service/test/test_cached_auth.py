@@ -0,0 +1,100 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import time
+import unittest
+from unittest import mock
+
+import jwt
+
+from device_manager_service.utils.cache.cached_auth import CachedAuth
+
+
+TTL_SECONDS = 300
+
+
+def token(**claims):
+    return "Bearer " + jwt.encode(claims, "secret", algorithm="HS256")
+
+
+class TestCachedAuth(unittest.TestCase):
+    """CachedAuth unit tests, with a mocked Auth backend"""
+
+    def cached_auth(self, auth_response, auth_code):
+        backend = mock.Mock()
+        backend.verify_basic_authorization.return_value = (auth_response, auth_code)
+
+        return CachedAuth(backend, max_size=100, ttl_seconds=TTL_SECONDS), backend
+
+    def ttl_of(self, cached_auth):
+        (_, expires_at), = cached_auth.cache._entries.values()
+
+        return expires_at - time.monotonic()
+
+    def test_success_is_cached(self):
+        cached_auth, backend = self.cached_auth("user1", 200)
+        headers = {"Authorization": token(exp=time.time() + 3600)}
+
+        self.assertEqual(cached_auth.verify_basic_authorization(headers), ("user1", 200))
+        self.assertEqual(cached_auth.verify_basic_authorization(headers), ("user1", 200))
+
+        self.assertEqual(backend.verify_basic_authorization.call_count, 1)
+
+    def test_failure_is_not_cached(self):
+        cached_auth, backend = self.cached_auth("error in authorization token", 401)
+        headers = {"Authorization": token(exp=time.time() + 3600)}
+
+        self.assertEqual(cached_auth.verify_basic_authorization(headers)[1], 401)
+        self.assertEqual(cached_auth.verify_basic_authorization(headers)[1], 401)
+
+        self.assertEqual(backend.verify_basic_authorization.call_count, 2)
+        self.assertEqual(len(cached_auth.cache._entries), 0)
+
+    def test_internal_request_is_not_cached(self):
+        cached_auth, backend = self.cached_auth(None, 200)
+
+        self.assertEqual(cached_auth.verify_basic_authorization({}), (None, 200))
+        self.assertEqual(cached_auth.verify_basic_authorization({}), (None, 200))
+
+        self.assertEqual(backend.verify_basic_authorization.call_count, 2)
+
+    def test_ttl_capped_by_token_expiry(self):
+        cached_auth, _ = self.cached_auth("user1", 200)
+
+        cached_auth.verify_basic_authorization({"Authorization": token(exp=time.time() + 30)})
+
+        ttl = self.ttl_of(cached_auth)
+        self.assertLessEqual(ttl, 30)
+        self.assertGreater(ttl, 25)
+
+    def test_ttl_capped_by_cache_ttl(self):
+        cached_auth, _ = self.cached_auth("user1", 200)
+
+        cached_auth.verify_basic_authorization({"Authorization": token(exp=time.time() + 3600)})
+
+        ttl = self.ttl_of(cached_auth)
+        self.assertLessEqual(ttl, TTL_SECONDS)
+        self.assertGreater(ttl, TTL_SECONDS - 5)
+
+    def test_expired_token_is_not_cached(self):
+        cached_auth, backend = self.cached_auth("user1", 200)
+        headers = {"Authorization": token(exp=time.time() - 1)}
+
+        cached_auth.verify_basic_authorization(headers)
+        cached_auth.verify_basic_authorization(headers)
+
+        self.assertEqual(backend.verify_basic_authorization.call_count, 2)
+
+    def test_token_without_expiry_is_not_cached(self):
+        cached_auth, backend = self.cached_auth("user1", 200)
+        headers = {"Authorization": token(sub="user1")}
+
+        cached_auth.verify_basic_authorization(headers)
+        cached_auth.verify_basic_authorization(headers)
+
+        self.assertEqual(backend.verify_basic_authorization.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import datetime, timedelta
+
+import unittest
+from unittest import mock
+
+from device_manager_service import db
+from device_manager_service.models.db_models import DBShiftableMachine
+from device_manager_service.ssa.bosch_miele import connection_state_coalescer
+from device_manager_service.ssa.bosch_miele.connection_state_coalescer import (
+    ConnectionStateCoalescer,
+    update_connection_states,
+)
+from device_manager_service.test import BaseTestCase
+from device_manager_service.test.helper_functions import clean_database
+
+
+NOW = datetime(2030, 1, 2, 12, 0, 0)
+
+
+def add_machine(serial_number, connection_state, connection_state_timestamp):
+    db.session.add(DBShiftableMachine(
+        user_id="coalescer-user",
+        name=serial_number,
+        device_type="WASHING_MACHINE",
+        brand="Bosch",
+        serial_number=serial_number,
+        connection_state=connection_state,
+        connection_state_timestamp=connection_state_timestamp,
+    ))
+    db.session.commit()
+
+
+def saved_state(serial_number):
+    db.session.expire_all()
+    machine = DBShiftableMachine.query.filter_by(serial_number=serial_number).first()
+
+    return machine.connection_state, machine.connection_state_timestamp
+
+
+class TestConnectionStateCoalescer(BaseTestCase):
+    """ConnectionStateCoalescer and update_connection_states tests"""
+
+    def test_add_keeps_latest_state(self):
+        coalescer = ConnectionStateCoalescer(window_seconds=60)
+
+        coalescer.add("device1", False, NOW)
+        coalescer.add("device1", True, NOW + timedelta(seconds=1))
+        # Older and equal timestamps do not replace the buffered state
+        coalescer.add("device1", False, NOW - timedelta(seconds=1))
+        coalescer.add("device1", False, NOW + timedelta(seconds=1))
+        coalescer.add("device2", False, NOW)
+
+        self.assertEqual(coalescer._latest, {
+            "device1": (True, NOW + timedelta(seconds=1)),
+            "device2": (False, NOW),
+        })
+
+    def test_flush_writes_latest_states(self):
+        clean_database()
+        add_machine("coalescer1", True, NOW - timedelta(minutes=1))
+        add_machine("coalescer2", True, NOW - timedelta(minutes=1))
+
+        coalescer = ConnectionStateCoalescer(window_seconds=60)
+        coalescer.add("coalescer1", False, NOW)
+        coalescer.add("coalescer1", True, NOW + timedelta(seconds=1))
+        coalescer.add("coalescer1", False, NOW + timedelta(seconds=2))
+        coalescer.add("coalescer2", False, NOW)
+        coalescer.flush()
+
+        self.assertEqual(saved_state("coalescer1"), (False, NOW + timedelta(seconds=2)))
+        self.assertEqual(saved_state("coalescer2"), (False, NOW))
+        self.assertEqual(coalescer._latest, {})
+
+    def test_flush_failure_buffers_states_again(self):
+        coalescer = ConnectionStateCoalescer(window_seconds=60)
+        coalescer.add("device1", False, NOW)
+        coalescer.add("device2", False, NOW)
+
+        def fail(session, latest):
+            # A newer state of device1 arrives while the flush is running
+            coalescer.add("device1", True, NOW + timedelta(seconds=1))
+            raise RuntimeError("database unavailable")
+
+        with mock.patch.object(connection_state_coalescer, "update_connection_states", side_effect=fail):
+            coalescer.flush()
+
+        self.assertEqual(coalescer._latest, {
+            "device1": (True, NOW + timedelta(seconds=1)),
+            "device2": (False, NOW),
+        })
+
+    def test_update_connection_states_skips_older_timestamps(self):
+        clean_database()
+        add_machine("coalescer1", True, NOW)
+        add_machine("coalescer2", True, NOW)
+        add_machine("coalescer3", True, None)
+
+        updated = update_connection_states(db.session, {
+            "coalescer1": (False, NOW - timedelta(seconds=1)),
+            "coalescer2": (False, NOW + timedelta(seconds=1)),
+            "coalescer3": (False, NOW),
+            "missing": (False, NOW),
+        })
+        db.session.commit()
+
+        self.assertEqual(updated, {"coalescer2", "coalescer3"})
+        self.assertEqual(saved_state("coalescer1"), (True, NOW))
+        self.assertEqual(saved_state("coalescer2"), (False, NOW + timedelta(seconds=1)))
+        self.assertEqual(saved_state("coalescer3"), (False, NOW))
+
+    def test_update_connection_states_same_timestamp(self):
+        """A state with the saved timestamp is not written again"""
+        clean_database()
+        add_machine("coalescer1", True, NOW)
+
+        updated = update_connection_states(db.session, {"coalescer1": (False, NOW)})
+        db.session.commit()
+
+        self.assertEqual(updated, set())
+        self.assertEqual(saved_state("coalescer1"), (True, NOW))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from flask import json
+
+from device_manager_service import db
+from device_manager_service.models.db_models import DBShiftableMachine, DBShiftableCycle
+from device_manager_service.test import BaseTestCase
+from device_manager_service.utils.database.cycle_queries import query_cycle_owners
+
+
+def add_machine(user_id, serial_number, brand, sequence_ids):
+    start = datetime(2030, 1, 2, 10)
+    machine = DBShiftableMachine(
+        user_id=user_id,
+        name=serial_number,
+        device_type="WASHING_MACHINE",
+        brand=brand,
+        serial_number=serial_number,
+    )
+    for sequence_id in sequence_ids:
+        machine.washing_cycles.append(DBShiftableCycle(
+            sequence_id=sequence_id,
+            earliest_start_time=start,
+            latest_end_time=start + timedelta(hours=8),
+            scheduled_start_time=start,
+            expected_end_time=start + timedelta(hours=2),
+            program="cotton",
+            is_optimized=False,
+        ))
+    db.session.add(machine)
+    # Cycle ids follow the calls
+    db.session.commit()
+
+
+class TestCycleOwners(BaseTestCase):
+    """query_cycle_owners and the cycle checks of /request-delay-by-cycle"""
+
+    def setUp(self):
+        super().setUp()
+
+        add_machine("delay-user-a", "delay-a1", "Whirlpool", ["a1-1", "a1-2"])
+        add_machine("delay-user-b", "delay-b1", "Whirlpool", ["b1-1"])
+        # Same serial number and cycle on two machines
+        add_machine("delay-user-a", "delay-dup", "Whirlpool", ["dup-1"])
+        add_machine("delay-user-b", "delay-dup", "Bosch", ["dup-1"])
+
+    def test_query_cycle_owners(self):
+        cycle_owners = query_cycle_owners(db.session, [
+            ("delay-a1", "a1-1"),
+            ("delay-b1", "b1-1"),
+            # Cycle of another device, unknown device, unknown cycle
+            ("delay-a1", "b1-1"),
+            ("delay-unknown", "a1-1"),
+            ("delay-a1", "a1-unknown"),
+        ])
+
+        self.assertEqual(set(cycle_owners), {("delay-a1", "a1-1"), ("delay-b1", "b1-1")})
+        self.assertEqual(cycle_owners[("delay-a1", "a1-1")].user_id, "delay-user-a")
+        self.assertEqual(cycle_owners[("delay-b1", "b1-1")].user_id, "delay-user-b")
+        self.assertEqual(cycle_owners[("delay-b1", "b1-1")].brand, "Whirlpool")
+
+    def test_query_cycle_owners_first_cycle_wins(self):
+        cycle_owners = query_cycle_owners(db.session, [("delay-dup", "dup-1"), ("delay-dup", "dup-1")])
+
+        self.assertEqual(len(cycle_owners), 1)
+        self.assertEqual(cycle_owners[("delay-dup", "dup-1")].user_id, "delay-user-a")
+        self.assertEqual(cycle_owners[("delay-dup", "dup-1")].brand, "Whirlpool")
+
+    def test_query_cycle_owners_empty(self):
+        self.assertEqual(query_cycle_owners(db.session, []), {})
+
+    def request_delay(self, user_id, cycles):
+        body = [
+            {"serial_number": serial_number, "sequence_id": sequence_id, "new_start_time": "2030-01-02T12:00:00Z"}
+            for serial_number, sequence_id in cycles
+        ]
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "x_correlation_id": str(uuid.uuid4()),
+        }
+
+        return self.client.open(
+            "/api/device/request-delay-by-cycle",
+            method="POST",
+            headers=headers,
+            data=json.dumps(body),
+            query_string={"user-id": user_id},
+        )
+
+    def test_request_delay_cycle_of_another_user(self):
+        response = self.request_delay("delay-user-a", [("delay-a1", "a1-1"), ("delay-b1", "b1-1")])
+
+        self.assert400(response, "Response body is : " + response.data.decode("utf-8"))
+
+    def test_request_delay_missing_cycle(self):
+        response = self.request_delay("delay-user-a", [("delay-a1", "a1-1"), ("delay-a1", "a1-unknown")])
+
+        self.assert404(response, "Response body is : " + response.data.decode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
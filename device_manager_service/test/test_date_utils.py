@@ -0,0 +1,37 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from device_manager_service.utils.date.durations_to_minutes import durations_to_minutes
+
+
+class TestDurationsToMinutes(unittest.TestCase):
+    """durations_to_minutes unit tests"""
+
+    def test_durations_to_minutes(self):
+        self.assertEqual(
+            durations_to_minutes(["00:15:00", "01:03:00", "00:00:00"]),
+            [15, 63, 0]
+        )
+
+    def test_durations_to_minutes_duplicates(self):
+        """Duplicate durations are parsed once, but every slot keeps its value, in order"""
+        durations = ["00:15:00", "00:30:00", "00:15:00", "00:15:00", "00:30:00"]
+
+        self.assertEqual(durations_to_minutes(durations), [15, 30, 15, 15, 30])
+
+    def test_durations_to_minutes_ignores_seconds(self):
+        self.assertEqual(durations_to_minutes(["00:01:59"]), [1])
+
+    def test_durations_to_minutes_empty(self):
+        self.assertEqual(durations_to_minutes([]), [])
+
+    def test_durations_to_minutes_invalid(self):
+        with self.assertRaises(ValueError):
+            durations_to_minutes(["15 minutes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
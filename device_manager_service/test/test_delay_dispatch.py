@@ -0,0 +1,114 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from device_manager_service.ssa import delay_dispatch
+from device_manager_service.ssa.bosch_miele.bsh_delay_post import bsh_delay_post
+from device_manager_service.ssa.delay_dispatch import dispatch_delays
+from device_manager_service.ssa.whirlpool.wp_delay_post import wp_delay_post
+
+
+COR_ID = {"X-Correlation-ID": "test-delay-dispatch"}
+
+
+class TestDelayDispatch(unittest.TestCase):
+    """dispatch_delays tests, with mocked SSA delay calls"""
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def record(self, device, sequence_id):
+        with self.lock:
+            self.calls.append((device, sequence_id))
+
+    def wp_delay_post(self, sequence_id, device_address, new_start_time):
+        self.record(device_address, sequence_id)
+        # Leave time for other devices to interleave
+        time.sleep(0.01)
+
+        return f"Delayed {sequence_id}", 200
+
+    def bsh_delay_post(self, power_sequence, device_id, associated_device, sequence_id, new_start_time):
+        self.record(device_id, sequence_id)
+
+        raise RuntimeError("Bosch SSA unreachable")
+
+    def dispatch(self, delays):
+        with mock.patch.object(delay_dispatch, "wp_delay_post", side_effect=self.wp_delay_post), \
+                mock.patch.object(delay_dispatch, "bsh_delay_post", side_effect=self.bsh_delay_post):
+            return dispatch_delays(delays, COR_ID)
+
+    def test_dispatch_delays_keeps_device_order(self):
+        delays = [
+            ("wp1", f"wp1-{i}", "Whirlpool", "2030-01-02T10:00:00Z") for i in range(5)
+        ] + [
+            ("wp2", f"wp2-{i}", "Hotpoint", "2030-01-02T10:00:00Z") for i in range(5)
+        ]
+        # Interleave the devices in the request
+        delays = [delays[i // 2 + (i % 2) * 5] for i in range(10)]
+
+        results = self.dispatch(delays)
+
+        self.assertEqual(results, [(f"Delayed {delay[1]}", 200) for delay in delays])
+        for device in ("wp1", "wp2"):
+            self.assertEqual(
+                [sequence_id for call_device, sequence_id in self.calls if call_device == device],
+                [f"{device}-{i}" for i in range(5)]
+            )
+
+    def test_dispatch_delays_adapter_failure(self):
+        """A failing adapter only fails the delays sent through it"""
+        delays = [
+            ("wp1", "wp1-0", "Whirlpool", "2030-01-02T10:00:00Z"),
+            ("bsh1", "bsh1-0", "Bosch", "2030-01-02T10:00:00Z"),
+            ("wp1", "wp1-1", "Whirlpool", "2030-01-02T10:00:00Z"),
+            ("bsh1", "bsh1-1", "Miele", "2030-01-02T10:00:00Z"),
+            ("wp2", "wp2-0", "Hotpoint", "2030-01-02T10:00:00Z"),
+        ]
+
+        results = self.dispatch(delays)
+
+        failed = ("Communication of cycle new start time failed. Try again later.", 500)
+        self.assertEqual(results, [
+            ("Delayed wp1-0", 200),
+            failed,
+            ("Delayed wp1-1", 200),
+            failed,
+            ("Delayed wp2-0", 200),
+        ])
+        # The second delay of the device is still sent after the first failed
+        self.assertEqual(
+            [sequence_id for device, sequence_id in self.calls if device == "bsh1"],
+            ["bsh1-0", "bsh1-1"]
+        )
+
+    def test_concurrent_delays_do_not_delete_kb(self):
+        """Self-heal of the delays sent at the same time re-registers the KB, without deleting it"""
+        ssa = mock.Mock()
+        ssa.ask_or_post.return_value = ({"exchangeInfo": []}, 500)
+
+        with mock.patch.object(delay_dispatch.ssa_adapters, "get", return_value=ssa):
+            wp_delay_post(sequence_id="seq-1", device_address="wp-1", new_start_time=datetime(2030, 1, 2, 10))
+            bsh_delay_post(
+                power_sequence="<bsh-1/powerSequences/seq-2>", associated_device="<bsh-1>",
+                device_id="bsh-1", sequence_id="seq-2", new_start_time=datetime(2030, 1, 2, 10)
+            )
+
+        self.assertEqual(ssa.ask_or_post.call_count, 2)
+        for call in ssa.ask_or_post.call_args_list:
+            self.assertTrue(call.kwargs["self_heal"])
+            self.assertFalse(call.kwargs["delete_kb_when_self_heal"])
+
+    def test_dispatch_delays_empty(self):
+        self.assertEqual(self.dispatch([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import importlib
+import unittest
+from unittest import mock
+
+from device_manager_service import db
+from device_manager_service.models.db_models import DBShiftableMachine
+from device_manager_service.ssa.ssa_config.bsh_config import BSHConfig
+from device_manager_service.test import BaseTestCase
+
+device_access = importlib.import_module("device_manager_service.ssa.userkb.device_access_update_post")
+
+PRIMARY_KB = f"{BSHConfig.INESCTEC_BSH_SERVICE_PRIMARY_URL}/adapter/{BSHConfig.KB_ASSET_ID}"
+REACT_KB = f"{BSHConfig.INESCTEC_BSH_SERVICE_PRIMARY_URL}/adapter/{BSHConfig.KB_REACT_ASSET_ID}"
+
+# The KB accepted the update, without a response body
+ACCEPTED = ({"exchangeInfo": [{"resultBindingSet": []}]}, 200)
+
+
+class TestDeviceAccessUpdate(BaseTestCase):
+    """device_access_update_post tests, with a mocked User KB SSA"""
+
+    def setUp(self):
+        super().setUp()
+
+        db.session.add(DBShiftableMachine(
+            user_id="access-user",
+            name="access-device",
+            device_type="DISHWASHER",
+            brand="Bosch",
+            serial_number="access-device",
+            allow_hems=False,
+            automatic_management=False,
+        ))
+        db.session.commit()
+
+    def update_access(self, kb_responses):
+        def ask_or_post(bindings, **kwargs):
+            response = kb_responses[bindings[0]["kb"]]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        userkb_ssa = mock.Mock()
+        userkb_ssa.ask_or_post.side_effect = ask_or_post
+
+        with mock.patch.object(device_access.ssa_adapters, "ready", return_value=True), \
+                mock.patch.object(device_access.ssa_adapters, "get", return_value=userkb_ssa):
+            result = device_access.device_access_update_post("access-device", "bsh", True)
+
+        return result, userkb_ssa
+
+    def device(self):
+        db.session.expire_all()
+        return DBShiftableMachine.query.filter_by(serial_number="access-device").first()
+
+    def test_all_kbs_accept(self):
+        (message, status_code), userkb_ssa = self.update_access({
+            PRIMARY_KB: ACCEPTED,
+            REACT_KB: ACCEPTED,
+        })
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(userkb_ssa.ask_or_post.call_count, 2)
+        for call in userkb_ssa.ask_or_post.call_args_list:
+            self.assertFalse(call.kwargs["delete_kb_when_self_heal"])
+
+        self.assertTrue(self.device().allow_hems)
+        self.assertTrue(self.device().automatic_management)
+
+    def test_one_kb_fails(self):
+        (message, status_code), _ = self.update_access({
+            PRIMARY_KB: ACCEPTED,
+            REACT_KB: RuntimeError("Knowledge Engine unavailable"),
+        })
+
+        self.assertEqual(status_code, 500)
+        self.assertIn(REACT_KB, message)
+        self.assertIn("Error in SSA ask/post request (500)", message)
+        self.assertNotIn(PRIMARY_KB, message)
+
+        self.assertFalse(self.device().allow_hems)
+        self.assertFalse(self.device().automatic_management)
+
+    def test_kb_rejects_update(self):
+        rejected = ({"exchangeInfo": [{"resultBindingSet": [
+            {"bodyText": '"Device not found"', "statusCodeValue": '"404"'}
+        ]}]}, 200)
+
+        (message, status_code), _ = self.update_access({
+            PRIMARY_KB: rejected,
+            REACT_KB: ACCEPTED,
+        })
+
+        self.assertEqual(status_code, 404)
+        self.assertEqual(message, f"{PRIMARY_KB}: Device not found (404)")
+        self.assertFalse(self.device().allow_hems)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,17 @@ from __future__ import absolute_import
 
 import unittest
 import uuid
+from datetime import datetime, timedelta
 
 from flask import json
 from device_manager_service.test import BaseTestCase
+from device_manager_service.models.db_models import DBRecommendationDeletionOutbox
 from device_manager_service.test.helper_functions import (
     clean_account,
     clean_database,
     superuser_login,
     mock_add_device,
+    mock_add_schedule,
     mock_register,
     mock_change_settings,
 )
@@ -266,6 +269,51 @@ class TestDeviceManagementController(BaseTestCase):
         )
         self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
 
+    def test_remove_device_post_and_add_again(self):
+        """Test case for remove_device_post
+
+        A removed device can be added again and scheduled, without stale cached metadata.
+        """
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        token = superuser_login(id=user_key)
+
+        mock_add_device(self, token, serial_number="1117", brand="Whirlpool")
+        response = mock_add_schedule(
+            self, token, "1117", datetime.now() + timedelta(hours=3), "cotton"
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+
+        query_string = {"serial_number": "1117", "delete_type": "hard"}
+
+        headers = {
+            "Accept": "application/json",
+            "x_correlation_id": uuid.uuid4(),
+            "authorization": token,
+        }
+        response = self.client.open(
+            "/api/device/device",
+            method="DELETE",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+
+        # The recommendation of the deleted cycle is queued for deletion
+        self.assertEqual(
+            DBRecommendationDeletionOutbox.query.filter_by(serial_number="1117").count(), 1
+        )
+
+        mock_add_device(self, token, serial_number="1117", brand="Whirlpool")
+        response = mock_add_schedule(
+            self, token, "1117", datetime.now() + timedelta(hours=3), "cotton"
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+
     def test_settings_by_device_get_single_device(self):
         clean_account()
 
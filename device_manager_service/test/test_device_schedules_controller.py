@@ -466,6 +466,50 @@ class TestDeviceSchedulesController(BaseTestCase):
         )
         self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
 
+    def test_schedule_cycle_by_device_get_multiple_devices_time_window(self):
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        authorization = superuser_login(id=user_key)
+
+        now = datetime.now()
+
+        mock_add_device(self, authorization, serial_number="1115", brand="Whirlpool")
+        mock_add_schedule(self, authorization, "1115", now + timedelta(hours=3), "cotton")
+
+        mock_add_device(self, authorization, serial_number="1113", brand="BSH")
+        mock_add_schedule(self, authorization, "1113", now + timedelta(hours=6), "outdoor")
+        mock_add_schedule(self, authorization, "1113", now + timedelta(hours=9), "easy_care")
+
+        # ------------------------------ ONLY CYCLES INSIDE THE WINDOW ARE RETURNED  ------------------------------ #
+
+        query_string = {
+            "serial_numbers": "1113,1115",
+            "start_timestamp": now + timedelta(hours=1),
+            "end_timestamp": now + timedelta(hours=7),
+        }
+
+        headers = {
+            "Accept": "application/json",
+            "x_correlation_id": str(uuid.uuid4()),
+            "authorization": authorization,
+        }
+        response = self.client.open(
+            "/api/device/schedule-cycle-by-device",
+            method="GET",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+
+        body = json.loads(response.data.decode("utf-8"))
+        self.assertEqual([device["serial_number"] for device in body], ["1113", "1115"])
+        self.assertEqual([len(device["cycles"]) for device in body], [1, 1])
+        self.assertEqual(body[0]["cycles"][0]["program"], "outdoor")
+
     def test_schedule_cycle_by_user_get_without_start_and_end_timestamp(self):
         clean_account()
 
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, ReadTimeoutError
+from urllib3.response import HTTPResponse
+
+from device_manager_service.clients.common import http_client
+from device_manager_service.clients.common.http_client import JitteredRetry, retry_policy
+
+
+def read_timeout():
+    return ReadTimeoutError(None, "/recommendation", "Read timed out.")
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Retry and backoff policy of the upstream sessions"""
+
+    def test_backoff_is_jittered_up_to_exponential_value(self):
+        retry = JitteredRetry(total=5, backoff_factor=1, status_forcelist=[503])
+        for _ in range(3):
+            retry = retry.increment(method="GET", url="/", response=HTTPResponse(status=503))
+
+        # Third consecutive error: up to 1 * 2 ** 2 seconds
+        with mock.patch.object(http_client.random, "uniform", side_effect=lambda low, high: high) as uniform:
+            self.assertEqual(retry.get_backoff_time(), 4)
+        uniform.assert_called_once_with(0, 4)
+
+        for _ in range(100):
+            self.assertTrue(0 <= retry.get_backoff_time() <= 4)
+
+    def test_first_retry_is_immediate(self):
+        retry = JitteredRetry(total=5, backoff_factor=1, status_forcelist=[503])
+        retry = retry.increment(method="GET", url="/", response=HTTPResponse(status=503))
+
+        self.assertEqual(retry.get_backoff_time(), 0)
+
+    def test_status_retries(self):
+        retry = retry_policy()
+
+        for method in ("GET", "PUT", "DELETE"):
+            for status in (502, 503, 504):
+                self.assertTrue(retry.is_retry(method, status), f"{method} {status}")
+
+        self.assertFalse(retry.is_retry("DELETE", 500))
+        self.assertFalse(retry.is_retry("POST", 503))
+
+    def test_get_is_retried_after_read_timeout(self):
+        retry = retry_policy()
+
+        retry = retry.increment(method="GET", url="/", error=read_timeout())
+
+        self.assertEqual(len(retry.history), 1)
+
+    def test_delete_is_not_retried_after_read_timeout(self):
+        retry = retry_policy()
+
+        for method in ("DELETE", "PUT", "POST"):
+            with self.assertRaises(ReadTimeoutError):
+                retry.increment(method=method, url="/", error=read_timeout())
+
+    def test_delete_is_retried_after_connect_error(self):
+        retry = retry_policy()
+
+        retry = retry.increment(method="DELETE", url="/", error=ConnectTimeoutError())
+
+        self.assertEqual(len(retry.history), 1)
+
+    def test_retries_are_bounded(self):
+        retry = retry_policy()
+
+        for _ in range(retry.total):
+            retry = retry.increment(method="DELETE", url="/", response=HTTPResponse(status=503))
+
+        with self.assertRaises(MaxRetryError):
+            retry.increment(method="DELETE", url="/", response=HTTPResponse(status=503))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,12 @@ import unittest
 import uuid
 
 from flask import json
+from device_manager_service import db
+from device_manager_service.models.db_models import (
+    DBShiftableMachine,
+    DBShiftableCycle,
+    DBShiftablePowerProfile,
+)
 from device_manager_service.test import BaseTestCase
 
 from device_manager_service.test.helper_functions import (
@@ -15,6 +21,7 @@ from device_manager_service.test.helper_functions import (
     superuser_login,
     mock_add_device,
     mock_register,
+    mock_add_schedule,
 )
 
 
@@ -430,5 +437,208 @@ class TestPoolRequestsController(BaseTestCase):
         self.assert403(response, "Response body is : " + response.data.decode("utf-8"))
 
 
+    def test_pool_by_user_get_reference_date(self):
+        """Test case for pool_get
+        Only cycles of the day after reference_date are in the pool
+        """
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        token = superuser_login(id=user_key)
+
+        mock_add_device(self, token, serial_number="1116", brand="Whirlpool")
+        mock_add_schedule(self, token, "1116", datetime(2030, 1, 2, 10), "cotton")
+        mock_add_schedule(self, token, "1116", datetime(2030, 1, 3, 10), "eco")
+
+        query_string = {
+            "user_ids": user_id,
+            "reference_date": "2030-01-01",
+            "time_zone": "Europe/Lisbon",
+        }
+
+        headers = {
+            "Accept": "application/json",
+            "x_correlation_id": uuid.uuid4(),
+            "authorization": token,
+        }
+
+        response = self.client.open(
+            "/api/device/pool-by-user",
+            method="GET",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+
+        pool = json.loads(response.data.decode("utf-8"))[0]["pool"]
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(len(pool[0]["cycles_in_pool"]), 1)
+        self.assertEqual(pool[0]["cycles_in_pool"][0]["program"], "cotton")
+
+    def test_pool_by_user_get_unknown_time_zone(self):
+        """Test case for pool_get
+        Unknown time zones are rejected
+        """
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        token = superuser_login(id=user_key)
+
+        query_string = {"user_ids": user_id, "time_zone": "Mars/Olympus_Mons"}
+
+        headers = {
+            "Accept": "application/json",
+            "x_correlation_id": uuid.uuid4(),
+            "authorization": token,
+        }
+
+        response = self.client.open(
+            "/api/device/pool-by-user",
+            method="GET",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert400(response, "Response body is : " + response.data.decode("utf-8"))
+
+    def test_pool_export_get_user(self):
+        """Test case for pool_export_get
+        The fleet-wide export is reserved to internal services
+        """
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        token = superuser_login(id=user_key)
+
+        query_string = {
+            "start_timestamp": "2030-01-02T00:00:00Z",
+            "end_timestamp": "2030-01-03T00:00:00Z",
+        }
+
+        headers = {
+            "Accept": "application/x-ndjson",
+            "x_correlation_id": uuid.uuid4(),
+            "authorization": token,
+        }
+
+        response = self.client.open(
+            "/api/device/pool-export",
+            method="GET",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert403(response, "Response body is : " + response.data.decode("utf-8"))
+
+    def test_pool_export_get(self):
+        """Test case for pool_export_get
+        One NDJSON line per device with cycles in the window, ordered by user
+        """
+        clean_database()
+
+        window_start = datetime(2030, 1, 2)
+
+        def add_machine(user_id, serial_number, cycles):
+            machine = DBShiftableMachine(
+                user_id=user_id,
+                name=serial_number,
+                device_type="WASHING_MACHINE",
+                brand="Whirlpool",
+                serial_number=serial_number,
+            )
+            for sequence_id, start_offset_hours, slots in cycles:
+                scheduled_start_time = window_start + timedelta(hours=start_offset_hours)
+                machine.washing_cycles.append(DBShiftableCycle(
+                    sequence_id=sequence_id,
+                    earliest_start_time=scheduled_start_time,
+                    latest_end_time=scheduled_start_time + timedelta(hours=8),
+                    scheduled_start_time=scheduled_start_time,
+                    expected_end_time=scheduled_start_time + timedelta(hours=2),
+                    program="cotton",
+                    is_optimized=False,
+                    power_profile=[
+                        DBShiftablePowerProfile(
+                            slot=slot, max_power=2000.0, power_units="W",
+                            duration=15.0, duration_units="minutes",
+                        )
+                        for slot in range(1, slots + 1)
+                    ],
+                ))
+            db.session.add(machine)
+
+        # Inserted out of user order, the export sorts them
+        add_machine("export-user-b", "export-b1", [("b1-1", 1, 2)])
+        add_machine("export-user-a", "export-a1", [("a1-1", 1, 4), ("a1-2", 3, 0)])
+        add_machine("export-user-a", "export-a2", [("a2-1", 5, 1), ("a2-outside", 30, 1)])
+        add_machine("export-user-a", "export-a3", [("a3-outside", -1, 1)])
+        db.session.commit()
+
+        query_string = {
+            "start_timestamp": "2030-01-02T00:00:00Z",
+            "end_timestamp": "2030-01-03T00:00:00Z",
+        }
+
+        # No authorization header: internal service
+        headers = {
+            "Accept": "application/x-ndjson",
+            "x_correlation_id": uuid.uuid4(),
+        }
+
+        response = self.client.open(
+            "/api/device/pool-export",
+            method="GET",
+            headers=headers,
+            query_string=query_string,
+        )
+        self.assert200(response, "Response body is : " + response.data.decode("utf-8"))
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+
+        lines = response.data.decode("utf-8").splitlines()
+        device_pools = [json.loads(line) for line in lines]
+
+        exported = [
+            (
+                device_pool["user_id"],
+                device_pool["pool"][0]["serial_number"],
+                [
+                    (cycle["sequence_id"], len(cycle["power_profile"]))
+                    for cycle in device_pool["pool"][0]["cycles_in_pool"]
+                ],
+            )
+            for device_pool in device_pools
+        ]
+        self.assertEqual(exported, [
+            ("export-user-a", "export-a1", [("a1-1", 4), ("a1-2", 0)]),
+            ("export-user-a", "export-a2", [("a2-1", 1)]),
+            ("export-user-b", "export-b1", [("b1-1", 2)]),
+        ])
+        for device_pool in device_pools:
+            self.assertEqual(len(device_pool["pool"]), 1)
+
+    def test_pool_export_get_missing_timestamps(self):
+        """Test case for pool_export_get
+        Both ends of the window are required
+        """
+        headers = {
+            "Accept": "application/x-ndjson",
+            "x_correlation_id": uuid.uuid4(),
+        }
+
+        response = self.client.open(
+            "/api/device/pool-export",
+            method="GET",
+            headers=headers,
+            query_string={"start_timestamp": "2030-01-02T00:00:00Z"},
+        )
+        self.assert400(response, "Response body is : " + response.data.decode("utf-8"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+from device_manager_service import db
+from device_manager_service.models.db_models import DBProcessedEvent
+from device_manager_service.test import BaseTestCase
+from device_manager_service.utils.database.processed_events import (
+    claim_events,
+    clear_processed_events_cache,
+    prune_processed_events,
+    remember_events,
+)
+
+
+def new_event():
+    return ("UserHardDeleted", str(uuid.uuid4()))
+
+
+class TestProcessedEvents(BaseTestCase):
+    """Idempotency guard of the account events"""
+
+    def setUp(self):
+        super().setUp()
+        clear_processed_events_cache()
+
+    def test_second_claim_is_empty(self):
+        event = new_event()
+
+        self.assertEqual(claim_events(db.session, [event]), {event})
+        db.session.commit()
+
+        clear_processed_events_cache()
+        self.assertEqual(claim_events(db.session, [event]), set())
+
+    def test_claims_only_new_events(self):
+        processed, new = new_event(), new_event()
+        claim_events(db.session, [processed])
+        db.session.commit()
+
+        clear_processed_events_cache()
+        self.assertEqual(claim_events(db.session, [processed, new]), {new})
+
+    def test_rolled_back_claim_can_be_claimed_again(self):
+        event = new_event()
+
+        self.assertEqual(claim_events(db.session, [event]), {event})
+        db.session.rollback()
+
+        self.assertEqual(claim_events(db.session, [event]), {event})
+
+    def test_cache_skips_db_only_after_remember(self):
+        event = new_event()
+        claim_events(db.session, [event])
+        db.session.commit()
+
+        # Committed but not remembered: checked in the DB
+        session = mock.Mock()
+        session.execute.return_value = []
+        self.assertEqual(claim_events(session, [event]), set())
+        session.execute.assert_called_once()
+
+        remember_events(event)
+
+        session = mock.Mock()
+        self.assertEqual(claim_events(session, [event]), set())
+        session.execute.assert_not_called()
+
+    def test_prune_in_batches(self):
+        now = datetime.utcnow()
+        older_than = now - timedelta(days=30)
+
+        for age_days in [31, 32, 40, 60, 90]:
+            db.session.add(DBProcessedEvent(
+                event_type="UserHardDeleted",
+                event_id=uuid.uuid4(),
+                processed_timestamp=now - timedelta(days=age_days)
+            ))
+        recent = []
+        for age_days in [0, 29]:
+            event = DBProcessedEvent(
+                event_type="UserHardDeleted",
+                event_id=uuid.uuid4(),
+                processed_timestamp=now - timedelta(days=age_days)
+            )
+            db.session.add(event)
+            recent.append(event.event_id)
+        db.session.commit()
+
+        session = db.create_scoped_session()
+        try:
+            with mock.patch.object(session, "commit", wraps=session.commit) as commit:
+                self.assertEqual(prune_processed_events(session, older_than, 2), 5)
+
+            # 2 + 2 + 1 rows
+            self.assertEqual(commit.call_count, 3)
+        finally:
+            session.close()
+
+        remaining = {row.event_id for row in db.session.query(DBProcessedEvent.event_id)}
+        self.assertEqual(remaining, set(recent))
+
+
+if __name__ == "__main__":
+    unittest.main()
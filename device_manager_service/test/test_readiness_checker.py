@@ -0,0 +1,134 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from flask import json
+
+from device_manager_service import app
+from device_manager_service.config import Config
+from device_manager_service.controllers import device_management_controller
+from device_manager_service.utils.health.readiness_checker import ReadinessChecker
+
+
+def failing_check():
+    raise ConnectionError("database is down")
+
+
+def checker(**checks):
+    """ReadinessChecker of {name: (ok, required)}, not started."""
+    readiness = ReadinessChecker()
+    for name, (ok, required) in checks.items():
+        readiness.add(name, lambda ok=ok: (ok, f"ok={ok}"), required=required)
+
+    return readiness
+
+
+class TestReadinessChecker(unittest.TestCase):
+    """Cached readiness checks, run synchronously"""
+
+    def test_not_ready_before_first_run(self):
+        readiness = checker(database=(True, True))
+
+        self.assertEqual(readiness.snapshot(), (False, {}))
+        self.assertIsNone(readiness.check("database"))
+
+    def test_run_checks(self):
+        readiness = checker(database=(True, True), kafka_consumer=(True, True))
+        readiness.run_checks()
+
+        ready, snapshot = readiness.snapshot()
+        self.assertTrue(ready)
+        self.assertEqual(set(snapshot), {"database", "kafka_consumer"})
+        self.assertEqual(snapshot["database"].detail, "ok=True")
+        self.assertTrue(readiness.check("database").ok)
+
+    def test_failing_required_check(self):
+        readiness = checker(database=(True, True))
+        readiness.add("kafka_consumer", failing_check)
+        readiness.run_checks()
+
+        ready, snapshot = readiness.snapshot()
+        self.assertFalse(ready)
+        self.assertFalse(snapshot["kafka_consumer"].ok)
+        self.assertIn("database is down", snapshot["kafka_consumer"].detail)
+
+    def test_failing_check_not_required(self):
+        readiness = checker(database=(True, True), ssa_adapters=(False, False))
+        readiness.run_checks()
+
+        ready, snapshot = readiness.snapshot()
+        self.assertTrue(ready)
+        self.assertFalse(snapshot["ssa_adapters"].ok)
+        self.assertFalse(snapshot["ssa_adapters"].required)
+
+    def test_stale_snapshot(self):
+        readiness = checker(database=(True, True))
+        readiness.run_checks()
+
+        # Every snapshot is older than the limit
+        with mock.patch.object(Config, "READINESS_MAX_AGE_SECONDS", -1):
+            ready, snapshot = readiness.snapshot()
+            database = readiness.check("database")
+
+        self.assertFalse(ready)
+        self.assertTrue(snapshot["database"].ok)
+        self.assertIsNone(database)
+
+
+class TestProbes(unittest.TestCase):
+    """/livez, /readyz and /health, answered from the cached checks"""
+
+    def get(self, path, readiness):
+        with mock.patch.object(device_management_controller, "readiness", readiness):
+            return app.test_client().get(path)
+
+    def test_livez(self):
+        response = self.get("/livez", checker(database=(False, True)))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_readyz(self):
+        readiness = checker(database=(True, True), ssa_adapters=(False, False))
+        readiness.run_checks()
+
+        response = self.get("/readyz", readiness)
+
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.data)
+        self.assertTrue(body["ready"])
+        self.assertFalse(body["checks"]["ssa_adapters"]["ok"])
+
+    def test_readyz_not_ready(self):
+        readiness = checker(database=(False, True))
+        readiness.run_checks()
+
+        response = self.get("/readyz", readiness)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(json.loads(response.data)["ready"])
+
+    def test_health(self):
+        readiness = checker(database=(True, True))
+        readiness.run_checks()
+
+        self.assertEqual(self.get("/health", readiness).status_code, 200)
+
+    def test_health_database_down(self):
+        readiness = checker(database=(False, True))
+        readiness.run_checks()
+
+        self.assertEqual(self.get("/health", readiness).status_code, 500)
+
+    def test_health_stale_snapshot(self):
+        readiness = checker(database=(True, True))
+        readiness.run_checks()
+
+        with mock.patch.object(Config, "READINESS_MAX_AGE_SECONDS", -1):
+            self.assertEqual(self.get("/health", readiness).status_code, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import datetime, timedelta
+
+import unittest
+from unittest import mock
+
+from device_manager_service import db
+from device_manager_service import recommendationOutbox
+from device_manager_service.models.db_models import DBRecommendationDeletionOutbox
+from device_manager_service.recommendationOutbox import drain_outbox
+from device_manager_service.test import BaseTestCase
+
+
+class TestRecommendationOutbox(BaseTestCase):
+    """drain_outbox tests, with a mocked Energy Manager"""
+
+    def add_deletion(self, sequence_id, next_attempt_timestamp=None):
+        db.session.add(DBRecommendationDeletionOutbox(
+            serial_number="outbox-device",
+            sequence_id=sequence_id,
+            next_attempt_timestamp=next_attempt_timestamp or datetime.utcnow() - timedelta(seconds=1),
+        ))
+        db.session.commit()
+
+    def test_drain_outbox(self):
+        db.session.query(DBRecommendationDeletionOutbox).delete()
+        db.session.commit()
+
+        self.add_deletion("delivered")
+        self.add_deletion("server-error")
+        self.add_deletion("rejected")
+        self.add_deletion("not-due", datetime.utcnow() + timedelta(hours=1))
+
+        responses = {
+            "delivered": ({}, 202),
+            "rejected": ({"error": "invalid sequence id"}, 400),
+        }
+
+        def delete_recommendation(serial_number, sequence_id):
+            # The rows are claimed and committed before calling the Energy Manager
+            self.assertFalse(db.session().in_transaction())
+
+            if sequence_id == "server-error":
+                raise RuntimeError("Energy Manager unavailable")
+            return responses[sequence_id]
+
+        with mock.patch.object(
+            recommendationOutbox, "delete_recommendation", side_effect=delete_recommendation
+        ) as energy_manager:
+            self.assertEqual(drain_outbox(db.session), 3)
+
+        self.assertEqual(energy_manager.call_count, 3)
+
+        db.session.expire_all()
+        remaining = {
+            deletion.sequence_id: deletion
+            for deletion in DBRecommendationDeletionOutbox.query.all()
+        }
+        self.assertEqual(set(remaining), {"server-error", "not-due"})
+
+        retried = remaining["server-error"]
+        self.assertEqual(retried.attempts, 1)
+        self.assertIn("Energy Manager unavailable", retried.last_error)
+        self.assertGreater(retried.next_attempt_timestamp, datetime.utcnow())
+
+        # Leased or backing off: not claimed again right away
+        with mock.patch.object(recommendationOutbox, "delete_recommendation") as energy_manager:
+            self.assertEqual(drain_outbox(db.session), 0)
+        energy_manager.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
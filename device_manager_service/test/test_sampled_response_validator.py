@@ -0,0 +1,124 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from connexion.decorators.response import ResponseValidator
+from connexion.exceptions import NonConformingResponse
+
+from device_manager_service.config import Config
+from device_manager_service.utils.validation import sampled_response_validator
+from device_manager_service.utils.validation.sampled_response_validator import (
+    SampledResponseValidator,
+    parse_overrides,
+    parse_policy,
+)
+from device_manager_service.utils.validation.streaming_response_validator import StreamingResponseValidator
+
+
+def endpoint(request):
+    return "endpoint"
+
+
+def validated_endpoint(request):
+    return "validated"
+
+
+class TestParsePolicy(unittest.TestCase):
+    """RESPONSE_VALIDATION policies"""
+
+    def test_named_policies(self):
+        with mock.patch.object(Config, "RESPONSE_VALIDATION_SAMPLE_RATE", 0.05):
+            self.assertEqual(parse_policy("sampled"), 0.05)
+        self.assertEqual(parse_policy("full"), 1.0)
+        self.assertEqual(parse_policy("off"), 0.0)
+        self.assertEqual(parse_policy(" Full "), 1.0)
+
+    def test_rates(self):
+        self.assertEqual(parse_policy("0.25"), 0.25)
+        self.assertEqual(parse_policy("0"), 0.0)
+        self.assertEqual(parse_policy("1"), 1.0)
+
+    def test_invalid_policies(self):
+        for policy in ["", "some", "-0.1", "1.5"]:
+            with self.assertRaises(ValueError):
+                parse_policy(policy)
+
+
+class TestParseOverrides(unittest.TestCase):
+    """RESPONSE_VALIDATION_OVERRIDES"""
+
+    def test_overrides(self):
+        self.assertEqual(
+            parse_overrides("schedule_cycle_by_user_get=off, device_get=full,pool_by_user_get=0.1,"),
+            {"schedule_cycle_by_user_get": 0.0, "device_get": 1.0, "pool_by_user_get": 0.1}
+        )
+
+    def test_empty(self):
+        self.assertEqual(parse_overrides(""), {})
+
+    def test_invalid_overrides(self):
+        for overrides in ["device_get", "device_get=some"]:
+            with self.assertRaises(ValueError):
+                parse_overrides(overrides)
+
+
+class TestSampledResponseValidator(unittest.TestCase):
+    """Sampling of the validated responses"""
+
+    def validator(self, rate, mimetype="application/json"):
+        operation = mock.Mock(operation_id="device_get")
+        validator = SampledResponseValidator(operation, mimetype)
+        validator.rate = rate
+
+        return validator
+
+    def wrap(self, rate, mimetype="application/json"):
+        with mock.patch.object(StreamingResponseValidator, "__call__", return_value=validated_endpoint):
+            return self.validator(rate, mimetype)(endpoint)
+
+    def test_rate_of_the_operation(self):
+        with mock.patch.object(sampled_response_validator, "DEFAULT_RATE", 0.01), \
+                mock.patch.object(sampled_response_validator, "OVERRIDE_RATES", {"device_get": 0.5}):
+            device_get = SampledResponseValidator(mock.Mock(operation_id="device_get"), "application/json")
+            pool_get = SampledResponseValidator(mock.Mock(operation_id="pool_get"), "application/json")
+
+        self.assertEqual(device_get.rate, 0.5)
+        self.assertEqual(pool_get.rate, 0.01)
+
+    def test_off_is_not_validated(self):
+        self.assertIs(self.wrap(0.0), endpoint)
+
+    def test_full_is_always_validated(self):
+        self.assertIs(self.wrap(1.0), validated_endpoint)
+
+    def test_non_json_mimetype_is_not_validated(self):
+        self.assertIs(self.wrap(1.0, "application/x-ndjson"), endpoint)
+        self.assertIs(self.wrap(0.5, "application/x-ndjson"), endpoint)
+
+    def test_sampled(self):
+        wrapper = self.wrap(0.5)
+
+        with mock.patch.object(sampled_response_validator.random, "random", return_value=0.4):
+            self.assertEqual(wrapper(None), "validated")
+        with mock.patch.object(sampled_response_validator.random, "random", return_value=0.5):
+            self.assertEqual(wrapper(None), "endpoint")
+
+    def test_nonconforming_response_is_logged(self):
+        error = NonConformingResponse("Response body does not conform to specification", "'id' is required")
+
+        with mock.patch.object(ResponseValidator, "validate_response", side_effect=error):
+            validator = self.validator(1.0)
+
+            with mock.patch.object(Config, "RESPONSE_VALIDATION_FAIL_REQUESTS", False):
+                self.assertFalse(validator.validate_response({}, 200, {}, "/device"))
+
+            with mock.patch.object(Config, "RESPONSE_VALIDATION_FAIL_REQUESTS", True):
+                with self.assertRaises(NonConformingResponse):
+                    validator.validate_response({}, 200, {}, "/device")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from device_manager_service.config import Config
+from device_manager_service.ssa import ssa_bootstrap
+from device_manager_service.ssa.ssa_bootstrap import SSABootstrap, SSAUnavailableError
+
+
+class FlakyFactory:
+    """Fails the first `failures` calls, then returns the adapter."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.adapter = object()
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("Knowledge Engine is down")
+
+        return self.adapter
+
+
+class TestSSABootstrap(unittest.TestCase):
+    """Background registration of the SSA adapters, with the waits patched"""
+
+    def setUp(self):
+        self.bootstrap = SSABootstrap(logger=mock.Mock())
+        self.factory = FlakyFactory(failures=2)
+        self.bootstrap.add("bsh", self.factory)
+
+        # Longest wait of each backoff
+        patchers = [
+            mock.patch.object(ssa_bootstrap, "sleep"),
+            mock.patch.object(ssa_bootstrap.random, "uniform", side_effect=lambda low, high: high),
+            mock.patch.object(Config, "SSA_BOOTSTRAP_INITIAL_BACKOFF_SECONDS", 4),
+            mock.patch.object(Config, "SSA_BOOTSTRAP_MAX_BACKOFF_SECONDS", 6),
+        ]
+        self.sleep = patchers[0].start()
+        for patcher in patchers[1:]:
+            patcher.start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_not_ready_before_registration(self):
+        self.assertFalse(self.bootstrap.ready("bsh"))
+        self.assertEqual(self.bootstrap.readiness(), {"bsh": False})
+        self.assertFalse(self.bootstrap.wait(timeout=0))
+
+        with self.assertRaises(SSAUnavailableError) as error:
+            self.bootstrap.get("bsh")
+        self.assertEqual(error.exception.name, "bsh")
+
+    def test_retries_with_backoff(self):
+        self.bootstrap.start()
+
+        self.assertTrue(self.bootstrap.wait(timeout=5))
+        self.assertEqual(self.factory.calls, 3)
+        # Doubled, capped at the max
+        self.assertEqual(self.sleep.call_args_list, [mock.call(4), mock.call(6)])
+
+        self.assertTrue(self.bootstrap.ready("bsh"))
+        self.assertIs(self.bootstrap.get("bsh"), self.factory.adapter)
+        self.assertEqual(self.bootstrap.readiness(), {"bsh": True})
+
+    def test_ready_needs_every_adapter(self):
+        self.bootstrap.add("whirlpool", FlakyFactory(failures=0))
+        self.bootstrap._register("whirlpool", self.bootstrap._factories["whirlpool"])
+
+        self.assertTrue(self.bootstrap.ready("whirlpool"))
+        self.assertFalse(self.bootstrap.ready("whirlpool", "bsh"))
+        self.assertFalse(self.bootstrap.wait(timeout=0))
+
+        self.bootstrap._register("bsh", self.factory)
+
+        self.assertTrue(self.bootstrap.ready("whirlpool", "bsh"))
+        self.assertTrue(self.bootstrap.wait(timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
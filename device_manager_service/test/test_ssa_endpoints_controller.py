@@ -4,8 +4,10 @@ from __future__ import absolute_import
 
 import unittest
 import uuid
+from unittest import mock
 
 from flask import json
+from device_manager_service import ssa_adapters
 from device_manager_service.test import BaseTestCase
 
 from device_manager_service.test.helper_functions import (
@@ -165,6 +167,33 @@ class TestSSAEndpointsController(BaseTestCase):
                 count = count + 1
         self.assertEqual(count, 2)
 
+    def test_get_user_wp_appliances_get_ssa_not_ready(self):
+        """Test case for get_user_wp_appliances_get
+
+        Answers 503 right away while the WP SSA is not registered.
+        """
+        clean_account()
+
+        user_key, user_id, second_user_key, second_user_id = mock_register()
+
+        clean_database()
+
+        authorization = superuser_login(id=user_key)
+
+        headers = {
+            "Accept": "application/json",
+            "x_correlation_id": str(uuid.uuid4()),
+            "Authorization": authorization,
+        }
+
+        with mock.patch.object(ssa_adapters, "ready", return_value=False):
+            response = self.client.open(
+                "/api/device/get-user-wp-appliances",
+                method="GET",
+                headers=headers,
+            )
+        self.assertStatus(response, 503, "Response body is : " + response.data.decode("utf-8"))
+
 
 if __name__ == "__main__":
     unittest.main()
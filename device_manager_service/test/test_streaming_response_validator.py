@@ -0,0 +1,59 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from unittest import mock
+
+from connexion.lifecycle import ConnexionResponse
+from flask import Response
+
+from device_manager_service.utils.validation.streaming_response_validator import StreamingResponseValidator
+
+
+class TestStreamingResponseValidator(unittest.TestCase):
+    """Response validation of streamed and buffered responses"""
+
+    def validator(self, mimetype="application/json"):
+        operation = mock.Mock(operation_id="pool_export_get")
+        operation.api.get_connexion_response.side_effect = lambda response, mimetype: ConnexionResponse(
+            status_code=response.status_code, body=response.get_data(), headers=response.headers)
+
+        validator = StreamingResponseValidator(operation, mimetype)
+        validator.validate_response = mock.Mock(return_value=True)
+
+        return validator
+
+    def test_streamed_response_is_not_validated(self):
+        def generate():
+            yield '{"user_id": "user-a"}\n'
+            yield '{"user_id": "user-b"}\n'
+
+        streamed = Response(generate(), mimetype="application/x-ndjson", direct_passthrough=True)
+        validator = self.validator()
+
+        wrapper = validator(lambda request: streamed)
+
+        self.assertIs(wrapper(mock.Mock(url="/pool-export")), streamed)
+        validator.operation.api.get_connexion_response.assert_not_called()
+        validator.validate_response.assert_not_called()
+
+    def test_buffered_response_is_validated(self):
+        buffered = Response('{"error": "Invalid credentials"}', status=401, mimetype="application/json")
+        validator = self.validator()
+
+        wrapper = validator(lambda request: buffered)
+
+        self.assertIs(wrapper(mock.Mock(url="/pool-export")), buffered)
+        validator.validate_response.assert_called_once_with(
+            b'{"error": "Invalid credentials"}', 401, buffered.headers, "/pool-export")
+
+    def test_non_json_mimetype_is_not_wrapped(self):
+        def endpoint(request):
+            return "endpoint"
+
+        self.assertIs(self.validator("application/x-ndjson")(endpoint), endpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import typing
+import unittest
+from unittest import mock
+
+from device_manager_service import util
+from device_manager_service.models.base_model_ import Model
+
+
+class Node(Model):
+    def __init__(self, name=None, children=None):
+        self.openapi_types = {
+            'name': str,
+            'children': typing.List[Node]
+        }
+
+        self.attribute_map = {
+            'name': 'name',
+            'children': 'children'
+        }
+
+        self.name = name
+        self.children = children
+
+
+class TestCompiledDeserializers(unittest.TestCase):
+    """Deserializers compiled from the model openapi_types"""
+
+    def setUp(self):
+        patcher = mock.patch.object(util, "_deserializers", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_self_referencing_model(self):
+        node = util.deserialize_model(
+            {"name": "root", "children": [{"name": "leaf", "children": None}]}, Node)
+
+        self.assertEqual(node.name, "root")
+        self.assertEqual(node.children[0].name, "leaf")
+        self.assertIsNone(node.children[0].children)
+
+    def test_published_only_when_complete(self):
+        published_while_compiling = []
+        nullable = util._nullable
+
+        def record(deserializer):
+            published_while_compiling.append(
+                Node in util._deserializers or typing.List[Node] in util._deserializers)
+            return nullable(deserializer)
+
+        with mock.patch.object(util, "_nullable", side_effect=record):
+            util.deserialize_model({"name": "root"}, Node)
+
+        self.assertTrue(len(published_while_compiling) > 0)
+        self.assertFalse(any(published_while_compiling))
+        self.assertIn(Node, util._deserializers)
+        self.assertIn(typing.List[Node], util._deserializers)
+
+
+if __name__ == "__main__":
+    unittest.main()
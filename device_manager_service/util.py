@@ -1,10 +1,19 @@
 import datetime
+import threading
 
 import six
 import typing
 from device_manager_service import typing_utils
 
 
+# {class literal: deserializer}, filled the first time each type is deserialized
+_deserializers = {}
+
+# Deserializers being compiled by the thread, only published to
+# _deserializers once all of them are complete
+_compiling = threading.local()
+
+
 def _deserialize(data, klass):
     """Deserializes dict, list, str into an object.
 
@@ -16,21 +25,115 @@ def _deserialize(data, klass):
     if data is None:
         return None
 
+    return _get_deserializer(klass)(data)
+
+
+def _get_deserializer(klass):
+    """Returns the deserializer of klass, compiling it on first use.
+
+    Deserializers are shared by all threads, so the ones compiled along with
+    klass (its nested types) are only published together, once complete.
+
+    :param klass: class literal.
+
+    :return: function of the data (not None) to deserialize.
+    """
+    deserializer = _deserializers.get(klass)
+    if deserializer is not None:
+        return deserializer
+
+    pending = getattr(_compiling, "pending", None)
+    if pending is not None:
+        # Nested type of a deserializer this thread is compiling
+        deserializer = pending.get(klass)
+        if deserializer is None:
+            deserializer = _compile_deserializer(klass)
+            pending[klass] = deserializer
+        return deserializer
+
+    _compiling.pending = {}
+    try:
+        deserializer = _compile_deserializer(klass)
+        _compiling.pending[klass] = deserializer
+        _deserializers.update(_compiling.pending)
+    finally:
+        _compiling.pending = None
+
+    return deserializer
+
+
+def _compile_deserializer(klass):
+    """Resolves the type of klass once into a deserializer.
+
+    Nested list, dict and model types are resolved into their own cached
+    deserializers, so deserializing data no longer checks the type of klass.
+
+    :param klass: class literal.
+
+    :return: function of the data (not None) to deserialize.
+    """
     if klass in six.integer_types or klass in (float, str, bool, bytearray):
-        return _deserialize_primitive(data, klass)
+        def deserialize(data):
+            # JSON values usually have the declared type already
+            if type(data) is klass:
+                return data
+            return _deserialize_primitive(data, klass)
+        return deserialize
     elif klass == object:
-        return _deserialize_object(data)
+        return _deserialize_object
     elif klass == datetime.date:
-        return deserialize_date(data)
+        return deserialize_date
     elif klass == datetime.datetime:
-        return deserialize_datetime(data)
+        return deserialize_datetime
     elif typing_utils.is_generic(klass):
         if typing_utils.is_list(klass):
-            return _deserialize_list(data, klass.__args__[0])
+            item_deserializer = _nullable(_get_deserializer(klass.__args__[0]))
+            return lambda data: [item_deserializer(sub_data) for sub_data in data]
         if typing_utils.is_dict(klass):
-            return _deserialize_dict(data, klass.__args__[1])
+            value_deserializer = _nullable(_get_deserializer(klass.__args__[1]))
+            return lambda data: {k: value_deserializer(v) for k, v in six.iteritems(data)}
+        return lambda data: None
     else:
-        return deserialize_model(data, klass)
+        return _compile_model_deserializer(klass)
+
+
+def _nullable(deserializer):
+    return lambda data: None if data is None else deserializer(data)
+
+
+def _compile_model_deserializer(klass):
+    """Compiles the deserializer of a model from its openapi_types and attribute_map.
+
+    :param klass: class literal.
+
+    :return: function of the data (not None) to deserialize.
+    """
+    # Models declare openapi_types per instance
+    instance = klass()
+    if not instance.openapi_types:
+        return _deserialize_object
+
+    # (attribute name, json key, deserializer), filled after the deserializer
+    # is pending so that models referencing themselves resolve to it
+    fields = []
+
+    def deserialize(data):
+        instance = klass()
+        if isinstance(data, (list, dict)):
+            for attr, key, deserializer in fields:
+                if key in data:
+                    # Through the setter, which validates the value
+                    setattr(instance, attr, deserializer(data[key]))
+
+        return instance
+
+    _compiling.pending[klass] = deserialize
+    for attr, attr_type in six.iteritems(instance.openapi_types):
+        fields.append(
+            (attr, instance.attribute_map[attr], _nullable(_get_deserializer(attr_type)))
+        )
+
+    return deserialize
 
 
 def _deserialize_primitive(data, klass):
@@ -67,6 +170,11 @@ def deserialize_date(string):
     :return: date.
     :rtype: date
     """
+    try:
+        return datetime.date.fromisoformat(string)
+    except (TypeError, ValueError):
+        pass
+
     try:
         from dateutil.parser import parse
         return parse(string).date()
@@ -77,13 +185,19 @@ def deserialize_date(string):
 def deserialize_datetime(string):
     """Deserializes string to datetime.
 
-    The string should be in iso8601 datetime format.
+    The string should be in iso8601 datetime format. It is parsed by
+    datetime.fromisoformat, and by dateutil if that fails.
 
     :param string: str.
     :type string: str
     :return: datetime.
     :rtype: datetime
     """
+    try:
+        return datetime.datetime.fromisoformat(string)
+    except (TypeError, ValueError):
+        pass
+
     try:
         from dateutil.parser import parse
         return parse(string)
@@ -99,19 +213,11 @@ def deserialize_model(data, klass):
     :param klass: class literal.
     :return: model object.
     """
-    instance = klass()
-
-    if not instance.openapi_types:
-        return data
-
-    for attr, attr_type in six.iteritems(instance.openapi_types):
-        if data is not None \
-                and instance.attribute_map[attr] in data \
-                and isinstance(data, (list, dict)):
-            value = data[instance.attribute_map[attr]]
-            setattr(instance, attr, _deserialize(value, attr_type))
+    if data is None:
+        instance = klass()
+        return instance if instance.openapi_types else data
 
-    return instance
+    return _get_deserializer(klass)(data)
 
 
 def _deserialize_list(data, boxed_type):
@@ -124,8 +230,7 @@ def _deserialize_list(data, boxed_type):
     :return: deserialized list.
     :rtype: list
     """
-    return [_deserialize(sub_data, boxed_type)
-            for sub_data in data]
+    return _get_deserializer(typing.List[boxed_type])(data)
 
 
 def _deserialize_dict(data, boxed_type):
@@ -138,5 +243,4 @@ def _deserialize_dict(data, boxed_type):
     :return: deserialized dict.
     :rtype: dict
     """
-    return {k: _deserialize(v, boxed_type)
-            for k, v in six.iteritems(data)}
+    return _get_deserializer(typing.Dict[str, boxed_type])(data)
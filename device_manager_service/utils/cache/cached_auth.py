@@ -0,0 +1,68 @@
+import time
+import hashlib
+
+import jwt
+
+from device_manager_service.utils.cache.ttl_lru_cache import TTLLRUCache
+
+
+class CachedAuth:
+    def __init__(self, auth, max_size, ttl_seconds):
+        """Cache of successful authorization checks, in front of hems_auth Auth.
+
+        The user ID verified for a token is kept until the token expires or
+        ttl_seconds pass, whichever comes first, so a token revoked on the
+        account manager is still accepted for at most ttl_seconds. Failed checks
+        and internal requests (no token) always go to Auth.
+
+        Args:
+            auth (hems_auth.auth.Auth): Authorization backend
+            max_size (int): Tokens kept before the least recently used is evicted
+            ttl_seconds (float): Maximum time a verified token is reused. 0 disables the cache
+        """
+        self.auth = auth
+        self.cache = TTLLRUCache(name="authorization", max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def verify_basic_authorization(self, headers):
+        token = headers.get("Authorization")
+        if not token:
+            return self.auth.verify_basic_authorization(headers)
+
+        # Do not keep raw tokens in memory
+        key = hashlib.sha256(token.encode()).hexdigest()
+
+        user_id = self.cache.get(key)
+        if user_id is not None:
+            return user_id, 200
+
+        auth_response, auth_code = self.auth.verify_basic_authorization(headers)
+
+        if auth_code == 200 and auth_response is not None:
+            expires_in = _token_expires_in(token)
+            if expires_in is not None:
+                self.cache.set(key, auth_response, min(self.cache.ttl_seconds, expires_in))
+
+        return auth_response, auth_code
+
+    # Everything else goes straight to Auth
+    def __getattr__(self, name):
+        return getattr(self.auth, name)
+
+
+def _token_expires_in(token):
+    """Seconds until the token exp claim, or None if it has none.
+
+    The signature is not checked here: the token was just verified by Auth.
+    """
+    if token.lower().startswith("bearer "):
+        token = token[len("bearer "):]
+
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+
+    if "exp" not in claims:
+        return None
+
+    return claims["exp"] - time.time()
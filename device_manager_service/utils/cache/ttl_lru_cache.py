@@ -0,0 +1,67 @@
+import time
+import threading
+from collections import OrderedDict
+
+from prometheus_client import Counter
+
+
+CACHE_HITS = Counter("cache_hits_total", "Lookups answered by a process-local cache", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "Lookups not found (or expired) in a process-local cache", ["cache"])
+
+
+class TTLLRUCache:
+    def __init__(self, name, max_size, ttl_seconds):
+        """Thread safe, process-local cache with per entry expiry and LRU eviction.
+
+        Args:
+            name (str): Cache name, used as metric label
+            max_size (int): Entries kept before the least recently used is evicted
+            ttl_seconds (float): Default time an entry stays valid
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        self._hits = CACHE_HITS.labels(cache=name)
+        self._misses = CACHE_MISSES.labels(cache=name)
+
+    def get(self, key):
+        """Return the cached value of key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits.inc()
+                    return value
+
+                del self._entries[key]
+
+        self._misses.inc()
+        return None
+
+    def set(self, key, value, ttl_seconds=None):
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
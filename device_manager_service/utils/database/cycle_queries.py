@@ -0,0 +1,272 @@
+from collections import defaultdict
+
+from sqlalchemy import tuple_
+
+from device_manager_service.models.db_models import (
+    DBShiftableMachine,
+    DBShiftableCycle,
+    DBShiftablePowerProfile,
+)
+from device_manager_service.models import Pool, PoolByUser
+from device_manager_service.utils.models.deserialize import (
+    deserialize_cycle,
+    deserialize_power_profile_slot,
+)
+
+
+def query_machines_by_serial_numbers(session, serial_numbers):
+    """Resolve every requested serial number in a single round trip.
+
+    Returns a dict {serial_number: row} with the columns needed to build
+    responses and check ownership. Serials missing from the database are
+    simply absent from the dict.
+    """
+    if not serial_numbers:
+        return {}
+
+    rows = session.query(
+        DBShiftableMachine.id,
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.serial_number,
+        DBShiftableMachine.device_type,
+    ).filter(
+        DBShiftableMachine.serial_number.in_(set(serial_numbers))
+    ).order_by(DBShiftableMachine.id).all()
+
+    machines = {}
+    for row in rows:
+        # Keep the first match, as the previous .first() lookups did
+        machines.setdefault(row.serial_number, row)
+
+    return machines
+
+
+def query_machines_by_user_ids(session, user_ids):
+    """Fetch the machines of every given user in a single round trip.
+
+    Returns a dict {user_id: [row, ...]} ordered by machine id.
+    """
+    if not user_ids:
+        return {}
+
+    rows = session.query(
+        DBShiftableMachine.id,
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.serial_number,
+        DBShiftableMachine.device_type,
+    ).filter(
+        DBShiftableMachine.user_id.in_(set(user_ids))
+    ).order_by(DBShiftableMachine.id).all()
+
+    machines = defaultdict(list)
+    for row in rows:
+        machines[row.user_id].append(row)
+
+    return machines
+
+
+def query_cycle_owners(session, cycle_keys):
+    """Resolve (serial_number, sequence_id) pairs to their device, in one query.
+
+    Returns a dict {(serial_number, sequence_id): row} where row has the
+    serial_number, sequence_id, user_id and brand columns. Pairs without a
+    matching cycle are absent from the dict.
+    """
+    cycle_keys = set(cycle_keys)
+    if not cycle_keys:
+        return {}
+
+    rows = session.query(
+        DBShiftableMachine.serial_number,
+        DBShiftableCycle.sequence_id,
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.brand,
+    ).join(
+        DBShiftableMachine, DBShiftableCycle.shiftable_machine_id == DBShiftableMachine.id
+    ).filter(
+        tuple_(DBShiftableMachine.serial_number, DBShiftableCycle.sequence_id).in_(cycle_keys)
+    ).order_by(DBShiftableCycle.id).all()
+
+    cycle_owners = {}
+    for row in rows:
+        # Keep the first match, as the previous .first() lookups did
+        cycle_owners.setdefault((row.serial_number, row.sequence_id), row)
+
+    return cycle_owners
+
+
+def query_cycles_by_machine(
+    session,
+    machine_ids,
+    start_time=None,
+    end_time=None,
+    is_optimized=None,
+    end_inclusive=True
+):
+    """Fetch the cycles of the given machines, and their power profiles.
+
+    Filtering on scheduled start time and optimization status is done in
+    the database. Times are naive UTC, like the columns they are compared
+    with. Exactly two queries are issued regardless of the number of
+    machines or cycles.
+
+    Returns a dict {machine_id: [MachineCycle, ...]} ordered by cycle id.
+    """
+    if not machine_ids:
+        return {}
+
+    cycles_query = session.query(
+        DBShiftableCycle.id,
+        DBShiftableCycle.shiftable_machine_id,
+        DBShiftableCycle.sequence_id,
+        DBShiftableCycle.earliest_start_time,
+        DBShiftableCycle.latest_end_time,
+        DBShiftableCycle.scheduled_start_time,
+        DBShiftableCycle.expected_end_time,
+        DBShiftableCycle.program,
+        DBShiftableCycle.is_optimized,
+    ).filter(DBShiftableCycle.shiftable_machine_id.in_(set(machine_ids)))
+
+    if start_time is not None:
+        cycles_query = cycles_query.filter(
+            DBShiftableCycle.scheduled_start_time >= start_time
+        )
+    if end_time is not None:
+        if end_inclusive:
+            cycles_query = cycles_query.filter(
+                DBShiftableCycle.scheduled_start_time <= end_time
+            )
+        else:
+            cycles_query = cycles_query.filter(
+                DBShiftableCycle.scheduled_start_time < end_time
+            )
+    if is_optimized is not None:
+        cycles_query = cycles_query.filter(
+            DBShiftableCycle.is_optimized == is_optimized
+        )
+
+    cycles = cycles_query.order_by(DBShiftableCycle.id).all()
+    if len(cycles) == 0:
+        return {}
+
+    power_profiles = query_power_profiles(session, [cycle.id for cycle in cycles])
+
+    cycles_by_machine = defaultdict(list)
+    for cycle in cycles:
+        cycles_by_machine[cycle.shiftable_machine_id].append(
+            deserialize_cycle(cycle, power_profiles.get(cycle.id, []))
+        )
+
+    return cycles_by_machine
+
+
+def query_power_profiles(session, cycle_ids):
+    """Fetch the power profile slots of all given cycles in one query.
+
+    Returns a dict {cycle_id: [PowerProfile, ...]} ordered by slot insertion.
+    """
+    slots = session.query(
+        DBShiftablePowerProfile.cycle_ref,
+        DBShiftablePowerProfile.slot,
+        DBShiftablePowerProfile.max_power,
+        DBShiftablePowerProfile.min_power,
+        DBShiftablePowerProfile.expected_power,
+        DBShiftablePowerProfile.power_units,
+        DBShiftablePowerProfile.duration,
+        DBShiftablePowerProfile.duration_units,
+    ).filter(
+        DBShiftablePowerProfile.cycle_ref.in_(cycle_ids)
+    ).order_by(
+        DBShiftablePowerProfile.cycle_ref, DBShiftablePowerProfile.id
+    ).all()
+
+    power_profiles = defaultdict(list)
+    for slot in slots:
+        power_profiles[slot.cycle_ref].append(deserialize_power_profile_slot(slot))
+
+    return power_profiles
+
+
+def stream_fleet_pool(session, start_time, end_time, yield_per=1000):
+    """Stream every cycle scheduled in [start_time, end_time), fleet-wide.
+
+    Cycles, their power profile slots and their devices come from a single
+    joined query read through a server-side cursor, so memory stays bounded
+    by yield_per rows whatever the size of the fleet.
+
+    Yields one PoolByUser per device, holding a single Pool with the device
+    cycles, in (user_id, device id) order.
+    """
+    rows = session.query(
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.id.label("machine_id"),
+        DBShiftableMachine.serial_number,
+        DBShiftableMachine.device_type,
+        DBShiftableCycle.id,
+        DBShiftableCycle.sequence_id,
+        DBShiftableCycle.earliest_start_time,
+        DBShiftableCycle.latest_end_time,
+        DBShiftableCycle.scheduled_start_time,
+        DBShiftableCycle.expected_end_time,
+        DBShiftableCycle.program,
+        DBShiftableCycle.is_optimized,
+        DBShiftablePowerProfile.id.label("slot_id"),
+        DBShiftablePowerProfile.slot,
+        DBShiftablePowerProfile.max_power,
+        DBShiftablePowerProfile.min_power,
+        DBShiftablePowerProfile.expected_power,
+        DBShiftablePowerProfile.power_units,
+        DBShiftablePowerProfile.duration,
+        DBShiftablePowerProfile.duration_units,
+    ).join(
+        DBShiftableMachine,
+        DBShiftableCycle.shiftable_machine_id == DBShiftableMachine.id
+    ).outerjoin(
+        DBShiftablePowerProfile,
+        DBShiftablePowerProfile.cycle_ref == DBShiftableCycle.id
+    ).filter(
+        DBShiftableCycle.scheduled_start_time >= start_time,
+        DBShiftableCycle.scheduled_start_time < end_time
+    ).order_by(
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.id,
+        DBShiftableCycle.id,
+        DBShiftablePowerProfile.id
+    ).yield_per(yield_per)
+
+    device = None
+    cycles = []
+    cycle = None
+    power_profile = []
+
+    for row in rows:
+        if cycle is not None and row.id != cycle.id:
+            cycles.append(deserialize_cycle(cycle, power_profile))
+            cycle = None
+
+        if device is not None and row.machine_id != device.machine_id:
+            yield _device_pool(device, cycles)
+            cycles = []
+
+        if cycle is None:
+            device = row
+            cycle = row
+            power_profile = []
+
+        if row.slot_id is not None:
+            power_profile.append(deserialize_power_profile_slot(row))
+
+    if cycle is not None:
+        cycles.append(deserialize_cycle(cycle, power_profile))
+        yield _device_pool(device, cycles)
+
+
+def _device_pool(device, cycles):
+    return PoolByUser(
+        user_id=device.user_id,
+        pool=[Pool(
+            serial_number=device.serial_number,
+            device_type=device.device_type,
+            cycles_in_pool=cycles
+        )]
+    )
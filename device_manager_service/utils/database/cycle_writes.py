@@ -0,0 +1,29 @@
+from device_manager_service.models.db_models import DBShiftablePowerProfile
+from device_manager_service.utils.database.db_interactions import (
+    add_row_to_table,
+    bulk_insert_rows,
+)
+
+
+def add_cycle_with_power_profile(session, machine_cycle, power_profile_rows, error_msg):
+    """Flush a cycle and insert its power profile slots, without committing.
+
+    The cycle is flushed once to get its id, then every slot is written in a
+    single batched insert, instead of one flush (and round trip) per slot.
+    The caller commits, so the cycle and its slots land in one transaction.
+
+    Args:
+        machine_cycle (DBShiftableCycle): Cycle to save, without power profile
+        power_profile_rows (list): DBShiftablePowerProfile column values, as dicts
+            without cycle_ref
+
+    Returns the response code.
+    """
+    response_code = add_row_to_table(session, machine_cycle, error_msg)
+    if response_code != 200:
+        return response_code
+
+    for row in power_profile_rows:
+        row["cycle_ref"] = machine_cycle.id
+
+    return bulk_insert_rows(session, DBShiftablePowerProfile, power_profile_rows, error_msg)
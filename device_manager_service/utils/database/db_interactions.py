@@ -33,6 +33,39 @@ def add_row_to_table(session, db_row, error_msg, cor_id = None):
     return code
 
 
+def bulk_insert_rows(session, model, rows, error_msg, cor_id = None):
+    """Insert many rows of model in batched (executemany) statements.
+
+    rows are plain dicts of column values. Nothing is added to the session
+    identity map, so use it for rows that are not read back in the same session.
+    """
+    code = 200
+
+    if len(rows) == 0:
+        return code
+
+    try:
+        session.bulk_insert_mappings(model, rows)
+
+    except Exception as e:
+        session.rollback()
+        
+        if cor_id is None:
+            generalLogger.error(repr(e))
+            generalLogger.error(error_msg)
+        else:
+            logger.error(repr(e), extra=cor_id)
+            logger.error(error_msg, extra=cor_id)
+
+        code = 500
+        
+        generalLogger.debug("Closing DB session")
+        session.close()
+
+    
+    return code
+
+
 def commit_db_changes(session, error_msg, cor_id = None):
     code = 200
 
@@ -0,0 +1,58 @@
+from collections import namedtuple
+
+from device_manager_service import Config
+from device_manager_service.models.db_models import DBShiftableMachine
+from device_manager_service.utils.cache.ttl_lru_cache import TTLLRUCache
+
+
+# Device columns that do not change while the device is registered
+DeviceMetadata = namedtuple(
+    "DeviceMetadata", ["id", "user_id", "serial_number", "brand", "device_type", "device_ssa"]
+)
+
+_device_metadata_cache = TTLLRUCache(
+    name="device_metadata",
+    max_size=Config.DEVICE_CACHE_MAX_SIZE,
+    ttl_seconds=Config.DEVICE_CACHE_TTL_SECONDS
+)
+
+
+def get_device_metadata(session, serial_number):
+    """Read-through lookup of the device metadata by serial number.
+
+    Only metadata is cached: load the DBShiftableMachine row to read or
+    change settings, cycles or connection state. Returns None if the device
+    does not exist (missing devices are not cached, so new registrations are
+    seen right away).
+    """
+    metadata = _device_metadata_cache.get(serial_number)
+    if metadata is not None:
+        return metadata
+
+    row = session.query(
+        DBShiftableMachine.id,
+        DBShiftableMachine.user_id,
+        DBShiftableMachine.serial_number,
+        DBShiftableMachine.brand,
+        DBShiftableMachine.device_type,
+        DBShiftableMachine.device_ssa,
+    ).filter(
+        DBShiftableMachine.serial_number == serial_number
+    ).order_by(DBShiftableMachine.id).first()
+
+    if row is None:
+        return None
+
+    metadata = DeviceMetadata(*row)
+    _device_metadata_cache.set(serial_number, metadata)
+
+    return metadata
+
+
+def invalidate_device_metadata(*serial_numbers):
+    """Drop cached metadata. Call it after committing a change to these devices."""
+    _device_metadata_cache.invalidate(*serial_numbers)
+
+
+def clear_device_metadata_cache():
+    _device_metadata_cache.clear()
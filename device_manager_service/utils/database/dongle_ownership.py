@@ -0,0 +1,66 @@
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from device_manager_service.models.db_models import DBDongles, DBDongleOwnership
+
+
+def acquire_dongle(session, api_key):
+    """Count one more user owning api_key. Returns the new number of owners."""
+    statement = insert(DBDongleOwnership.__table__).values(
+        api_key=api_key, owner_count=1
+    ).on_conflict_do_update(
+        index_elements=["api_key"],
+        set_={"owner_count": DBDongleOwnership.__table__.c.owner_count + 1}
+    ).returning(DBDongleOwnership.__table__.c.owner_count)
+
+    return session.execute(statement).scalar()
+
+
+def release_dongle(session, api_key):
+    """Count one user less owning api_key. Returns the number of owners left.
+
+    The row is removed when no owner is left. If api_key has no row (e.g.
+    before the first reconciliation), the owners are counted from DBDongles,
+    where the releasing user must still hold api_key.
+    """
+    remaining = session.execute(
+        text(
+            f"UPDATE {DBDongleOwnership.__tablename__} SET owner_count = owner_count - 1 "
+            f"WHERE api_key = :api_key RETURNING owner_count"
+        ),
+        {"api_key": api_key}
+    ).scalar()
+
+    if remaining is None:
+        remaining = session.query(func.count(DBDongles.id)).filter_by(api_key=api_key).scalar() - 1
+
+    if remaining <= 0:
+        session.query(DBDongleOwnership).filter_by(api_key=api_key).delete()
+        return 0
+
+    return remaining
+
+
+def rebuild_dongle_ownership(session):
+    """Recount the owners of every api_key from DBDongles. Does not commit.
+
+    The ownership table is locked first, so event transactions already
+    holding ownership rows commit before DBDongles is read, and new ones
+    wait until the rebuild is committed. Returns {api_key: owner_count}.
+    """
+    session.execute(text(f"LOCK TABLE {DBDongleOwnership.__tablename__} IN EXCLUSIVE MODE"))
+
+    counts = dict(
+        session.query(DBDongles.api_key, func.count(DBDongles.id)).filter(
+            DBDongles.api_key != None
+        ).group_by(DBDongles.api_key).all()
+    )
+
+    session.query(DBDongleOwnership).delete()
+    if len(counts) > 0:
+        session.bulk_insert_mappings(DBDongleOwnership, [
+            {"api_key": api_key, "owner_count": owner_count}
+            for api_key, owner_count in counts.items()
+        ])
+
+    return counts
@@ -0,0 +1,29 @@
+from device_manager_service.models.db_models import DBShiftableMachine
+
+
+def missing_user_devices(session, user_id, serial_numbers):
+    """Return the requested serial numbers that do not belong to user_id.
+
+    Runs a single indexed query on (user_id, serial_number) that only reads
+    the serial number column, instead of loading every machine of the user.
+    An empty set means the user owns all the requested devices.
+    """
+    requested = set(serial_numbers)
+    if len(requested) == 0:
+        return set()
+
+    owned = session.query(DBShiftableMachine.serial_number).filter(
+        DBShiftableMachine.user_id == user_id,
+        DBShiftableMachine.serial_number.in_(requested)
+    ).all()
+
+    return requested - {row.serial_number for row in owned}
+
+
+def user_has_devices(session, user_id):
+    """Check whether user_id owns at least one device, without loading any row."""
+    return session.query(
+        session.query(DBShiftableMachine.id).filter(
+            DBShiftableMachine.user_id == user_id
+        ).exists()
+    ).scalar()
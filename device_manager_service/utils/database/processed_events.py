@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from device_manager_service import Config
+from device_manager_service.models.db_models import DBProcessedEvent
+from device_manager_service.utils.cache.ttl_lru_cache import TTLLRUCache
+
+
+# Events known to be processed (committed), checked before the DB
+_seen_events = TTLLRUCache(
+    name="processed_events",
+    max_size=Config.PROCESSED_EVENT_CACHE_MAX_SIZE,
+    ttl_seconds=Config.PROCESSED_EVENT_CACHE_TTL_SECONDS
+)
+
+
+def claim_events(session, events):
+    """Mark events as processed, unless they already are.
+
+    One INSERT ... ON CONFLICT DO NOTHING RETURNING replaces the SELECT then
+    INSERT of each event. The rows are part of the session transaction, so
+    if it is rolled back the events can be processed again. Events seen
+    recently are skipped without going to the DB.
+
+    Args:
+        events (iterable): (event_type, event_id) pairs, event_id as a lowercase UUID string
+
+    Returns the set of pairs claimed by this call: the ones to process.
+    """
+    events = {event for event in events if _seen_events.get(event) is None}
+    if len(events) == 0:
+        return set()
+
+    now = datetime.utcnow()
+    statement = insert(DBProcessedEvent.__table__).values([
+        {"event_type": event_type, "event_id": event_id, "processed_timestamp": now}
+        for event_type, event_id in events
+    ]).on_conflict_do_nothing(
+        index_elements=["event_type", "event_id"]
+    ).returning(
+        DBProcessedEvent.event_type, DBProcessedEvent.event_id
+    )
+
+    claimed = {(row.event_type, str(row.event_id)) for row in session.execute(statement)}
+
+    # Conflicting rows were committed by a previous or concurrent transaction
+    remember_events(*(events - claimed))
+
+    return claimed
+
+
+def claim_event(session, event_type, event_id):
+    """claim_events for a single event. Returns True if it is to be processed."""
+    return len(claim_events(session, [(event_type, event_id)])) > 0
+
+
+def release_events(session, events):
+    """Undo the claims of events made in the session transaction, for events left unprocessed.
+
+    Args:
+        events (iterable): pairs returned by claim_events
+    """
+    events = list(events)
+    if len(events) == 0:
+        return
+
+    session.query(DBProcessedEvent).filter(
+        tuple_(DBProcessedEvent.event_type, DBProcessedEvent.event_id).in_(events)
+    ).delete(synchronize_session=False)
+
+
+def remember_events(*events):
+    """Cache events as processed. Call only once their claim is committed."""
+    for event in events:
+        _seen_events.set(event, True)
+
+
+def clear_processed_events_cache():
+    _seen_events.clear()
+
+
+def prune_processed_events(session, older_than, batch_size):
+    """Delete processed events claimed before older_than (naive UTC).
+
+    Rows are deleted in batches of batch_size, each in its own transaction,
+    so pruning a large backlog does not hold long locks. Returns the number
+    of deleted rows.
+    """
+    statement = text(
+        f"DELETE FROM {DBProcessedEvent.__tablename__} WHERE id IN ("
+        f"SELECT id FROM {DBProcessedEvent.__tablename__} "
+        f"WHERE processed_timestamp < :older_than LIMIT :batch_size)"
+    )
+
+    total = 0
+    while True:
+        deleted = session.execute(
+            statement, {"older_than": older_than, "batch_size": batch_size}
+        ).rowcount
+        session.commit()
+
+        total += deleted
+        if deleted < batch_size:
+            return total
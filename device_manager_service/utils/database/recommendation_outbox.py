@@ -0,0 +1,13 @@
+from device_manager_service.models.db_models import DBRecommendationDeletionOutbox
+
+
+def enqueue_recommendation_deletion(session, serial_number, sequence_id):
+    """Queue the deletion of the Energy Manager recommendation of a cycle.
+
+    Only adds the outbox row: commit it together with the cycle deletion, so
+    the recommendation is deleted if and only if the cycle was.
+    """
+    session.add(DBRecommendationDeletionOutbox(
+        serial_number=serial_number,
+        sequence_id=sequence_id,
+    ))
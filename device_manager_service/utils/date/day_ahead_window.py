@@ -0,0 +1,27 @@
+from datetime import datetime, time, timedelta
+
+import pytz
+
+
+def day_ahead_window(reference_date=None, time_zone="UTC"):
+    """Half-open [start, end) window covering the day after reference_date.
+
+    Day boundaries are midnights in time_zone (so DST days last 23 or 25
+    hours), returned as naive UTC datetimes like the ones stored in the
+    database. reference_date defaults to today in time_zone.
+
+    Raises pytz.UnknownTimeZoneError for unknown time zone names.
+    """
+    tz = pytz.timezone(time_zone)
+
+    if reference_date is None:
+        reference_date = datetime.now(tz).date()
+
+    day_ahead = reference_date + timedelta(days=1)
+    start = tz.localize(datetime.combine(day_ahead, time.min))
+    end = tz.localize(datetime.combine(day_ahead + timedelta(days=1), time.min))
+
+    return (
+        start.astimezone(pytz.utc).replace(tzinfo=None),
+        end.astimezone(pytz.utc).replace(tzinfo=None)
+    )
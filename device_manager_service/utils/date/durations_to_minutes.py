@@ -0,0 +1,18 @@
+from datetime import datetime
+
+
+DURATION_FORMAT = "%H:%M:%S"
+
+
+def durations_to_minutes(durations):
+    """Transform durations like 01:03:00 to minutes (63).
+
+    Power profile slots of a cycle usually share a handful of durations, so
+    each distinct value is parsed once for the whole list.
+    """
+    minutes_by_duration = {}
+    for duration in set(durations):
+        duration_time = datetime.strptime(duration, DURATION_FORMAT).time()
+        minutes_by_duration[duration] = duration_time.hour * 60 + duration_time.minute
+
+    return [minutes_by_duration[duration] for duration in durations]
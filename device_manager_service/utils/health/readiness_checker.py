@@ -0,0 +1,130 @@
+import threading
+import time
+import traceback
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from device_manager_service import Config, generalLogger, db
+from device_manager_service.utils.date.seconds_to_days_minutes_hours import seconds_to_days_minutes_hours
+
+
+CheckResult = namedtuple("CheckResult", ["ok", "required", "detail", "checked_at"])
+
+
+class ReadinessChecker:
+    def __init__(self):
+        """Run the readiness checks in a background thread and cache their results.
+
+        Probes read the last snapshot instead of doing I/O on each request.
+        Each check is a function returning (ok, detail). Checks that are not
+        required are reported but do not make the service unready.
+        """
+        self._checks = {}
+        # Replaced as a whole on each run, so readers need no lock
+        self._snapshot = {}
+        self._snapshot_monotonic = None
+
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            name="ReadinessChecker", target=self._run, daemon=True
+        )
+
+    def add(self, name, check, required=True):
+        self._checks[name] = (check, required)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def snapshot(self):
+        """(ready, {name: CheckResult}) of the last run.
+
+        Not ready before the first run, or if the last run is older than
+        READINESS_MAX_AGE_SECONDS (e.g. the checker thread is stuck).
+        """
+        snapshot, fresh = self._last_snapshot()
+        if not fresh:
+            return False, snapshot
+
+        ready = all(result.ok for result in snapshot.values() if result.required)
+
+        return ready, snapshot
+
+    def check(self, name):
+        """Cached CheckResult of one check.
+
+        None if it did not run yet, or if the last run is older than
+        READINESS_MAX_AGE_SECONDS, as for snapshot().
+        """
+        snapshot, fresh = self._last_snapshot()
+        if not fresh:
+            return None
+
+        return snapshot.get(name)
+
+    def _last_snapshot(self):
+        """(snapshot, fresh) of the last run."""
+        snapshot, snapshot_monotonic = self._snapshot, self._snapshot_monotonic
+        fresh = snapshot_monotonic is not None and \
+            time.monotonic() - snapshot_monotonic <= Config.READINESS_MAX_AGE_SECONDS
+
+        return snapshot, fresh
+
+    def run_checks(self):
+        snapshot = {}
+        for name, (check, required) in self._checks.items():
+            try:
+                ok, detail = check()
+            except Exception as e:
+                traceback.print_exc()
+                ok, detail = False, repr(e)
+
+            snapshot[name] = CheckResult(
+                ok=ok,
+                required=required,
+                detail=detail,
+                checked_at=datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+            )
+
+            if not ok:
+                generalLogger.warning(f"Readiness check {name} failed: {detail}")
+
+        self._snapshot, self._snapshot_monotonic = snapshot, time.monotonic()
+
+    def _run(self):
+        last_uptime_log = time.monotonic()
+        while True:
+            self.run_checks()
+
+            if time.monotonic() - last_uptime_log >= 600:
+                seconds_to_days_minutes_hours(time.monotonic() - self._started)
+                last_uptime_log = time.monotonic()
+
+            if self._stop.wait(Config.READINESS_CHECK_INTERVAL_SECONDS):
+                return
+
+
+def check_database():
+    """Round trip to the DB through the pool, reporting the pool status."""
+    with db.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    return True, db.engine.pool.status()
+
+
+def check_threads(threads):
+    """Check that every thread of a {name: Thread} dict is alive."""
+    alive = {name: thread.is_alive() for name, thread in threads.items()}
+
+    return all(alive.values()), alive
+
+
+# Checks of the threads are added by __main__, which owns them
+readiness = ReadinessChecker()
+readiness.add("database", check_database)
@@ -0,0 +1,114 @@
+import functools
+import random
+
+from connexion.exceptions import NonConformingResponse
+from prometheus_client import Counter
+
+from device_manager_service import Config, generalLogger
+from device_manager_service.utils.validation.streaming_response_validator import StreamingResponseValidator
+
+
+RESPONSE_VALIDATIONS = Counter(
+    "response_validations_total",
+    "Responses validated against the API specification, per operation and outcome",
+    ["operation", "outcome"]
+)
+
+POLICY_RATES = {"full": 1.0, "off": 0.0}
+
+# Long enough to locate the error without logging the whole response
+MAX_LOGGED_ERROR_LENGTH = 1000
+
+
+def parse_policy(policy):
+    """Fraction of the responses to validate: full, off, sampled or a number from 0 to 1."""
+    policy = policy.strip().lower()
+    if policy == "sampled":
+        return Config.RESPONSE_VALIDATION_SAMPLE_RATE
+    if policy in POLICY_RATES:
+        return POLICY_RATES[policy]
+
+    try:
+        rate = float(policy)
+    except ValueError:
+        rate = None
+    if rate is None or not 0 <= rate <= 1:
+        raise ValueError(f"Invalid response validation policy {policy}, expected full, sampled, off or a rate")
+
+    return rate
+
+
+def parse_overrides(overrides):
+    """{operation id: rate} of RESPONSE_VALIDATION_OVERRIDES ("operation_id=policy,...")."""
+    rates = {}
+    for override in overrides.split(","):
+        if override.strip() == "":
+            continue
+
+        operation_id, separator, policy = override.partition("=")
+        if separator == "":
+            raise ValueError(f"Invalid response validation override {override}, expected operation_id=policy")
+
+        rates[operation_id.strip()] = parse_policy(policy)
+
+    return rates
+
+
+DEFAULT_RATE = parse_policy(Config.RESPONSE_VALIDATION)
+OVERRIDE_RATES = parse_overrides(Config.RESPONSE_VALIDATION_OVERRIDES)
+
+
+class SampledResponseValidator(StreamingResponseValidator):
+    def __init__(self, operation, mimetype, validator=None):
+        """Validate a sample of the responses of an operation.
+
+        Connexion validates every response with validate_responses=True,
+        encoding and decoding it again before the jsonschema check. This
+        validator only does it for the fraction of the responses set by the
+        operation policy (RESPONSE_VALIDATION, or its entry in
+        RESPONSE_VALIDATION_OVERRIDES). Responses that do not conform are
+        counted and logged, and only fail the request if
+        RESPONSE_VALIDATION_FAIL_REQUESTS is set. Streamed responses are
+        never validated.
+
+        Passed to add_api as validator_map={'response': SampledResponseValidator}.
+        """
+        super().__init__(operation, mimetype, validator)
+
+        self.operation_id = operation.operation_id
+        self.rate = OVERRIDE_RATES.get(self.operation_id, DEFAULT_RATE)
+
+    def validate_response(self, data, status_code, headers, url):
+        try:
+            result = super().validate_response(data, status_code, headers, url)
+
+        except NonConformingResponse as e:
+            RESPONSE_VALIDATIONS.labels(operation=self.operation_id, outcome="failed").inc()
+            generalLogger.error(
+                f"Response {status_code} of {self.operation_id} does not conform to the API: "
+                f"{e.reason}: {str(e.message)[:MAX_LOGGED_ERROR_LENGTH]}"
+            )
+
+            if Config.RESPONSE_VALIDATION_FAIL_REQUESTS:
+                raise
+            return False
+
+        RESPONSE_VALIDATIONS.labels(operation=self.operation_id, outcome="ok").inc()
+
+        return result
+
+    def __call__(self, function):
+        if self.rate <= 0 or not self.validates_mimetype():
+            return function
+
+        validated = super().__call__(function)
+        if self.rate >= 1:
+            return validated
+
+        @functools.wraps(function)
+        def wrapper(request):
+            if random.random() < self.rate:
+                return validated(request)
+            return function(request)
+
+        return wrapper
@@ -0,0 +1,43 @@
+import functools
+
+from connexion.decorators.response import ResponseValidator
+from connexion.utils import all_json
+
+
+def is_streamed(response):
+    """True for framework responses whose body is a generator, e.g. /pool-export."""
+    return getattr(response, "is_streamed", False)
+
+
+class StreamingResponseValidator(ResponseValidator):
+    def validates_mimetype(self):
+        """False if responses of the operation mimetype are never checked against a schema."""
+        return all_json([self.mimetype]) or self.mimetype == "text/plain"
+
+    def __call__(self, function):
+        """Validate every response, except the streamed ones.
+
+        To validate a response connexion reads its whole body, which raises
+        for direct passthrough responses and would buffer the stream
+        otherwise, so streamed responses are returned as they are. Operations
+        whose mimetype has no schema check are not wrapped at all.
+
+        Passed to add_api as validator_map={'response': StreamingResponseValidator}.
+        """
+        if not self.validates_mimetype():
+            return function
+
+        @functools.wraps(function)
+        def wrapper(request):
+            response = function(request)
+            if is_streamed(response):
+                return response
+
+            connexion_response = self.operation.api.get_connexion_response(response, self.mimetype)
+            self.validate_response(
+                connexion_response.body, connexion_response.status_code,
+                connexion_response.headers, request.url)
+
+            return response
+
+        return wrapper
@@ -0,0 +1,38 @@
+-- Indexes on the filter and join keys of the controllers and SSA parsers.
+-- Mirrors the __table_args__ / index=True declarations in models/db_models.py,
+-- so fresh databases created by db.create_all() already have them.
+--
+-- Indexes are built CONCURRENTLY to avoid locking writes on live tables.
+-- If a build fails it leaves an INVALID index behind: drop it before
+-- re-running, otherwise IF NOT EXISTS will skip it.
+--
+-- The unique index fails if duplicated (serial_number, brand) pairs exist.
+-- Find them first with:
+--   SELECT serial_number, brand, count(*) FROM db_shiftable_machine
+--   GROUP BY serial_number, brand HAVING count(*) > 1
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_shiftable_machine_serial_number_brand
+    ON db_shiftable_machine (serial_number, brand);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shiftable_machine_user_id_serial_number
+    ON db_shiftable_machine (user_id, serial_number) INCLUDE (id, device_type);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shiftable_cycle_machine_id_scheduled_start_time
+    ON db_shiftable_cycle (shiftable_machine_id, scheduled_start_time);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shiftable_cycle_machine_id_sequence_id
+    ON db_shiftable_cycle (shiftable_machine_id, sequence_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shiftable_cycle_sequence_id
+    ON db_shiftable_cycle (sequence_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shiftable_power_profile_cycle_ref_id
+    ON db_shiftable_power_profile (cycle_ref, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_db_shiftable_cycle_old_cycle_ref
+    ON db_shiftable_cycle_old (cycle_ref);
+
+ANALYZE db_shiftable_machine;
+ANALYZE db_shiftable_cycle;
+ANALYZE db_shiftable_power_profile;
+ANALYZE db_shiftable_cycle_old;
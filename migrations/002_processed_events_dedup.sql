@@ -0,0 +1,26 @@
+-- Idempotency key and retention of processed_events.
+-- Mirrors the __table_args__ of DBProcessedEvent in models/db_models.py,
+-- so fresh databases created by db.create_all() already have them.
+--
+-- Existing rows get the migration time as processed_timestamp, so they are
+-- pruned once PROCESSED_EVENT_RETENTION_DAYS have passed.
+--
+-- Duplicated (event_type, event_id) rows are removed first, keeping the
+-- oldest one, otherwise the unique index cannot be built.
+
+DELETE FROM processed_events duplicate
+    USING processed_events original
+    WHERE duplicate.event_type = original.event_type
+    AND duplicate.event_id = original.event_id
+    AND duplicate.id > original.id;
+
+ALTER TABLE processed_events
+    ADD COLUMN IF NOT EXISTS processed_timestamp TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc');
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_processed_events_event_type_event_id
+    ON processed_events (event_type, event_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_processed_events_processed_timestamp
+    ON processed_events (processed_timestamp);
+
+ANALYZE processed_events;
@@ -0,0 +1,17 @@
+-- Owner count of each dongle API key (DBDongleOwnership in models/db_models.py).
+-- db.create_all() creates the table on fresh databases. Here it is created
+-- and filled from db_dongles, so existing deployments do not wait for the
+-- first reconciliation.
+
+CREATE TABLE IF NOT EXISTS db_dongle_ownership (
+    api_key VARCHAR(32) PRIMARY KEY,
+    owner_count INTEGER NOT NULL
+);
+
+INSERT INTO db_dongle_ownership (api_key, owner_count)
+    SELECT api_key, count(*) FROM db_dongles
+    WHERE api_key IS NOT NULL
+    GROUP BY api_key
+    ON CONFLICT (api_key) DO UPDATE SET owner_count = EXCLUDED.owner_count;
+
+ANALYZE db_dongle_ownership;
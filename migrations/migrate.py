@@ -0,0 +1,74 @@
+"""Apply the versioned SQL migrations of this folder to the device manager database.
+
+Files are named <version>_<description>.sql and applied in order. Applied
+versions are recorded in the schema_migrations table, so running this script
+again only applies new files. Tables themselves are still created by
+db.create_all() when the service starts.
+
+Usage:
+    python migrations/migrate.py
+
+Connection settings are read from the same environment variables as the service.
+"""
+
+import os
+import glob
+
+import psycopg2
+
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def connect(dbname="devicemanager"):
+    return psycopg2.connect(
+        host=os.environ.get('DATABASE_IP', '127.0.0.1'),
+        port=os.environ.get('DATABASE_PORT', '5432'),
+        user=os.environ.get('DATABASE_USER', 'postgres'),
+        password=os.environ.get('DATABASE_PASSWORD', 'mysecretpassword'),
+        dbname=dbname,
+    )
+
+
+def split_statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def run_migration_file(cursor, path):
+    with open(path) as migration_file:
+        for statement in split_statements(migration_file.read()):
+            cursor.execute(statement)
+
+
+def main():
+    connection = connect()
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    connection.autocommit = True
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(255) PRIMARY KEY, "
+            "applied_timestamp TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'))"
+        )
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+            version = os.path.basename(path)[:-len(".sql")]
+            if version in applied:
+                continue
+
+            print(f"Applying migration {version}...")
+            run_migration_file(cursor, path)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version) VALUES (%s)", (version,)
+            )
+
+    connection.close()
+    print("Database is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Per-cycle write time of the SSA power profile parsers, per slot vs bulk.
+
+"per slot" is the previous behaviour: every slot is added and flushed on its
+own, so a 96-slot profile costs 96 INSERT round trips before the cycle row.
+"bulk" is what ssa/whirlpool/wp_pp_handle.py does now: durations_to_minutes,
+then utils/database/cycle_writes.add_cycle_with_power_profile (the cycle is
+flushed once and all slots go in one bulk_insert_rows), then commit_db_changes.
+
+Both write the service models (models/db_models.py).
+
+Usage:
+    cd test_bed && python benchmark_cycle_writes.py
+
+Connection settings are read from the same environment variables as the service.
+The scratch database (BENCH_DATABASE, default "devicemanager_bench") is dropped
+and recreated on every run.
+"""
+
+import os
+import sys
+import time
+import statistics
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+sys.path.append("..")
+
+from migrations.migrate import connect
+from device_manager_service.models.db_models import (
+    DBShiftableMachine,
+    DBShiftableCycle,
+    DBShiftablePowerProfile,
+)
+from device_manager_service.utils.database.cycle_writes import add_cycle_with_power_profile
+from device_manager_service.utils.database.db_interactions import commit_db_changes
+from device_manager_service.utils.date.durations_to_minutes import durations_to_minutes
+
+
+BENCH_DATABASE = os.environ.get("BENCH_DATABASE", "devicemanager_bench")
+CYCLES = int(os.environ.get("BENCH_CYCLES", 200))
+SLOTS_PER_CYCLE = int(os.environ.get("BENCH_SLOTS_PER_CYCLE", 96))
+
+TABLES = [
+    DBShiftableMachine.__table__,
+    DBShiftableCycle.__table__,
+    DBShiftablePowerProfile.__table__,
+]
+
+
+def binding_set(slots):
+    return [
+        {
+            "slotNumber": slot,
+            "valueMax": 2000.0,
+            "defaultDuration": "00:15:00" if slot % 4 else "00:30:00",
+        }
+        for slot in range(1, slots + 1)
+    ]
+
+
+def new_cycle(sequence_id):
+    now = datetime.utcnow()
+    return DBShiftableCycle(
+        sequence_id=str(sequence_id),
+        earliest_start_time=now,
+        latest_end_time=now + timedelta(hours=8),
+        scheduled_start_time=now,
+        expected_end_time=now + timedelta(hours=2),
+        program="cotton",
+        is_optimized=False,
+    )
+
+
+# Copy of the parsers before cycle_writes.py
+def write_per_slot(session, sequence_id, bindings):
+    power_profile = []
+    for pp in bindings:
+        duration_time = datetime.strptime(pp["defaultDuration"], "%H:%M:%S").time()
+        slot_profile = DBShiftablePowerProfile(
+            slot=pp["slotNumber"], max_power=pp["valueMax"], power_units="W",
+            duration=duration_time.hour * 60 + duration_time.minute, duration_units="minutes",
+        )
+        session.add(slot_profile)
+        session.flush()
+        power_profile.append(slot_profile)
+
+    cycle = new_cycle(sequence_id)
+    cycle.power_profile = power_profile
+    session.add(cycle)
+    session.flush()
+    session.commit()
+
+
+# Same steps as wp_pp_handle.py
+def write_bulk(session, sequence_id, bindings):
+    durations = durations_to_minutes([pp["defaultDuration"] for pp in bindings])
+
+    power_profile_rows = [
+        dict(
+            slot=pp["slotNumber"],
+            max_power=pp["valueMax"],
+            min_power=None,
+            expected_power=None,
+            power_units="W",
+            duration=duration_minutes,
+            duration_units="minutes",
+        )
+        for pp, duration_minutes in zip(bindings, durations)
+    ]
+
+    error_msg = f"Failed to save cycle {sequence_id} in database"
+    response_code = add_cycle_with_power_profile(
+        session, new_cycle(sequence_id), power_profile_rows, error_msg)
+    if response_code == 200:
+        response_code = commit_db_changes(session, error_msg)
+    if response_code != 200:
+        raise RuntimeError(error_msg)
+
+
+def run(engine, name, write):
+    bindings = binding_set(SLOTS_PER_CYCLE)
+    timings = []
+
+    with Session(engine) as session:
+        for sequence_id in range(CYCLES):
+            start = time.perf_counter()
+            write(session, sequence_id, bindings)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(
+        f"{name:>9}: median {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms per cycle "
+        f"({CYCLES} cycles x {SLOTS_PER_CYCLE} slots)"
+    )
+
+
+def main():
+    admin_connection = connect(dbname="postgres")
+    admin_connection.autocommit = True
+    with admin_connection.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+    admin_connection.close()
+
+    engine = create_engine("postgresql+psycopg2://", creator=lambda: connect(dbname=BENCH_DATABASE))
+    DBShiftableCycle.metadata.create_all(engine, tables=TABLES)
+
+    run(engine, "per slot", write_per_slot)
+    run(engine, "bulk", write_bulk)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
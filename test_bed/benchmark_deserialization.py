@@ -0,0 +1,118 @@
+"""Decoding time of the delay batches sent by the optimizer, legacy vs compiled deserializers.
+
+"legacy" is the previous util.deserialize_model: every value resolves its
+declared type again (is_generic, six.integer_types checks) and datetimes are
+parsed by dateutil. "compiled" is the current util: each model gets a
+deserializer compiled on first use and cached, and datetimes go through
+datetime.fromisoformat.
+
+Both decode the body of POST /request-delay-by-cycle the way the controller
+does, one DelaysByCycleRequestBody.from_dict per delay.
+
+Usage:
+    cd test_bed && python benchmark_deserialization.py
+"""
+
+import os
+import sys
+import time
+import datetime
+import statistics
+
+import six
+from dateutil.parser import parse
+
+sys.path.append("..")
+
+from device_manager_service import util, typing_utils
+from device_manager_service.models.delays_by_cycle_request_body import DelaysByCycleRequestBody
+
+
+BATCH_SIZES = [int(size) for size in os.environ.get("BENCH_BATCH_SIZES", "100,1000,10000").split(",")]
+RUNS = int(os.environ.get("BENCH_RUNS", 20))
+
+
+# Copy of util.deserialize_model before the compiled deserializers
+def legacy_deserialize(data, klass):
+    if data is None:
+        return None
+
+    if klass in six.integer_types or klass in (float, str, bool, bytearray):
+        try:
+            return klass(data)
+        except TypeError:
+            return data
+    elif klass == object:
+        return data
+    elif klass == datetime.date:
+        return parse(data).date()
+    elif klass == datetime.datetime:
+        return parse(data)
+    elif typing_utils.is_generic(klass):
+        if typing_utils.is_list(klass):
+            return [legacy_deserialize(sub_data, klass.__args__[0]) for sub_data in data]
+        if typing_utils.is_dict(klass):
+            return {k: legacy_deserialize(v, klass.__args__[1]) for k, v in six.iteritems(data)}
+    else:
+        return legacy_deserialize_model(data, klass)
+
+
+def legacy_deserialize_model(data, klass):
+    instance = klass()
+
+    if not instance.openapi_types:
+        return data
+
+    for attr, attr_type in six.iteritems(instance.openapi_types):
+        if data is not None \
+                and instance.attribute_map[attr] in data \
+                and isinstance(data, (list, dict)):
+            value = data[instance.attribute_map[attr]]
+            setattr(instance, attr, legacy_deserialize(value, attr_type))
+
+    return instance
+
+
+def delay_batch(size):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    return [
+        {
+            "sequence_id": f"{delay}",
+            "serial_number": f"device{delay % 500}",
+            "new_start_time": (now + datetime.timedelta(minutes=15 * (delay % 96))).isoformat(),
+        }
+        for delay in range(size)
+    ]
+
+
+def run(name, deserialize_model, body):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        delays = [deserialize_model(d, DelaysByCycleRequestBody) for d in body]
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(
+        f"{name:>9}: median {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms per batch "
+        f"({len(body)} delays)"
+    )
+
+    return delays
+
+
+def main():
+    for size in BATCH_SIZES:
+        body = delay_batch(size)
+
+        legacy = run("legacy", legacy_deserialize_model, body)
+        compiled = run("compiled", util.deserialize_model, body)
+
+        if legacy != compiled:
+            print("Deserialized delays differ!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
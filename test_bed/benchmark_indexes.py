@@ -0,0 +1,195 @@
+"""Query plans of the hot lookups before and after migrations/001_hot_lookup_indexes.sql.
+
+Seeds a scratch database (BENCH_DATABASE, default "devicemanager_bench") with
+1M cycles, runs EXPLAIN ANALYZE on the queries issued by the controllers and
+SSA parsers, applies the index migration and runs them again.
+
+Usage:
+    cd test_bed && python benchmark_indexes.py
+
+Connection settings are read from the same environment variables as the service.
+The scratch database is dropped and recreated on every run.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append("..")
+
+from migrations.migrate import connect, run_migration_file, MIGRATIONS_DIR
+
+
+BENCH_DATABASE = os.environ.get("BENCH_DATABASE", "devicemanager_bench")
+USERS = int(os.environ.get("BENCH_USERS", 5000))
+MACHINES_PER_USER = int(os.environ.get("BENCH_MACHINES_PER_USER", 4))
+CYCLES_PER_MACHINE = int(os.environ.get("BENCH_CYCLES_PER_MACHINE", 50))  # 1M cycles
+SLOTS_PER_CYCLE = int(os.environ.get("BENCH_SLOTS_PER_CYCLE", 2))
+
+# Same columns as models/db_models.py, without any secondary index
+SCHEMA = """
+CREATE TABLE db_shiftable_machine (
+    id SERIAL PRIMARY KEY,
+    user_id VARCHAR(64) NOT NULL,
+    name VARCHAR(64) NOT NULL,
+    device_type VARCHAR(64) NOT NULL,
+    brand VARCHAR(64) NOT NULL,
+    serial_number VARCHAR(64) NOT NULL,
+    allow_hems BOOLEAN NOT NULL,
+    automatic_management BOOLEAN NOT NULL,
+    device_ssa VARCHAR(128),
+    connection_state BOOLEAN,
+    connection_state_timestamp TIMESTAMP,
+    current_cycle_id INTEGER
+);
+CREATE TABLE db_shiftable_cycle (
+    id SERIAL PRIMARY KEY,
+    sequence_id VARCHAR(128) NOT NULL,
+    earliest_start_time TIMESTAMP NOT NULL,
+    latest_end_time TIMESTAMP NOT NULL,
+    scheduled_start_time TIMESTAMP NOT NULL,
+    expected_end_time TIMESTAMP NOT NULL,
+    program VARCHAR(64) NOT NULL,
+    is_optimized BOOLEAN NOT NULL,
+    shiftable_machine_id INTEGER REFERENCES db_shiftable_machine (id) ON DELETE CASCADE
+);
+CREATE TABLE db_shiftable_cycle_old (
+    id SERIAL PRIMARY KEY,
+    creation_timestamp TIMESTAMP NOT NULL,
+    sequence_id VARCHAR(128) NOT NULL,
+    earliest_start_time TIMESTAMP NOT NULL,
+    latest_end_time TIMESTAMP NOT NULL,
+    scheduled_start_time TIMESTAMP NOT NULL,
+    expected_end_time TIMESTAMP NOT NULL,
+    cycle_ref INTEGER REFERENCES db_shiftable_cycle (id) ON DELETE CASCADE
+);
+CREATE TABLE db_shiftable_power_profile (
+    id SERIAL PRIMARY KEY,
+    slot INTEGER NOT NULL,
+    max_power FLOAT NOT NULL,
+    min_power FLOAT,
+    expected_power FLOAT,
+    power_units VARCHAR(64) NOT NULL,
+    duration FLOAT NOT NULL,
+    duration_units VARCHAR(64) NOT NULL,
+    cycle_ref INTEGER REFERENCES db_shiftable_cycle (id) ON DELETE CASCADE
+)
+"""
+
+SEED = [
+    f"""
+    INSERT INTO db_shiftable_machine (
+        user_id, name, device_type, brand, serial_number, allow_hems,
+        automatic_management, device_ssa, connection_state, connection_state_timestamp
+    )
+    SELECT
+        'user' || ((n - 1) / {MACHINES_PER_USER}), 'machine', 'WASHING_MACHINE',
+        CASE WHEN n % 2 = 0 THEN 'BSH' ELSE 'Whirlpool' END,
+        'SN' || lpad(n::text, 8, '0'), true, true, 'ssa', true, now()
+    FROM generate_series(1, {USERS * MACHINES_PER_USER}) AS n
+    """,
+    f"""
+    INSERT INTO db_shiftable_cycle (
+        sequence_id, earliest_start_time, latest_end_time, scheduled_start_time,
+        expected_end_time, program, is_optimized, shiftable_machine_id
+    )
+    SELECT
+        'seq-' || m.id || '-' || c, start_time, start_time + interval '12 hours',
+        start_time, start_time + interval '90 minutes', 'cotton', c % 3 = 0, m.id
+    FROM db_shiftable_machine m
+    CROSS JOIN generate_series(1, {CYCLES_PER_MACHINE}) AS c
+    CROSS JOIN LATERAL (
+        SELECT timestamp '2024-01-01' + (c * 7 + m.id % 7) * interval '1 day' AS start_time
+    ) t
+    """,
+    f"""
+    INSERT INTO db_shiftable_power_profile (
+        slot, max_power, min_power, expected_power, power_units, duration, duration_units, cycle_ref
+    )
+    SELECT s, 2000, 0, 1500, 'W', 30, 'minutes', c.id
+    FROM db_shiftable_cycle c CROSS JOIN generate_series(1, {SLOTS_PER_CYCLE}) AS s
+    """,
+    """
+    INSERT INTO db_shiftable_cycle_old (
+        creation_timestamp, sequence_id, earliest_start_time, latest_end_time,
+        scheduled_start_time, expected_end_time, cycle_ref
+    )
+    SELECT now(), sequence_id, earliest_start_time, latest_end_time,
+        scheduled_start_time, expected_end_time, id
+    FROM db_shiftable_cycle WHERE id % 10 = 0
+    """,
+    "ANALYZE",
+]
+
+_user = f"user{USERS // 2}"
+_machine_id = USERS * MACHINES_PER_USER // 2
+_serials = ", ".join(f"'SN{n:08d}'" for n in range(_machine_id, _machine_id + 50))
+
+QUERIES = {
+    "device by serial number (SSA parsers, device endpoints)":
+        f"SELECT * FROM db_shiftable_machine WHERE serial_number = 'SN{_machine_id:08d}'",
+    "ownership check (missing_user_devices)":
+        f"SELECT serial_number FROM db_shiftable_machine "
+        f"WHERE user_id = '{_user}' AND serial_number IN ({_serials})",
+    "user devices (pool/schedule by user)":
+        f"SELECT id, serial_number, device_type FROM db_shiftable_machine WHERE user_id = '{_user}'",
+    "cycles of 50 devices in a time window (schedule-cycle-by-device)":
+        f"SELECT * FROM db_shiftable_cycle "
+        f"WHERE shiftable_machine_id BETWEEN {_machine_id} AND {_machine_id + 49} "
+        f"AND scheduled_start_time >= '2024-03-01' AND scheduled_start_time < '2024-03-02' "
+        f"ORDER BY id",
+    "cycle by device and sequence id (delay requests)":
+        f"SELECT * FROM db_shiftable_cycle "
+        f"WHERE shiftable_machine_id = {_machine_id} AND sequence_id = 'seq-{_machine_id}-10'",
+    "cycle by sequence id (SSA parsers)":
+        f"SELECT * FROM db_shiftable_cycle WHERE sequence_id = 'seq-{_machine_id}-10'",
+    "power profile of a cycle":
+        f"SELECT * FROM db_shiftable_power_profile WHERE cycle_ref = {_machine_id * 10} ORDER BY cycle_ref, id",
+    "old versions of a cycle":
+        f"SELECT * FROM db_shiftable_cycle_old WHERE cycle_ref = {_machine_id * 10}",
+}
+
+
+def explain(cursor, title):
+    print(f"\n{'=' * 30} {title} {'=' * 30}")
+    for name, query in QUERIES.items():
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+        plan = [row[0] for row in cursor.fetchall()]
+        print(f"\n--- {name}")
+        print("\n".join(plan))
+
+
+def main():
+    admin_connection = connect(dbname="postgres")
+    admin_connection.autocommit = True
+    with admin_connection.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+    admin_connection.close()
+
+    connection = connect(dbname=BENCH_DATABASE)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(SCHEMA)
+
+        start = time.time()
+        for statement in SEED:
+            cursor.execute(statement)
+        cursor.execute("SELECT count(*) FROM db_shiftable_cycle")
+        print(f"Seeded {cursor.fetchone()[0]} cycles in {time.time() - start:.1f} s")
+
+        explain(cursor, "BEFORE")
+
+        start = time.time()
+        run_migration_file(
+            cursor, os.path.join(MIGRATIONS_DIR, "001_hot_lookup_indexes.sql")
+        )
+        print(f"\nBuilt indexes in {time.time() - start:.1f} s")
+
+        explain(cursor, "AFTER")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
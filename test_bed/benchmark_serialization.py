@@ -0,0 +1,128 @@
+"""Encoding time of a schedule response, legacy encoder vs compiled serializers.
+
+"legacy" is the previous encoder.JSONEncoder: json.dumps walks the models and
+calls default() on each one, which goes through openapi_types with getattr.
+"compiled" is the current encoder: every model class gets a serializer
+generated once from its openapi_types/attribute_map, and the result is written
+by orjson (if installed), datetimes still formatted by the JSON encoder default().
+
+Both are called the way connexion serializes responses (indent 2, sorted keys).
+
+Usage:
+    cd test_bed && python benchmark_serialization.py
+"""
+
+import os
+import sys
+import json
+import time
+import statistics
+from datetime import datetime, timedelta
+
+import six
+from connexion.apps.flask_app import FlaskJSONEncoder
+
+sys.path.append("..")
+
+from device_manager_service import encoder
+from device_manager_service.models.base_model_ import Model
+from device_manager_service.models.machine_cycle import MachineCycle
+from device_manager_service.models.machine_cycle_by_device import MachineCycleByDevice
+from device_manager_service.models.machine_cycle_by_user import MachineCycleByUser
+from device_manager_service.models.power_profile import PowerProfile
+
+
+USERS = int(os.environ.get("BENCH_USERS", 10))
+DEVICES_PER_USER = int(os.environ.get("BENCH_DEVICES_PER_USER", 3))
+CYCLES_PER_DEVICE = int(os.environ.get("BENCH_CYCLES_PER_DEVICE", 10))
+SLOTS_PER_CYCLE = int(os.environ.get("BENCH_SLOTS_PER_CYCLE", 96))
+RUNS = int(os.environ.get("BENCH_RUNS", 20))
+
+
+# Copy of encoder.JSONEncoder before the compiled serializers
+class LegacyJSONEncoder(FlaskJSONEncoder):
+    include_nulls = False
+
+    def default(self, o):
+        if isinstance(o, Model):
+            dikt = {}
+            for attr, _ in six.iteritems(o.openapi_types):
+                value = getattr(o, attr)
+                if value is None and not self.include_nulls:
+                    continue
+                attr = o.attribute_map[attr]
+                dikt[attr] = value
+            return dikt
+        return FlaskJSONEncoder.default(self, o)
+
+
+def new_cycle(sequence_id):
+    now = datetime.utcnow()
+    return MachineCycle(
+        sequence_id=str(sequence_id),
+        earliest_start_time=now,
+        latest_end_time=now + timedelta(hours=8),
+        scheduled_start_time=now,
+        expected_end_time=now + timedelta(hours=2),
+        program="cotton",
+        is_optimized=False,
+        power_profile=[
+            PowerProfile(
+                slot=slot, max_power=2000.0, expected_power=1500.0, power_units="W",
+                duration=15.0, duration_units="minutes",
+            )
+            for slot in range(1, SLOTS_PER_CYCLE + 1)
+        ],
+    )
+
+
+def schedule_response():
+    return [
+        MachineCycleByUser(
+            user_id=f"user{user}",
+            cycles=[
+                MachineCycleByDevice(
+                    serial_number=f"user{user}-device{device}",
+                    cycles=[new_cycle(cycle) for cycle in range(CYCLES_PER_DEVICE)],
+                )
+                for device in range(DEVICES_PER_USER)
+            ],
+        )
+        for user in range(USERS)
+    ]
+
+
+def run(name, json_encoder, response):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        body = json.dumps(response, cls=json_encoder, indent=2, sort_keys=True)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(
+        f"{name:>9}: median {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms per response "
+        f"({len(body) / 1024:.0f} KiB)"
+    )
+
+    return body
+
+
+def main():
+    response = schedule_response()
+    print(
+        f"{USERS} users x {DEVICES_PER_USER} devices x {CYCLES_PER_DEVICE} cycles "
+        f"x {SLOTS_PER_CYCLE} slots, orjson {'installed' if encoder.orjson else 'not installed'}"
+    )
+
+    legacy = run("legacy", LegacyJSONEncoder, response)
+    compiled = run("compiled", encoder.JSONEncoder, response)
+
+    if json.loads(legacy) != json.loads(compiled):
+        print("Responses differ!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()